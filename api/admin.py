@@ -1,3 +1,10 @@
 from django.contrib import admin
 
-# Register your models here.
+from api.models import CallerId
+
+
+@admin.register(CallerId)
+class CallerIdAdmin(admin.ModelAdmin):
+    list_display = ["phone_number", "area_code", "active", "cooldown_until"]
+    list_filter = ["active"]
+    readonly_fields = ["area_code"]
@@ -0,0 +1,140 @@
+import asyncio
+import json
+import logging
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import JsonResponse, StreamingHttpResponse
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_GET, require_POST
+from rest_framework import status
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.authentication import JWTAuthentication
+
+from api.models import DialCampaign
+from api.services.campaigns import campaign_progress
+from api.services.events import get_event_broker, user_channel
+from api.services.webhooks import aapply_status_event
+from api.tasks import get_task_status
+
+logger = logging.getLogger(__name__)
+
+# Native async counterparts of TwilioWebhookView and check_dial_status, for
+# deployments under an ASGI server (autoDialer.asgi). They skip DRF, whose
+# views are synchronous, and use the async ORM directly.
+
+
+async def authenticate(request):
+    try:
+        result = await sync_to_async(JWTAuthentication().authenticate)(request)
+    except AuthenticationFailed:
+        return None
+    return result[0] if result else None
+
+
+@csrf_exempt
+@require_POST
+async def twilio_webhook(request):
+    sid = request.POST.get("CallSid")
+    call_status = request.POST.get("CallStatus")
+    duration = request.POST.get("CallDuration")
+
+    if not sid or not call_status:
+        return JsonResponse(
+            {"error": "CallSid and CallStatus are required."},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+
+    try:
+        duration = int(duration) if duration else None
+    except ValueError:
+        return JsonResponse(
+            {"error": "CallDuration must be an integer."},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+
+    try:
+        if not await aapply_status_event(sid, call_status, duration):
+            logger.info(f"Deferred webhook for call SID without a record: {sid}")
+            return JsonResponse({}, status=status.HTTP_202_ACCEPTED)
+
+        logger.info(f"Updated call record for SID: {sid}")
+        return JsonResponse({}, status=status.HTTP_200_OK)
+
+    except Exception as e:
+        logger.error(f"Error processing webhook for SID {sid}: {str(e)}", exc_info=True)
+        return JsonResponse(
+            {"error": "An error occurred while processing the webhook."},
+            status=status.HTTP_500_INTERNAL_SERVER_ERROR,
+        )
+
+
+@require_GET
+async def check_dial_status(request):
+    user = await authenticate(request)
+    if user is None:
+        return JsonResponse(
+            {"detail": "Authentication credentials were not provided."},
+            status=status.HTTP_401_UNAUTHORIZED,
+        )
+
+    task_id = request.GET.get("task_id")
+    if not task_id:
+        return JsonResponse(
+            {"error": "No task_id provided"}, status=status.HTTP_400_BAD_REQUEST
+        )
+
+    try:
+        campaign = await DialCampaign.objects.filter(
+            task_id=task_id, user=user
+        ).afirst()
+        if campaign is not None:
+            payload, status_code = campaign_progress(campaign)
+        else:
+            # the result backend client blocks, but touches no database
+            payload, status_code = await sync_to_async(
+                get_task_status, thread_sensitive=False
+            )(task_id)
+        return JsonResponse(payload, status=status_code)
+    except Exception as e:
+        logger.error(f"Error in check_dial_status: {str(e)}")
+        return JsonResponse(
+            {"error": "An error occurred while checking the dial status."},
+            status=status.HTTP_500_INTERNAL_SERVER_ERROR,
+        )
+
+
+@require_GET
+async def progress_events(request):
+    """Server-sent events carrying the user's campaign counters and call
+    status changes, one ``progress`` event per publishing interval."""
+    user = await authenticate(request)
+    if user is None:
+        return JsonResponse(
+            {"detail": "Authentication credentials were not provided."},
+            status=status.HTTP_401_UNAUTHORIZED,
+        )
+
+    subscription = get_event_broker().subscribe(user_channel(user.id))
+    keepalive = getattr(settings, "PROGRESS_EVENTS_KEEPALIVE", 15)
+
+    async def stream():
+        try:
+            yield ": connected\n\n"
+            while True:
+                try:
+                    message = await asyncio.wait_for(subscription.get(), keepalive)
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"
+                    continue
+                data = json.dumps(message, cls=DjangoJSONEncoder)
+                yield f"event: progress\ndata: {data}\n\n"
+        finally:
+            subscription.close()
+
+    response = StreamingHttpResponse(stream(), content_type="text/event-stream")
+    response["Cache-Control"] = "no-cache"
+    # stop nginx from buffering the stream
+    response["X-Accel-Buffering"] = "no"
+    return response
@@ -0,0 +1,51 @@
+from django.core.management.base import BaseCommand
+
+from api.models import CallRecord, CallStatsDaily
+from api.services.stats import compute_call_stats, rebuild_call_stats
+
+
+class Command(BaseCommand):
+    help = "Rebuild the CallStatsDaily rollups from CallRecords."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--user", type=int, help="Only rebuild this user id.")
+        parser.add_argument(
+            "--verify",
+            action="store_true",
+            help="Compare the rollups with CallRecords without changing them.",
+        )
+
+    def handle(self, *args, **options):
+        user_id = options["user"]
+        if options["verify"]:
+            mismatches = self.verify(user_id)
+            for key, expected, actual in mismatches:
+                self.stdout.write(f"{key}: expected {expected}, found {actual}")
+            if mismatches:
+                self.stderr.write(f"{len(mismatches)} rollup rows differ")
+                raise SystemExit(1)
+            self.stdout.write(self.style.SUCCESS("Rollups match CallRecords"))
+            return
+
+        written = rebuild_call_stats(user_id)
+        self.stdout.write(self.style.SUCCESS(f"Wrote {written} rollup rows"))
+
+    def verify(self, user_id):
+        call_records = CallRecord.objects.all()
+        rollups = CallStatsDaily.objects.all()
+        if user_id is not None:
+            call_records = call_records.filter(user_id=user_id)
+            rollups = rollups.filter(user_id=user_id)
+
+        expected = compute_call_stats(call_records)
+        actual = {
+            (row.user_id, row.day, row.status): (row.calls, row.duration, row.cost)
+            for row in rollups
+            # rows can be left at zero by duration corrections
+            if row.calls or row.duration or row.cost
+        }
+        return [
+            (key, expected.get(key), actual.get(key))
+            for key in sorted(set(expected) | set(actual), key=str)
+            if expected.get(key) != actual.get(key)
+        ]
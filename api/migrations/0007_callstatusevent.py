@@ -0,0 +1,38 @@
+# Generated by Django 5.0.14 on 2026-10-18 16:46
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api", "0006_ratelimitbucket"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="CallStatusEvent",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("sid", models.CharField(max_length=100)),
+                ("status", models.CharField(max_length=20)),
+                ("duration", models.IntegerField(null=True)),
+                ("received_at", models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                "indexes": [
+                    models.Index(
+                        fields=["sid", "received_at"], name="api_callsta_sid_ad33ce_idx"
+                    )
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 5.0.14 on 2026-10-18 16:48
+
+from django.db import migrations, models
+
+CALL_STATUS_RANKS = {
+    "queued": 1,
+    "initiated": 2,
+    "ringing": 3,
+    "in-progress": 4,
+    "completed": 5,
+    "busy": 5,
+    "failed": 5,
+    "no-answer": 5,
+    "canceled": 5,
+}
+
+
+def backfill_status_rank(apps, schema_editor):
+    CallRecord = apps.get_model("api", "CallRecord")
+    for status, rank in CALL_STATUS_RANKS.items():
+        CallRecord.objects.filter(status=status).update(status_rank=rank)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api", "0007_callstatusevent"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="callrecord",
+            name="status_rank",
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_status_rank, migrations.RunPython.noop),
+    ]
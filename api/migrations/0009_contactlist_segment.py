@@ -0,0 +1,18 @@
+# Generated by Django 5.0.14 on 2026-10-18 16:53
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api", "0008_callrecord_status_rank"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="contactlist",
+            name="segment",
+            field=models.JSONField(blank=True, null=True),
+        ),
+    ]
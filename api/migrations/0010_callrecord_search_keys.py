@@ -0,0 +1,77 @@
+# Generated by Django 5.0.14 on 2026-10-18 16:56
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+def backfill_search_keys(apps, schema_editor):
+    CallRecord = apps.get_model("api", "CallRecord")
+    batch = []
+    for record in CallRecord.objects.select_related("contact").iterator(
+        chunk_size=2000
+    ):
+        digits = "".join(c for c in record.phone_number if c.isdigit())
+        record.phone_digits = digits
+        record.phone_digits_reversed = digits[::-1]
+        if record.contact is not None:
+            record.contact_name_key = (
+                (f"{record.contact.first_name} {record.contact.last_name}")
+                .strip()
+                .lower()
+            )
+        batch.append(record)
+        if len(batch) >= 2000:
+            CallRecord.objects.bulk_update(
+                batch, ["phone_digits", "phone_digits_reversed", "contact_name_key"]
+            )
+            batch = []
+    CallRecord.objects.bulk_update(
+        batch, ["phone_digits", "phone_digits_reversed", "contact_name_key"]
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api", "0009_contactlist_segment"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="callrecord",
+            name="contact_name_key",
+            field=models.CharField(default="", max_length=201),
+        ),
+        migrations.AddField(
+            model_name="callrecord",
+            name="phone_digits",
+            field=models.CharField(default="", max_length=20),
+        ),
+        migrations.AddField(
+            model_name="callrecord",
+            name="phone_digits_reversed",
+            field=models.CharField(default="", max_length=20),
+        ),
+        migrations.AddIndex(
+            model_name="callrecord",
+            index=models.Index(
+                fields=["user", "phone_digits"], name="api_callrec_user_id_978b54_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="callrecord",
+            index=models.Index(
+                fields=["user", "phone_digits_reversed"],
+                name="api_callrec_user_id_83b03a_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="callrecord",
+            index=models.Index(
+                fields=["user", "contact_name_key"],
+                name="api_callrec_user_id_702b0d_idx",
+            ),
+        ),
+        migrations.RunPython(backfill_search_keys, migrations.RunPython.noop),
+    ]
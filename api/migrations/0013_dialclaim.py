@@ -0,0 +1,50 @@
+# Generated by Django 5.0.14 on 2026-10-18 17:12
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api", "0012_dialcampaign"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="dialcampaign",
+            name="chunk_bounds",
+            field=models.JSONField(blank=True, null=True),
+        ),
+        migrations.CreateModel(
+            name="DialClaim",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("run_id", models.UUIDField()),
+                (
+                    "campaign",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        to="api.dialcampaign",
+                    ),
+                ),
+                (
+                    "contact",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE, to="api.contact"
+                    ),
+                ),
+            ],
+            options={
+                "unique_together": {("campaign", "contact")},
+            },
+        ),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 5.0.14 on 2026-10-18 17:27
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api", "0014_faileddial"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="CallerId",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("phone_number", models.CharField(max_length=20, unique=True)),
+                (
+                    "area_code",
+                    models.CharField(blank=True, db_index=True, max_length=10),
+                ),
+                ("active", models.BooleanField(default=True)),
+                ("max_in_flight", models.PositiveIntegerField(default=0)),
+                ("cooldown_until", models.DateTimeField(blank=True, null=True)),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 5.0.14 on 2026-10-18 17:35
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api", "0015_callerid"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="callerid",
+            name="account_sid",
+            field=models.CharField(blank=True, default="", max_length=34),
+        ),
+        migrations.AddField(
+            model_name="callrecord",
+            name="account_sid",
+            field=models.CharField(blank=True, default="", max_length=34),
+        ),
+        migrations.AddIndex(
+            model_name="callrecord",
+            index=models.Index(
+                fields=["account_sid", "created_at"],
+                name="api_callrec_account_5472c4_idx",
+            ),
+        ),
+    ]
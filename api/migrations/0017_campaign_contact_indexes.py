@@ -0,0 +1,27 @@
+# Generated by Django 5.0.14 on 2026-10-18 18:29
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api", "0016_account_sid"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="callrecord",
+            index=models.Index(
+                fields=["campaign", "contact"], name="api_callrec_campaig_d72358_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="faileddial",
+            index=models.Index(
+                fields=["campaign", "contact"], name="api_failedd_campaig_24c9ce_idx"
+            ),
+        ),
+    ]
@@ -1,3 +1,4 @@
+import phonenumbers
 from django.contrib.auth.models import User
 from django.db import models
 
@@ -26,32 +27,287 @@ class ContactList(models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE)
     name = models.CharField(max_length=100)
     contacts = models.ManyToManyField(Contact)
+    # stored Contact filter of a dynamic list, see api.services.membership;
+    # dynamic lists have no materialized members
+    segment = models.JSONField(null=True, blank=True)
 
     def __str__(self):
         return self.name
 
+    @property
+    def is_dynamic(self):
+        return self.segment is not None
+
     class Meta:
         indexes = [
             models.Index(fields=["user", "name"]),
         ]
 
 
+class DialCampaign(models.Model):
+    """One dial of a contact list and its live progress.
+
+    The counters are only changed with ``F()`` updates, in batches, by the
+    dialer and the status webhooks, so reading progress is a single
+    primary-key lookup. ``queued`` is the number of contacts not dialed yet
+    and ``completed`` the number of calls that have ended.
+    """
+
+    PENDING = "pending"
+    IN_PROGRESS = "in_progress"
+    COMPLETED = "completed"
+    FAILED = "failed"
+    STATUS_CHOICES = [
+        (PENDING, "Pending"),
+        (IN_PROGRESS, "In progress"),
+        (COMPLETED, "Completed"),
+        (FAILED, "Failed"),
+    ]
+
+    user = models.ForeignKey(User, on_delete=models.CASCADE)
+    contact_list = models.ForeignKey(ContactList, on_delete=models.SET_NULL, null=True)
+    message = models.TextField()
+    task_id = models.CharField(max_length=255, unique=True, null=True, blank=True)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=PENDING)
+    total = models.IntegerField(default=0)
+    queued = models.IntegerField(default=0)
+    dialed = models.IntegerField(default=0)
+    failed = models.IntegerField(default=0)
+    completed = models.IntegerField(default=0)
+    # inclusive [first, last] contact id ranges the campaign was split into,
+    # reused when the dial task is rerun
+    chunk_bounds = models.JSONField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"Campaign {self.id} for {self.contact_list}"
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["user", "-created_at"]),
+        ]
+
+
+class DialClaim(models.Model):
+    """A contact taken by a campaign run, written before the contact is
+    dialed. A contact is claimed at most once per campaign, so reruns of a
+    campaign never call anyone twice."""
+
+    campaign = models.ForeignKey(DialCampaign, on_delete=models.CASCADE)
+    contact = models.ForeignKey(Contact, on_delete=models.CASCADE)
+    run_id = models.UUIDField()
+
+    class Meta:
+        unique_together = ["campaign", "contact"]
+
+
+# Twilio call statuses in the order a call moves through them. Every terminal
+# status shares the highest rank, so once a call ends it never changes again.
+CALL_STATUS_RANKS = {
+    "queued": 1,
+    "initiated": 2,
+    "ringing": 3,
+    "in-progress": 4,
+    "completed": 5,
+    "busy": 5,
+    "failed": 5,
+    "no-answer": 5,
+    "canceled": 5,
+}
+
+
+TERMINAL_STATUS_RANK = max(CALL_STATUS_RANKS.values())
+TERMINAL_STATUSES = [
+    status for status, rank in CALL_STATUS_RANKS.items() if rank == TERMINAL_STATUS_RANK
+]
+
+
+def status_rank(status):
+    return CALL_STATUS_RANKS.get(status, 0)
+
+
+def phone_digits(phone_number):
+    return "".join(c for c in phone_number if c.isdigit())
+
+
+def contact_name_key(first_name, last_name):
+    return f"{first_name} {last_name}".strip().lower()
+
+
 class CallRecord(models.Model):
     sid = models.CharField(max_length=100, unique=True)  # unique=true
     user = models.ForeignKey(User, on_delete=models.CASCADE)
     contact = models.ForeignKey(Contact, on_delete=models.SET_NULL, null=True)
+    campaign = models.ForeignKey(
+        DialCampaign, on_delete=models.SET_NULL, null=True, blank=True
+    )
     created_at = models.DateTimeField(auto_now_add=True)
     phone_number = models.CharField(max_length=20)
+    # the Twilio account that placed the call
+    account_sid = models.CharField(max_length=34, blank=True, default="")
     duration = models.IntegerField(default=0)
     cost = models.DecimalField(max_digits=6, decimal_places=2, default=0.00)
     status = models.CharField(max_length=20)
+    status_rank = models.PositiveSmallIntegerField(default=0)
+    # search keys: the number's digits, the digits reversed for suffix
+    # lookups, and the contact's lowercased name as it was when dialed
+    phone_digits = models.CharField(max_length=20, default="")
+    phone_digits_reversed = models.CharField(max_length=20, default="")
+    contact_name_key = models.CharField(max_length=201, default="")
 
     def __str__(self):
         return f" Call to {self.contact} at {self.time}"
 
+    def populate_derived_fields(self):
+        """Fill in the columns computed from other fields. ``save`` does this
+        itself; callers using ``bulk_create`` must call it first.
+
+        ``contact_name_key`` is only derived from a loaded ``contact``;
+        callers that build records from contact ids set it directly.
+        """
+        self.status_rank = status_rank(self.status)
+        self.phone_digits = phone_digits(self.phone_number)
+        self.phone_digits_reversed = self.phone_digits[::-1]
+        if not self.contact_name_key and CallRecord.contact.is_cached(self):
+            if self.contact is not None:
+                self.contact_name_key = contact_name_key(
+                    self.contact.first_name, self.contact.last_name
+                )
+
+    def save(self, *args, **kwargs):
+        self.populate_derived_fields()
+        super().save(*args, **kwargs)
+
     class Meta:
         indexes = [
             models.Index(fields=["sid"]),
             models.Index(fields=["user", "created_at"]),
             models.Index(fields=["user", "status"]),
+            models.Index(fields=["user", "phone_digits"]),
+            models.Index(fields=["user", "phone_digits_reversed"]),
+            models.Index(fields=["user", "contact_name_key"]),
+            models.Index(fields=["account_sid", "created_at"]),
+            models.Index(fields=["campaign", "contact"]),
+        ]
+
+
+class RateLimitBucket(models.Model):
+    key = models.CharField(max_length=150, unique=True)
+    # theoretical arrival time (unix timestamp) of the next conforming call
+    tat = models.FloatField(default=0)
+
+    def __str__(self):
+        return self.key
+
+
+def area_code(phone_number):
+    """Country calling code and area code of an E.164 number, e.g. "1415"
+    for +14155550100, or None when it has none."""
+    try:
+        number = phonenumbers.parse(phone_number, None)
+    except phonenumbers.NumberParseException:
+        return None
+    length = phonenumbers.length_of_geographical_area_code(
+        number
+    ) or phonenumbers.length_of_national_destination_code(number)
+    if not length:
+        return None
+    national_number = phonenumbers.national_significant_number(number)
+    return f"{number.country_code}{national_number[:length]}"
+
+
+class CallerId(models.Model):
+    """An outbound number in the caller-ID pool calls are spread across."""
+
+    phone_number = models.CharField(max_length=20, unique=True)
+    # the Twilio account that owns the number, blank for any account
+    account_sid = models.CharField(max_length=34, blank=True, default="")
+    area_code = models.CharField(max_length=10, blank=True, db_index=True)
+    active = models.BooleanField(default=True)
+    # calls.create requests a dial task keeps in flight from this number,
+    # 0 uses CALLER_ID_MAX_IN_FLIGHT
+    max_in_flight = models.PositiveIntegerField(default=0)
+    # set when Twilio throttles or rejects the number; skipped until then
+    cooldown_until = models.DateTimeField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def save(self, *args, **kwargs):
+        self.area_code = area_code(self.phone_number) or ""
+        super().save(*args, **kwargs)
+
+    def __str__(self):
+        return self.phone_number
+
+
+class CallStatusEvent(models.Model):
+    """A status callback that arrived before its CallRecord was written."""
+
+    sid = models.CharField(max_length=100)
+    status = models.CharField(max_length=20)
+    duration = models.IntegerField(null=True)
+    received_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.sid} {self.status}"
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["sid", "received_at"]),
+        ]
+
+
+class CallStatsDaily(models.Model):
+    """Per-user daily call totals, maintained incrementally.
+
+    The ``dialed`` bucket counts every call placed that day along with its
+    cost; each terminal status bucket counts the calls that ended with it and
+    their total duration. Rebuild with ``manage.py rebuild_call_stats``.
+    """
+
+    DIALED = "dialed"
+
+    user = models.ForeignKey(User, on_delete=models.CASCADE)
+    day = models.DateField()
+    status = models.CharField(max_length=20)
+    calls = models.IntegerField(default=0)
+    duration = models.BigIntegerField(default=0)
+    cost = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+
+    def __str__(self):
+        return f"{self.user} {self.day} {self.status}: {self.calls}"
+
+    class Meta:
+        unique_together = ["user", "day", "status"]
+
+
+class FailedDial(models.Model):
+    """Dead letter for a contact whose dial still failed after its retries.
+
+    ``redriven_at`` is set once the contact has been handed back to the
+    dialer by ``redrive_failed_dials``.
+    """
+
+    user = models.ForeignKey(User, on_delete=models.CASCADE)
+    campaign = models.ForeignKey(
+        DialCampaign, on_delete=models.CASCADE, null=True, blank=True
+    )
+    contact = models.ForeignKey(Contact, on_delete=models.CASCADE)
+    phone_number = models.CharField(max_length=20)
+    error = models.TextField()
+    # Twilio error code, or the HTTP status when Twilio gave none
+    error_code = models.IntegerField(null=True, blank=True)
+    transient = models.BooleanField(default=False)
+    attempts = models.PositiveSmallIntegerField(default=1)
+    created_at = models.DateTimeField(auto_now_add=True)
+    redriven_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"Failed dial to {self.phone_number}: {self.error}"
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["user", "created_at"]),
+            models.Index(fields=["campaign", "redriven_at"]),
+            models.Index(fields=["campaign", "contact"]),
         ]
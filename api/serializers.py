@@ -1,7 +1,9 @@
 from django.contrib.auth.models import User
 from rest_framework import serializers
 
-from api.models import CallRecord, Contact, ContactList
+from api.models import CallRecord, Contact, ContactList, DialCampaign, FailedDial
+from api.services.importer import IMPORT_FORMATS
+from api.services.membership import MEMBERSHIP_OPERATIONS, compile_contact_filter
 
 
 class UserSerializer(serializers.ModelSerializer):
@@ -16,12 +18,58 @@ class ContactSerializer(serializers.ModelSerializer):
         fields = ["id", "first_name", "last_name", "city", "phone_number"]
 
 
+class ContactImportSerializer(serializers.Serializer):
+    file = serializers.FileField()
+    file_format = serializers.ChoiceField(choices=IMPORT_FORMATS, required=False)
+
+    def validate(self, data):
+        if "file_format" not in data:
+            extension = data["file"].name.rsplit(".", 1)[-1].lower()
+            data["file_format"] = (
+                "ndjson" if extension in ("ndjson", "jsonl") else "csv"
+            )
+        return data
+
+
 class ContactListSerializer(serializers.ModelSerializer):
-    contacts = ContactSerializer(many=True, read_only=True)
+    # members are served by the paginated /contact-lists/{id}/contacts/
+    # endpoint; a dynamic list's size is only known by evaluating its segment
+    contact_count = serializers.SerializerMethodField()
 
     class Meta:
         model = ContactList
-        fields = ["id", "name", "contacts"]
+        fields = ["id", "name", "segment", "contact_count"]
+
+    def get_contact_count(self, obj):
+        if obj.is_dynamic:
+            return None
+        if hasattr(obj, "contact_count"):
+            return obj.contact_count
+        return obj.contacts.count()
+
+    def validate_segment(self, value):
+        if value is None:
+            return value
+        if not isinstance(value, dict) or not value:
+            raise serializers.ValidationError("Segment must be a non-empty object.")
+        try:
+            compile_contact_filter(None, value)
+        except ValueError as e:
+            raise serializers.ValidationError(str(e))
+        return value
+
+
+class ContactListMembershipSerializer(serializers.Serializer):
+    operation = serializers.ChoiceField(choices=MEMBERSHIP_OPERATIONS)
+    contact_ids = serializers.ListField(
+        child=serializers.IntegerField(), required=False, allow_empty=True
+    )
+    filter = serializers.DictField(child=serializers.CharField(), required=False)
+
+    def validate(self, data):
+        if ("contact_ids" in data) == ("filter" in data):
+            raise serializers.ValidationError("Provide either contact_ids or filter.")
+        return data
 
 
 class CallRecordSerializer(serializers.ModelSerializer):
@@ -38,6 +86,7 @@ class CallRecordSerializer(serializers.ModelSerializer):
             "cost",
             "status",
             "sid",
+            "account_sid",
         ]
 
 
@@ -49,3 +98,46 @@ class AddToContactListSerializer(serializers.Serializer):
     contact_list_id = serializers.PrimaryKeyRelatedField(
         queryset=ContactList.objects.all(), many=False, required=False
     )
+
+
+class DialCampaignSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = DialCampaign
+        fields = [
+            "id",
+            "contact_list",
+            "task_id",
+            "status",
+            "total",
+            "queued",
+            "dialed",
+            "failed",
+            "completed",
+            "created_at",
+            "finished_at",
+        ]
+
+
+class FailedDialSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = FailedDial
+        fields = [
+            "id",
+            "campaign",
+            "contact",
+            "phone_number",
+            "error",
+            "error_code",
+            "transient",
+            "attempts",
+            "created_at",
+            "redriven_at",
+        ]
+
+
+class FailedDialRedriveSerializer(serializers.Serializer):
+    campaign_id = serializers.IntegerField(required=False)
+    ids = serializers.ListField(
+        child=serializers.IntegerField(), required=False, allow_empty=False
+    )
+    transient_only = serializers.BooleanField(default=False)
@@ -0,0 +1,64 @@
+from collections import namedtuple
+
+from django.conf import settings
+
+TwilioAccount = namedtuple("TwilioAccount", ["sid", "auth_token", "weight"])
+
+
+class ShardRouter:
+    """Assigns dial work to Twilio accounts in proportion to their weights.
+
+    The accounts are laid out once in a smooth weighted round-robin cycle
+    (weights 3 and 1 give A A B A rather than A A A B) and each shard key
+    picks a slot of it. Consecutive chunks of a campaign, and consecutive
+    campaigns, therefore spread by weight without any shared state, and a
+    rerun of a chunk goes to the same account while the configuration is
+    unchanged.
+    """
+
+    def __init__(self, accounts):
+        if not accounts:
+            raise ValueError("No Twilio accounts are configured")
+        for account in accounts:
+            if account.weight < 1:
+                raise ValueError(f"Twilio account {account.sid} has weight < 1")
+
+        self.accounts = {account.sid: account for account in accounts}
+        self.cycle = []
+        current = dict.fromkeys(self.accounts, 0)
+        total = sum(account.weight for account in accounts)
+        for _ in range(total):
+            for account in accounts:
+                current[account.sid] += account.weight
+            sid = max(current, key=current.__getitem__)
+            current[sid] -= total
+            self.cycle.append(self.accounts[sid])
+
+    def route(self, campaign_id, chunk=0):
+        """The account that dials chunk ``chunk`` of campaign ``campaign_id``."""
+        return self.cycle[((campaign_id or 0) + chunk) % len(self.cycle)]
+
+    def get(self, sid):
+        try:
+            return self.accounts[sid]
+        except KeyError:
+            raise ValueError(f"Twilio account {sid} is not configured")
+
+
+def get_shard_router():
+    return ShardRouter(
+        [
+            TwilioAccount(
+                account.get("sid"),
+                account.get("auth_token"),
+                int(account.get("weight", 1)),
+            )
+            for account in getattr(settings, "TWILIO_ACCOUNTS", None)
+            or [
+                {
+                    "sid": getattr(settings, "TWILIO_ACCOUNT_SID", None),
+                    "auth_token": getattr(settings, "TWILIO_AUTH_TOKEN", None),
+                }
+            ]
+        ]
+    )
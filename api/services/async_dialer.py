@@ -0,0 +1,238 @@
+import asyncio
+import logging
+import queue
+import threading
+from concurrent.futures import Executor, Future
+
+from aiohttp import ClientSession, TCPConnector
+from django.conf import settings
+from twilio.rest import Client
+
+from api.services.dialer import call_params, dial_failure
+from api.services.outcomes import DialOutcome
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncDialEngine:
+    """Dials from an asyncio event loop with Twilio's aiohttp-based client.
+
+    Every call in flight is a coroutine waiting on a pooled aiohttp
+    connection rather than a thread, so a single task can keep hundreds of
+    ``calls.create`` requests open. What to dial next, retries and caller
+    IDs are left to the same ``DialScheduler`` as the thread-pool engine.
+
+    The loop runs on a helper thread while the calling thread serves it:
+    reading contacts, rate limit reservations and the results handler are
+    sent back to the calling thread through a ``CallingThreadExecutor``, so
+    the ORM never touches the loop and stays on the task's own database
+    connection. Results are handed over in batches, at most ``batch_size``
+    at a time or every ``handoff_interval`` seconds.
+
+    Celery raises its soft time limit in the calling thread, never in the
+    loop's, so ``run`` catches it there, cancels the dial and keeps serving
+    the loop until the calls already placed are handed over.
+    """
+
+    def __init__(
+        self,
+        service,
+        concurrency,
+        batch_size=500,
+        handoff_interval=1.0,
+    ):
+        self.service = service
+        self.concurrency = max(concurrency, 1)
+        self.batch_size = batch_size
+        self.handoff_interval = handoff_interval
+
+    def run(self, scheduler, template, handle):
+        """Dial the contacts of ``scheduler``, passing lists of
+        ``(contact, outcome, attempts)`` to ``handle`` on the calling thread."""
+        executor = CallingThreadExecutor()
+        loop = asyncio.new_event_loop()
+        main = loop.create_task(self._run(scheduler, template, handle, executor))
+        thread = threading.Thread(
+            target=self._run_loop, args=(loop, main, executor), daemon=True
+        )
+        thread.start()
+
+        stopped = None
+        try:
+            while True:
+                try:
+                    executor.serve()
+                    break
+                except BaseException as e:
+                    # raised in this thread while it waited for the loop, so
+                    # the loop is still dialing: stop it and wait it out
+                    if stopped is None:
+                        stopped = e
+                    loop.call_soon_threadsafe(main.cancel)
+            thread.join()
+        finally:
+            if not thread.is_alive():
+                loop.close()
+
+        if stopped is not None:
+            raise stopped
+        main.result()
+
+    @staticmethod
+    def _run_loop(loop, main, executor):
+        asyncio.set_event_loop(loop)
+        try:
+            # the outcome is read from ``main`` on the calling thread
+            loop.run_until_complete(asyncio.wait([main]))
+            loop.run_until_complete(loop.shutdown_asyncgens())
+        finally:
+            executor.shutdown(wait=False)
+
+    def build_client(self):
+        http_client = self.service.async_http_client_class(
+            pool_connections=False,
+            timeout=getattr(settings, "TWILIO_HTTP_TIMEOUT", None),
+        )
+        # aiohttp's default connector is capped at 100 connections
+        http_client.session = ClientSession(
+            connector=TCPConnector(limit=self.concurrency)
+        )
+        client = Client(
+            self.service.account_sid,
+            self.service.auth_token,
+            http_client=http_client,
+        )
+        return client, http_client
+
+    async def _run(self, scheduler, template, handle, executor):
+        loop = asyncio.get_running_loop()
+
+        def on_calling_thread(fn):
+            async def call(*args):
+                future = loop.run_in_executor(executor, fn, *args)
+                try:
+                    return await asyncio.shield(future)
+                except asyncio.CancelledError:
+                    # the calling thread runs it all the same: a batch of
+                    # results is never dropped half handed over
+                    await future
+                    raise
+
+            return call
+
+        read_contacts = on_calling_thread(scheduler.read_contacts)
+        handle = on_calling_thread(handle)
+        rate_limiter = self.service.rate_limiter
+        reserve = on_calling_thread(rate_limiter.reserve)
+        client, http_client = self.build_client()
+        results = []
+        handed_off = loop.time()
+
+        try:
+            while True:
+                while len(scheduler.in_flight) < self.concurrency:
+                    if scheduler.needs_contacts:
+                        await read_contacts(self.batch_size)
+                        continue
+                    dial = scheduler.dispatch()
+                    if dial is None:
+                        break
+                    contact, _, from_number = dial
+                    if rate_limiter.enabled:
+                        delay = await reserve(self.service.account_sid, from_number)
+                        if delay > 0:
+                            await asyncio.sleep(delay)
+                    task = asyncio.ensure_future(
+                        self._dial(
+                            client,
+                            contact.phone_number,
+                            template.render(contact),
+                            from_number,
+                        )
+                    )
+                    scheduler.start(task, dial)
+
+                if results and (
+                    not scheduler.in_flight
+                    or len(results) >= self.batch_size
+                    or loop.time() - handed_off >= self.handoff_interval
+                ):
+                    batch, results = results, []
+                    await handle(batch)
+                    handed_off = loop.time()
+
+                if not scheduler.in_flight:
+                    if scheduler.finished:
+                        return
+                    await asyncio.sleep(scheduler.next_wake() or 0)
+                    continue
+
+                wake = scheduler.next_wake()
+                done, _ = await asyncio.wait(
+                    scheduler.in_flight,
+                    timeout=min(
+                        self.handoff_interval, float("inf") if wake is None else wake
+                    ),
+                    return_when=asyncio.FIRST_COMPLETED,
+                )
+                for task in done:
+                    result = scheduler.finish(task, task.result())
+                    if result is not None:
+                        results.append(result)
+        except BaseException:
+            # calls already placed are recorded even when the task is stopping
+            if results:
+                await handle(results)
+            raise
+        finally:
+            for task in scheduler.in_flight:
+                task.cancel()
+            await asyncio.gather(*scheduler.in_flight, return_exceptions=True)
+            await http_client.close()
+
+    async def _dial(self, client, phone_number, twiml, from_number):
+        try:
+            call = await client.calls.create_async(
+                **call_params(phone_number, twiml, from_number)
+            )
+        except Exception as e:
+            return dial_failure(phone_number, e)
+
+        return DialOutcome.success(call)
+
+
+class CallingThreadExecutor(Executor):
+    """Runs the functions an event loop on another thread submits on the
+    thread that calls ``serve``, until ``shutdown``.
+
+    An exception raised while a function runs, the soft time limit
+    included, goes back to the loop as that function's result.
+    """
+
+    def __init__(self):
+        self.work = queue.SimpleQueue()
+        self.is_shut_down = False
+
+    def submit(self, fn, *args, **kwargs):
+        future = Future()
+        self.work.put((future, fn, args, kwargs))
+        return future
+
+    def shutdown(self, wait=True, *, cancel_futures=False):
+        self.is_shut_down = True
+        self.work.put(None)
+
+    def serve(self):
+        while not (self.is_shut_down and self.work.empty()):
+            item = self.work.get()
+            if item is None:
+                continue
+            future, fn, args, kwargs = item
+            if not future.set_running_or_notify_cancel():
+                continue
+            try:
+                result = fn(*args, **kwargs)
+            except BaseException as e:
+                future.set_exception(e)
+            else:
+                future.set_result(result)
@@ -0,0 +1,93 @@
+import logging
+import time
+
+from api.models import TERMINAL_STATUS_RANK, CallRecord, FailedDial
+from api.services.campaigns import record_campaign_progress
+from api.services.stats import record_dialed_calls
+from api.services.webhooks import apply_pending_status_events
+
+logger = logging.getLogger(__name__)
+
+
+class CallRecordBuffer:
+    """Collects unsaved CallRecords and writes them with ``bulk_create``.
+
+    The buffer is flushed once it holds ``size`` records or ``interval``
+    seconds after the previous flush, whichever comes first, and again when
+    the ``with`` block exits, including when it exits with an exception.
+    Each flush also writes the FailedDials reported with ``add_failure`` and
+    adds both to the counters of ``campaign_id``.
+    """
+
+    def __init__(self, size=500, interval=5.0, clock=time.monotonic, campaign_id=None):
+        self.size = size
+        self.interval = interval
+        self.clock = clock
+        self.campaign_id = campaign_id
+        self.records = []
+        self.failures = 0
+        self.failed_dials = []
+        self.flushed = 0
+        self.last_flush = clock()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        try:
+            self.flush()
+        except Exception as e:
+            if exc is None:
+                raise
+            logger.error(
+                f"Error flushing {len(self.records)} CallRecords: {str(e)}",
+                exc_info=True,
+            )
+        return False
+
+    def add(self, record):
+        self.records.append(record)
+        if (
+            len(self.records) >= self.size
+            or self.clock() - self.last_flush >= self.interval
+        ):
+            self.flush()
+
+    def add_failure(self, failed_dial):
+        """Count a contact that could not be dialed and queue its FailedDial
+        dead letter."""
+        self.failures += 1
+        self.failed_dials.append(failed_dial)
+
+    def flush(self):
+        self.last_flush = self.clock()
+        if self.records:
+            for record in self.records:
+                record.populate_derived_fields()
+            CallRecord.objects.bulk_create(
+                self.records,
+                batch_size=self.size,
+                ignore_conflicts=True,
+                unique_fields=["sid"],
+            )
+            record_dialed_calls(self.records)
+        if self.failed_dials:
+            FailedDial.objects.bulk_create(self.failed_dials, batch_size=self.size)
+
+        record_campaign_progress(
+            self.campaign_id,
+            dialed=len(self.records),
+            failed=self.failures,
+            completed=sum(
+                record.status_rank == TERMINAL_STATUS_RANK for record in self.records
+            ),
+        )
+        self.failures = 0
+        self.failed_dials = []
+        if not self.records:
+            return
+
+        apply_pending_status_events([record.sid for record in self.records])
+
+        self.flushed += len(self.records)
+        self.records = []
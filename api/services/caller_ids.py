@@ -0,0 +1,170 @@
+import logging
+import time
+from collections import Counter
+from datetime import timedelta
+from itertools import count
+
+from django.conf import settings
+from django.db.models import Q
+from django.utils import timezone
+
+from api.models import CallerId, area_code
+
+logger = logging.getLogger(__name__)
+
+STRATEGIES = ("round_robin", "lru", "area_code")
+
+# Twilio errors that mean the number itself is being throttled or refused
+COOLDOWN_ERROR_CODES = {429, 20429, 21210, 21212}
+
+
+class CallerIdDispatcher:
+    """Picks the from-number of each outbound call out of a pool.
+
+    ``acquire`` returns the next number by ``strategy``, skipping numbers
+    that already have ``max_in_flight`` calls in flight from this dialer or
+    that are cooling down, and returns None when none can take a call;
+    ``release`` ends the call and puts the number in cooldown when Twilio
+    throttled or refused it. Cooldowns are written back to CallerId by
+    ``save`` so other dial tasks skip the number as well.
+
+    Each number keeps its own TWILIO_NUMBER_CPS rate limit bucket, so the
+    aggregate rate grows with the pool.
+    """
+
+    def __init__(
+        self,
+        numbers,
+        strategy="round_robin",
+        max_in_flight=0,
+        cooldown=60.0,
+        clock=time.monotonic,
+    ):
+        if not numbers:
+            raise ValueError("The caller-ID pool is empty")
+        if strategy not in STRATEGIES:
+            raise ValueError(f"Unknown caller-ID strategy {strategy!r}")
+
+        self.strategy = strategy
+        self.cooldown = cooldown
+        self.clock = clock
+        self.numbers = []
+        self.limits = {}
+        self.cooldown_until = {}
+        # ``numbers`` holds (phone_number, max_in_flight, seconds of
+        # cooldown left) tuples
+        for number, limit, cooling_for in numbers:
+            self.numbers.append(number)
+            self.limits[number] = limit or max_in_flight
+            if cooling_for:
+                self.cooldown_until[number] = clock() + cooling_for
+        self.by_area_code = {}
+        for number in self.numbers:
+            self.by_area_code.setdefault(area_code(number), []).append(number)
+        self.in_flight = Counter()
+        self.last_used = dict.fromkeys(self.numbers, -1)
+        self.uses = count()
+        self.cursors = Counter()
+        self.cooled = {}
+
+    @classmethod
+    def single(cls, from_number):
+        # with no other number to move to, throttling is left to retries
+        return cls([(from_number, 0, 0)], cooldown=0)
+
+    def available(self, number, now):
+        limit = self.limits[number]
+        if limit and self.in_flight[number] >= limit:
+            return False
+        return self.cooldown_until.get(number, 0) <= now
+
+    def acquire(self, phone_number):
+        now = self.clock()
+        number = None
+        if self.strategy == "lru":
+            candidates = [n for n in self.numbers if self.available(n, now)]
+            if candidates:
+                number = min(candidates, key=self.last_used.__getitem__)
+        else:
+            if self.strategy == "area_code":
+                code = area_code(str(phone_number))
+                number = self._next(code, self.by_area_code.get(code, ()), now)
+            if number is None:
+                number = self._next(None, self.numbers, now)
+        if number is not None:
+            self.in_flight[number] += 1
+            self.last_used[number] = next(self.uses)
+        return number
+
+    def _next(self, key, numbers, now):
+        # round-robin over ``numbers``, with a cursor per area code group
+        cursor = self.cursors[key]
+        for i in range(len(numbers)):
+            number = numbers[(cursor + i) % len(numbers)]
+            if self.available(number, now):
+                self.cursors[key] = cursor + i + 1
+                return number
+        return None
+
+    def release(self, number, outcome):
+        self.in_flight[number] -= 1
+        if (
+            self.cooldown
+            and not outcome.ok
+            and outcome.error_code in COOLDOWN_ERROR_CODES
+        ):
+            logger.warning(
+                f"Cooling down caller ID {number} for {self.cooldown:.0f}s: "
+                f"{outcome.error}"
+            )
+            self.cooldown_until[number] = self.clock() + self.cooldown
+            self.cooled[number] = timezone.now() + timedelta(seconds=self.cooldown)
+
+    def available_in(self):
+        """Seconds until a cooling number is free again, or None if none
+        is cooling down."""
+        now = self.clock()
+        waits = [until - now for until in self.cooldown_until.values() if until > now]
+        return min(waits) if waits else None
+
+    def save(self):
+        cooled, self.cooled = self.cooled, {}
+        for number, until in cooled.items():
+            CallerId.objects.filter(phone_number=number).update(cooldown_until=until)
+
+
+def get_caller_id_dispatcher(from_number=None, account_sid=None):
+    """Dispatcher over the active CallerId numbers usable from
+    ``account_sid``, or over just ``from_number`` (or TWILIO_PHONE_NUMBER
+    when there are none)."""
+    if from_number:
+        return CallerIdDispatcher.single(from_number)
+
+    now = timezone.now()
+    numbers = [
+        (
+            caller_id.phone_number,
+            caller_id.max_in_flight,
+            (
+                (caller_id.cooldown_until - now).total_seconds()
+                if caller_id.cooldown_until and caller_id.cooldown_until > now
+                else 0
+            ),
+        )
+        for caller_id in CallerId.objects.filter(
+            Q(account_sid="") | Q(account_sid=account_sid or ""), active=True
+        ).order_by("id")
+    ]
+    if not numbers:
+        from_number = getattr(settings, "TWILIO_PHONE_NUMBER", None)
+        if not from_number:
+            logger.error("TWILIO_PHONE_NUMBER is not set in settings")
+            raise ValueError("TWILIO_PHONE_NUMBER is not set")
+        return CallerIdDispatcher.single(from_number)
+
+    return CallerIdDispatcher(
+        numbers,
+        strategy=getattr(settings, "CALLER_ID_STRATEGY", "round_robin"),
+        max_in_flight=getattr(settings, "CALLER_ID_MAX_IN_FLIGHT", 0),
+        cooldown=getattr(settings, "CALLER_ID_COOLDOWN", 60.0),
+    )
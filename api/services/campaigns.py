@@ -0,0 +1,296 @@
+import logging
+from uuid import uuid4
+
+from django.db import transaction
+from django.db.models import Exists, F, Max, OuterRef
+from django.utils import timezone
+
+from api.models import CallRecord, DialCampaign, DialClaim, FailedDial
+from api.services.events import notify_campaigns_changed
+from api.services.outcomes import OUTCOME_UNKNOWN
+
+logger = logging.getLogger(__name__)
+
+
+# every helper is a no-op for dials started without a campaign
+
+
+def start_campaign(campaign_id, total, chunk_bounds=None):
+    if campaign_id is None:
+        return
+    DialCampaign.objects.filter(pk=campaign_id).update(
+        status=DialCampaign.IN_PROGRESS,
+        total=total,
+        queued=total,
+        chunk_bounds=chunk_bounds,
+    )
+    notify_campaigns_changed([campaign_id])
+
+
+def resume_campaign(campaign_id):
+    """Mark a rerun campaign in progress again, keeping its counters."""
+    if campaign_id is None:
+        return
+    DialCampaign.objects.filter(pk=campaign_id).update(
+        status=DialCampaign.IN_PROGRESS, finished_at=None
+    )
+    notify_campaigns_changed([campaign_id])
+
+
+def finish_campaign(campaign_id, failed=False):
+    if campaign_id is None:
+        return
+    DialCampaign.objects.filter(pk=campaign_id).update(
+        status=DialCampaign.FAILED if failed else DialCampaign.COMPLETED,
+        finished_at=timezone.now(),
+    )
+    notify_campaigns_changed([campaign_id])
+
+
+def record_campaign_progress(campaign_id, dialed=0, failed=0, completed=0):
+    """Add to a campaign's counters with one UPDATE."""
+    update = {
+        field: F(field) + value
+        for field, value in (
+            ("dialed", dialed),
+            ("failed", failed),
+            ("completed", completed),
+        )
+        if value
+    }
+    if dialed or failed:
+        update["queued"] = F("queued") - dialed - failed
+    if campaign_id is not None and update:
+        DialCampaign.objects.filter(pk=campaign_id).update(**update)
+        notify_campaigns_changed([campaign_id])
+
+
+def record_ended_campaign_calls(rows):
+    """Count ended calls, given as CallRecord ``values()`` rows with a
+    ``campaign_id``, against their campaigns."""
+    ended = {}
+    for row in rows:
+        if row["campaign_id"] is not None:
+            ended[row["campaign_id"]] = ended.get(row["campaign_id"], 0) + 1
+    for campaign_id, completed in ended.items():
+        record_campaign_progress(campaign_id, completed=completed)
+
+
+def campaign_claims(campaign_id, id_range=None):
+    """The campaign's DialClaims within the inclusive contact ``id_range``."""
+    claims = DialClaim.objects.filter(campaign_id=campaign_id)
+    if id_range is not None:
+        first, last = id_range
+        if first is not None:
+            claims = claims.filter(contact_id__gte=first)
+        if last is not None:
+            claims = claims.filter(contact_id__lte=last)
+    return claims
+
+
+def resume_point(campaign_id, id_range=None):
+    """Return the highest contact id claimed by the campaign within
+    ``id_range``, or None.
+
+    Runs claim contacts in ascending id order, so everything up to this id
+    has already been taken and a rerun can start after it. This is a single
+    lookup on the (campaign, contact) index.
+    """
+    claims = campaign_claims(campaign_id, id_range)
+    return claims.aggregate(last=Max("contact_id"))["last"]
+
+
+def dead_letter_unrecorded_claims(
+    campaign_id, user_id, id_range=None, contact_ids=None
+):
+    """Dead-letter the contacts an earlier run claimed but never recorded.
+
+    A claim with neither a CallRecord nor a pending FailedDial belongs to a
+    run that died while the call was in flight or before its result was
+    written, so the call may or may not have been placed. Such contacts are
+    counted as failed with an "Outcome unknown" error, where they can be
+    checked and redriven, instead of being silently skipped. Only safe while
+    no other run is dialing the same contacts. Returns how many there were.
+    """
+    claims = campaign_claims(campaign_id, id_range)
+    if contact_ids is not None:
+        claims = claims.filter(contact_id__in=contact_ids)
+    unrecorded = (
+        claims.exclude(
+            Exists(
+                CallRecord.objects.filter(
+                    campaign_id=campaign_id, contact_id=OuterRef("contact_id")
+                )
+            )
+        )
+        .exclude(
+            Exists(
+                FailedDial.objects.filter(
+                    campaign_id=campaign_id,
+                    contact_id=OuterRef("contact_id"),
+                    redriven_at__isnull=True,
+                )
+            )
+        )
+        .values_list("contact_id", "contact__phone_number")
+    )
+    failed_dials = [
+        FailedDial(
+            user_id=user_id,
+            campaign_id=campaign_id,
+            contact_id=contact_id,
+            phone_number=phone_number,
+            error=f"{OUTCOME_UNKNOWN}: the run dialing this contact stopped "
+            "before recording the call",
+        )
+        for contact_id, phone_number in unrecorded
+    ]
+    if failed_dials:
+        FailedDial.objects.bulk_create(failed_dials, batch_size=1000)
+        record_campaign_progress(campaign_id, failed=len(failed_dials))
+        logger.warning(
+            f"Dead-lettered {len(failed_dials)} contacts of campaign "
+            f"{campaign_id} claimed by a run that stopped before recording them"
+        )
+    return len(failed_dials)
+
+
+class ClaimedContacts:
+    """The contacts a campaign run may dial, claimed in batches as they are
+    read.
+
+    Each batch is inserted as DialClaims before any of it is dialed, and
+    only contacts whose claim this run wrote are yielded; the rest were
+    taken by an earlier run. The dialer reports each contact it places a
+    call for with ``dialed``. When the run stops early, ``release`` gives
+    back the claims of the contacts it never got to so that a rerun dials
+    them; a contact whose call was placed keeps its claim either way.
+    """
+
+    def __init__(self, campaign_id, contacts, batch_size=500):
+        self.campaign_id = campaign_id
+        self.contacts = contacts
+        self.batch_size = batch_size
+        self.run_id = uuid4()
+        self.undialed = set()
+        self.last_dialed = None
+
+    def __iter__(self):
+        batch = []
+        for contact in self.contacts:
+            batch.append(contact)
+            if len(batch) >= self.batch_size:
+                yield from self._claim(batch)
+                batch = []
+        if batch:
+            yield from self._claim(batch)
+
+    def _claim(self, batch):
+        contact_ids = [contact.id for contact in batch]
+        DialClaim.objects.bulk_create(
+            [
+                DialClaim(
+                    campaign_id=self.campaign_id,
+                    contact_id=contact_id,
+                    run_id=self.run_id,
+                )
+                for contact_id in contact_ids
+            ],
+            ignore_conflicts=True,
+        )
+        claimed = set(
+            DialClaim.objects.filter(
+                campaign_id=self.campaign_id,
+                contact_id__in=contact_ids,
+                run_id=self.run_id,
+            ).values_list("contact_id", flat=True)
+        )
+        if len(claimed) < len(batch):
+            logger.info(
+                f"Skipped {len(batch) - len(claimed)} contacts already claimed "
+                f"by campaign {self.campaign_id}"
+            )
+        self.undialed |= claimed
+        return [contact for contact in batch if contact.id in claimed]
+
+    def dialed(self, contact):
+        self.undialed.discard(contact.id)
+        if self.last_dialed is None or contact.id > self.last_dialed:
+            self.last_dialed = contact.id
+
+    def release(self, chunk_size=1000):
+        """Delete this run's claims of the contacts it never dialed,
+        returning how many were released.
+
+        Only contacts after the last one dialed are released: a rerun
+        resumes after the highest claim, so a contact given back below it
+        would never be taken again.
+        """
+        contact_ids = sorted(
+            contact_id
+            for contact_id in self.undialed
+            if self.last_dialed is None or contact_id > self.last_dialed
+        )
+        for i in range(0, len(contact_ids), chunk_size):
+            DialClaim.objects.filter(
+                campaign_id=self.campaign_id,
+                contact_id__in=contact_ids[i : i + chunk_size],
+                run_id=self.run_id,
+            ).delete()
+        self.undialed = set()
+        if contact_ids:
+            logger.info(
+                f"Released {len(contact_ids)} undialed contacts of campaign "
+                f"{self.campaign_id}"
+            )
+        return len(contact_ids)
+
+
+def release_failed_dials(failed_dials, chunk_size=1000):
+    """Take dead-lettered contacts back for redialing.
+
+    Marks the FailedDials that belong to a campaign and have not been
+    redriven yet, releases their claims so the dialer takes them again and
+    moves them from the campaign's ``failed`` counter back to ``queued``.
+    Returns ``{campaign_id: [contact_id, ...]}`` for the caller to dial.
+    """
+    released = {}
+    with transaction.atomic():
+        rows = list(
+            failed_dials.select_for_update()
+            .filter(redriven_at__isnull=True, campaign__isnull=False)
+            .values_list("id", "campaign_id", "contact_id")
+        )
+        for i in range(0, len(rows), chunk_size):
+            chunk = rows[i : i + chunk_size]
+            FailedDial.objects.filter(id__in=[row[0] for row in chunk]).update(
+                redriven_at=timezone.now()
+            )
+            for _, campaign_id, contact_id in chunk:
+                released.setdefault(campaign_id, []).append(contact_id)
+
+        for campaign_id, contact_ids in released.items():
+            for i in range(0, len(contact_ids), chunk_size):
+                DialClaim.objects.filter(
+                    campaign_id=campaign_id,
+                    contact_id__in=contact_ids[i : i + chunk_size],
+                ).delete()
+            record_campaign_progress(campaign_id, failed=-len(contact_ids))
+    return released
+
+
+def campaign_progress(campaign):
+    """Return the ``(payload, http_status)`` reported for a campaign."""
+    payload = {
+        "campaign_id": campaign.id,
+        "task_id": campaign.task_id,
+        "status": campaign.status,
+        "total": campaign.total,
+        "queued": campaign.queued,
+        "dialed": campaign.dialed,
+        "failed": campaign.failed,
+        "completed": campaign.completed,
+    }
+    if campaign.status == DialCampaign.FAILED:
+        return payload, 500
+    return payload, 200
@@ -0,0 +1,92 @@
+from collections import namedtuple
+
+from api.models import ContactList
+from api.services.membership import compile_contact_filter
+
+CONTACT_ROW_FIELDS = ("first_name", "last_name", "city", "phone_number")
+
+ContactRow = namedtuple("ContactRow", ["id", *CONTACT_ROW_FIELDS])
+
+
+def _iter_keyset(queryset, key, fields, chunk_size, id_range=None):
+    last = 0
+    if id_range is not None:
+        first, end = id_range
+        if first is not None:
+            last = first - 1
+        if end is not None:
+            queryset = queryset.filter(**{f"{key}__lte": end})
+    while True:
+        rows = list(
+            queryset.filter(**{f"{key}__gt": last})
+            .order_by(key)
+            .values_list(key, *fields)[:chunk_size]
+        )
+        if not rows:
+            return
+
+        for row in rows:
+            yield ContactRow._make(row)
+        last = rows[-1][0]
+
+
+def iter_segment_contacts(
+    contact_list, chunk_size=2000, contact_ids=None, id_range=None
+):
+    """Stream the contacts matching a dynamic list's segment filter.
+
+    The filter is evaluated directly against Contact in ``id`` order, so the
+    segment's membership is never materialized.
+    """
+    contacts = compile_contact_filter(contact_list.user_id, contact_list.segment)
+    if contact_ids is not None:
+        contacts = contacts.filter(id__in=contact_ids)
+    return _iter_keyset(contacts, "id", CONTACT_ROW_FIELDS, chunk_size, id_range)
+
+
+def iter_list_contacts(
+    contact_list_id, chunk_size=2000, contact_ids=None, id_range=None
+):
+    """Stream the members of a contact list as ``ContactRow`` tuples.
+
+    Members are read in ``contact_id`` order, ``chunk_size`` rows at a time,
+    with keyset pagination over the list's through table. Each chunk is a
+    range scan on the (contactlist_id, contact_id) unique index, and only the
+    columns the dialer uses are selected, so memory stays bounded by the
+    chunk size. ``id_range`` is an inclusive ``(first, last)`` pair of
+    contact ids, either of which may be None.
+    """
+    members = ContactList.contacts.through.objects.filter(
+        contactlist_id=contact_list_id
+    )
+    if contact_ids is not None:
+        members = members.filter(contact_id__in=contact_ids)
+
+    return _iter_keyset(
+        members,
+        "contact_id",
+        [f"contact__{field}" for field in CONTACT_ROW_FIELDS],
+        chunk_size,
+        id_range,
+    )
+
+
+def iter_contacts(contact_list, chunk_size=2000, contact_ids=None, id_range=None):
+    """Stream the contacts a list targets, whether it is materialized or a
+    dynamic segment."""
+    if contact_list.is_dynamic:
+        return iter_segment_contacts(contact_list, chunk_size, contact_ids, id_range)
+    return iter_list_contacts(contact_list.id, chunk_size, contact_ids, id_range)
+
+
+def list_contact_ids(contact_list):
+    """Return the ids of the contacts a list targets, in ``iter_contacts``
+    order."""
+    if contact_list.is_dynamic:
+        contacts = compile_contact_filter(contact_list.user_id, contact_list.segment)
+        return contacts.order_by("id").values_list("id", flat=True)
+    return (
+        ContactList.contacts.through.objects.filter(contactlist_id=contact_list.id)
+        .order_by("contact_id")
+        .values_list("contact_id", flat=True)
+    )
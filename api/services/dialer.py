@@ -1,107 +1,318 @@
 import logging
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
 
+from celery.exceptions import SoftTimeLimitExceeded
 from django.conf import settings
 from twilio.base.exceptions import TwilioRestException
 from twilio.rest import Client
-from twilio.twiml.voice_response import VoiceResponse
 
-from api.models import CallRecord, ContactList
+from api.models import CallRecord, ContactList, FailedDial, contact_name_key
+from api.services.buffer import CallRecordBuffer
+from api.services.caller_ids import get_caller_id_dispatcher
+from api.services.campaigns import (
+    ClaimedContacts,
+    dead_letter_unrecorded_claims,
+    resume_point,
+)
+from api.services.contacts import iter_contacts
+from api.services.outcomes import DialOutcome
+from api.services.ratelimit import get_rate_limiter
+from api.services.scheduler import DialScheduler
+from api.services.templates import MessageTemplate
+from api.services.twilio_http import AsyncTwilioHttpClient, get_twilio_http_client
 
 logger = logging.getLogger(__name__)
 
+STATUS_CALLBACK_URL = "https://mako-lucky-apparently.ngrok-free.app/api/twilio-webhook/"
+
 
 class TwilioDialerService:
     def __init__(self, account_sid, auth_token):
 
-        self.client = Client(account_sid, auth_token)
+        self.account_sid = account_sid
+        self.auth_token = auth_token
+        self.client = Client(
+            account_sid, auth_token, http_client=get_twilio_http_client()
+        )
+        self.rate_limiter = get_rate_limiter()
+        self.retry_attempts = getattr(settings, "DIALER_RETRY_ATTEMPTS", 3)
+        self.retry_base_delay = getattr(settings, "DIALER_RETRY_BASE_DELAY", 1.0)
+        self.retry_max_delay = getattr(settings, "DIALER_RETRY_MAX_DELAY", 30.0)
+        self.clock = time.monotonic
+        self.sleep = time.sleep
+        self.async_http_client_class = AsyncTwilioHttpClient
 
     def dialContactList(
         self,
         contact_list_id,
         message,
-        from_number=getattr(settings, "TWILIO_PHONE_NUMBER"),
+        from_number=None,
+        concurrency=None,
+        id_range=None,
+        campaign_id=None,
+        contact_ids=None,
+        engine=None,
     ):
-        if not from_number:
-            logger.error("TWILIO_PHONE_NUMBER is not set in settings")
-            raise ValueError("TWILIO_PHONE_NUMBER is not set")
+        caller_ids = get_caller_id_dispatcher(from_number, self.account_sid)
 
         try:
             contact_list = ContactList.objects.get(id=contact_list_id)
-        except contact_list.DoesNotExist:
+        except ContactList.DoesNotExist:
             logger.error(f"ContactList with id {contact_list_id} does not exist")
             raise ValueError(f"ContactList with id {contact_list_id} does not exist")
 
-        callRecords = []
+        template = MessageTemplate(message)
+
+        if concurrency is None:
+            concurrency = getattr(settings, "DIALER_CONCURRENCY", 1)
 
-        for contact in contact_list.contacts.all():
-            # breakpoint()
-            personalized_message = message.replace("{first_name}", contact.first_name)
-            personalized_message = personalized_message.replace(
-                "{last_name}", contact.last_name
+        if campaign_id is not None:
+            # whatever an earlier run claimed and never recorded is lost
+            dead_letter_unrecorded_claims(
+                campaign_id, contact_list.user_id, id_range, contact_ids
             )
-            personalized_message = personalized_message.replace("{city}", contact.city)
-            personalized_message = personalized_message.replace(
-                "{phone_number}", contact.phone_number
+        if campaign_id is not None and contact_ids is None:
+            # a rerun picks up after the contacts earlier runs already took
+            resume_after = resume_point(campaign_id, id_range)
+            if resume_after is not None:
+                id_range = (resume_after + 1, id_range[1] if id_range else None)
+
+        contacts = iter_contacts(
+            contact_list,
+            chunk_size=getattr(settings, "DIALER_CONTACT_CHUNK_SIZE", 2000),
+            contact_ids=contact_ids,
+            id_range=id_range,
+        )
+        claims = None
+        if campaign_id is not None:
+            contacts = claims = ClaimedContacts(
+                campaign_id,
+                contacts,
+                batch_size=getattr(settings, "CALL_RECORD_BUFFER_SIZE", 500),
             )
 
-            logger.info(f"MESSAGE IS {personalized_message}")
+        if engine is None:
+            engine = getattr(settings, "DIALER_ENGINE", "threads")
+        buffer_size = getattr(settings, "CALL_RECORD_BUFFER_SIZE", 500)
+        totals = {"dialed": 0, "failed": 0}
+        scheduler = DialScheduler(
+            contacts,
+            caller_ids,
+            retry_attempts=self.retry_attempts,
+            retry_base_delay=self.retry_base_delay,
+            retry_max_delay=self.retry_max_delay,
+            clock=self.clock,
+            on_dial=claims.dialed if claims is not None else None,
+        )
 
-            callObject = self.__dial(
-                contact.phone_number, personalized_message, from_number
-            )
-            # logger.info(f"{callObject.price}")
-            try:
-                callRecords.append(
-                    CallRecord.objects.create(
-                        user=contact_list.user,
-                        contact=contact,
-                        phone_number=contact.phone_number,
-                        duration=int(callObject.duration) if callObject.duration else 0,
-                        cost=abs(float(callObject.price)) if callObject.price else 0,
-                        status=callObject.status,
-                        sid=callObject.sid,
+        try:
+            with CallRecordBuffer(
+                size=buffer_size,
+                interval=getattr(settings, "CALL_RECORD_BUFFER_INTERVAL", 5.0),
+                campaign_id=campaign_id,
+            ) as buffer:
+
+                def record(results):
+                    for contact, outcome, attempts in results:
+                        key = self._record_outcome(
+                            buffer,
+                            contact_list,
+                            campaign_id,
+                            contact,
+                            outcome,
+                            attempts,
+                        )
+                        totals[key] += 1
+                    caller_ids.save()
+
+                try:
+                    if engine == "asyncio":
+                        from api.services.async_dialer import AsyncDialEngine
+
+                        AsyncDialEngine(self, concurrency, batch_size=buffer_size).run(
+                            scheduler, template, record
+                        )
+                    else:
+                        record(self._dial_contacts(scheduler, template, concurrency))
+                except BaseException:
+                    # a rerun resumes after contacts dialed later, so the ones
+                    # waiting for a retry are dead-lettered for a redrive
+                    record(scheduler.give_up())
+                    raise
+        except BaseException:
+            # hand back the claimed contacts no call was placed for, so a
+            # rerun dials them instead of skipping them
+            if claims is not None:
+                try:
+                    claims.release()
+                except Exception as e:
+                    logger.error(
+                        f"Error releasing claims of campaign {campaign_id}: {str(e)}",
+                        exc_info=True,
                     )
+            raise
+
+        return totals
+
+    def _record_outcome(
+        self, buffer, contact_list, campaign_id, contact, outcome, attempts
+    ):
+        """Buffer the CallRecord or FailedDial for one dial, returning which
+        total it counts towards."""
+        if not outcome.ok:
+            buffer.add_failure(
+                FailedDial(
+                    user_id=contact_list.user_id,
+                    campaign_id=campaign_id,
+                    contact_id=contact.id,
+                    phone_number=contact.phone_number,
+                    error=outcome.error,
+                    error_code=outcome.error_code,
+                    transient=outcome.transient,
+                    attempts=attempts,
                 )
-                # use the time from twilio api
+            )
+            return "failed"
+
+        # the call was placed, so it is recorded even when Twilio's duration
+        # or price cannot be read: it must never be dead-lettered and redialed
+        callObject = outcome.call
+        buffer.add(
+            CallRecord(
+                user_id=contact_list.user_id,
+                contact_id=contact.id,
+                campaign_id=campaign_id,
+                phone_number=contact.phone_number,
+                account_sid=self.account_sid or "",
+                contact_name_key=contact_name_key(
+                    contact.first_name, contact.last_name
+                ),
+                duration=call_field(callObject, "duration", int),
+                cost=call_field(callObject, "price", lambda price: abs(float(price))),
+                status=callObject.status,
+                sid=callObject.sid,
+            )
+        )
+        return "dialed"
+
+    def _dial_contacts(self, scheduler, template, concurrency):
+        """Yield ``(contact, outcome, attempts)`` for each contact of
+        ``scheduler``, keeping at most ``concurrency`` ``calls.create``
+        requests in flight on a thread pool.
+
+        Results are yielded on the calling thread so that the ORM work done by
+        the caller never leaves the task's own database connection. The rate
+        limiter is consulted here too, before each call is handed to a thread.
+        """
+        if concurrency > 1:
+            executor = ThreadPoolExecutor(max_workers=concurrency)
+        else:
+            concurrency = 1
+            executor = InlineExecutor()
 
-                # return True
-            except Exception as e:
-                logger.error(
-                    f"Error processing contact {contact.id}: {str(e)}", exc_info=True
+        with executor:
+            while True:
+                while len(scheduler.in_flight) < concurrency:
+                    if scheduler.needs_contacts:
+                        scheduler.read_contacts(concurrency)
+                        continue
+                    dial = scheduler.dispatch()
+                    if dial is None:
+                        break
+                    contact, _, from_number = dial
+                    self.rate_limiter.acquire(self.account_sid, from_number)
+                    future = executor.submit(
+                        self.__dial,
+                        contact.phone_number,
+                        template.render(contact),
+                        from_number,
+                    )
+                    scheduler.start(future, dial)
+
+                if not scheduler.in_flight:
+                    if scheduler.finished:
+                        return
+                    self.sleep(scheduler.next_wake() or 0)
+                    continue
+
+                done, _ = wait(
+                    scheduler.in_flight,
+                    timeout=scheduler.next_wake(),
+                    return_when=FIRST_COMPLETED,
                 )
+                for future in done:
+                    result = scheduler.finish(future, future.result())
+                    if result is not None:
+                        yield result
+
+    def __dial(self, phone_number, twiml, from_number):
         try:
-            CallRecord.objects.bulk_create(
-                callRecords,
-                batch_size=5000,
-                ignore_conflicts=True,
-                unique_fields=["sid"],
+            call = self.client.calls.create(
+                **call_params(phone_number, twiml, from_number)
             )
+        except SoftTimeLimitExceeded:
+            # the task is out of time, stop dialing so the buffer flushes
+            raise
         except Exception as e:
-            logger.error(f"Error bulk creating CallRecords: {str(e)}", exc_info=True)
-            raise e
+            return dial_failure(phone_number, e)
 
-    def __dial(self, phone_number, message, from_number):
+        return DialOutcome.success(call)
 
-        try:
-            response = VoiceResponse()
-            response.say(message, voice="Woman", language="en-US")
-            response.play("https://api.twilio.com/cowbell.mp3")
 
-            call = self.client.calls.create(
-                to=str(phone_number),
-                from_=from_number,
-                twiml=str(response),
-                status_callback="https://mako-lucky-apparently.ngrok-free.app/api/twilio-webhook/",
-                status_callback_method="POST",
-            )
+def call_params(phone_number, twiml, from_number):
+    """Keyword arguments of the ``calls.create`` request for one dial."""
+    return {
+        "to": str(phone_number),
+        "from_": from_number,
+        "twiml": twiml,
+        "status_callback": STATUS_CALLBACK_URL,
+        "status_callback_method": "POST",
+    }
 
-            return call
 
-        except TwilioRestException as e:
-            error_message = f"Twilio error while dialing {phone_number}: {str(e)}"
-            logger.error(error_message, exc_info=True)
-            return error_message
+def dial_failure(phone_number, exc):
+    """Log the error a ``calls.create`` request raised and return its
+    DialOutcome."""
+    if isinstance(exc, TwilioRestException):
+        logger.error(
+            f"Twilio error while dialing {phone_number}: {str(exc)}", exc_info=exc
+        )
+    else:
+        logger.error(
+            f"Error encountered while dialing {phone_number}: {str(exc)}",
+            exc_info=exc,
+        )
+    return DialOutcome.failure(exc)
+
+
+def call_field(call, name, parse):
+    """``parse`` of a numeric field of a placed call, or 0 when Twilio left
+    it empty or it cannot be parsed."""
+    value = getattr(call, name, None)
+    if not value:
+        return 0
+    try:
+        return parse(value)
+    except (TypeError, ValueError) as e:
+        logger.error(f"Invalid {name} {value!r} for call {call.sid}: {str(e)}")
+        return 0
+
+
+class InlineExecutor:
+    """Runs each submitted call right away on the calling thread, for
+    dialing without a thread pool."""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+    def submit(self, fn, *args):
+        future = Future()
+        try:
+            future.set_result(fn(*args))
         except Exception as e:
-            error_message = f"Error encountered while dialing {phone_number}: {str(e)}"
-            logger.error(error_message, exc_info=True)
-            return error_message
+            future.set_exception(e)
+        return future
@@ -0,0 +1,276 @@
+import asyncio
+import atexit
+import logging
+import os
+import socket
+import threading
+import time
+
+from django.conf import settings
+from django.db import close_old_connections
+
+from api.models import CallRecord, DialCampaign
+
+logger = logging.getLogger(__name__)
+
+
+def user_channel(user_id):
+    return f"user:{user_id}"
+
+
+class Subscription:
+    """Messages published to one channel, read from an event loop.
+
+    Publishers may run on any thread; messages are handed to the loop the
+    subscription was created on. When ``maxsize`` messages are waiting the
+    oldest are dropped, every message is a snapshot so the next one
+    supersedes them.
+    """
+
+    def __init__(self, broker, channel, maxsize=100):
+        self.broker = broker
+        self.channel = channel
+        self.loop = asyncio.get_running_loop()
+        self.queue = asyncio.Queue(maxsize=maxsize)
+
+    def put(self, message):
+        self.loop.call_soon_threadsafe(self._put, message)
+
+    def _put(self, message):
+        if self.queue.full():
+            self.queue.get_nowait()
+        self.queue.put_nowait(message)
+
+    async def get(self):
+        return await self.queue.get()
+
+    def close(self):
+        self.broker.unsubscribe(self)
+
+
+class InMemoryBroker:
+    """Pub/sub within one process."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.subscriptions = {}
+
+    def publish(self, channel, message):
+        with self.lock:
+            subscriptions = list(self.subscriptions.get(channel, ()))
+        for subscription in subscriptions:
+            subscription.put(message)
+
+    def subscribe(self, channel):
+        subscription = Subscription(self, channel)
+        with self.lock:
+            self.subscriptions.setdefault(channel, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self.lock:
+            subscriptions = self.subscriptions.get(subscription.channel, set())
+            subscriptions.discard(subscription)
+            if not subscriptions:
+                self.subscriptions.pop(subscription.channel, None)
+
+
+class KombuBroker(InMemoryBroker):
+    """Pub/sub across processes over a fanout exchange on the Celery broker.
+
+    Every process that has subscribers consumes the exchange from its own
+    auto-deleted queue on a background thread and delivers messages to its
+    local subscribers.
+    """
+
+    def __init__(self, url, exchange="autodialer.progress"):
+        from kombu import Exchange
+
+        super().__init__()
+        self.url = url
+        self.exchange = Exchange(exchange, type="fanout", durable=False)
+        self.thread = None
+
+    def publish(self, channel, message):
+        from kombu import Connection
+        from kombu.pools import producers
+
+        with Connection(self.url) as connection:
+            with producers[connection].acquire(block=True) as producer:
+                producer.publish(
+                    {"channel": channel, "message": message},
+                    exchange=self.exchange,
+                    declare=[self.exchange],
+                    serializer="json",
+                    retry=True,
+                )
+
+    def subscribe(self, channel):
+        with self.lock:
+            if self.thread is None:
+                self.thread = threading.Thread(
+                    target=self.run, name="progress-events", daemon=True
+                )
+                self.thread.start()
+        return super().subscribe(channel)
+
+    def deliver(self, body, message):
+        message.ack()
+        InMemoryBroker.publish(self, body["channel"], body["message"])
+
+    def run(self):
+        from kombu import Connection, Queue
+
+        while True:
+            try:
+                with Connection(self.url) as connection:
+                    queue = Queue(
+                        exchange=self.exchange, exclusive=True, auto_delete=True
+                    )
+                    with connection.Consumer(
+                        queue, callbacks=[self.deliver], accept=["json"]
+                    ):
+                        while True:
+                            try:
+                                connection.drain_events(timeout=1)
+                            except socket.timeout:
+                                pass
+            except Exception as e:
+                logger.error(f"Progress event consumer failed: {str(e)}")
+                time.sleep(1)
+
+
+class ProgressPublisher:
+    """Publishes call status and campaign counter changes, coalesced.
+
+    Writers only record which calls and campaigns changed. Every
+    ``interval`` seconds a background thread reads their current state in
+    two queries and publishes one message per user, so a burst of callbacks
+    costs subscribers one message per interval however large it is.
+    """
+
+    def __init__(self, broker, interval=1.0, autostart=True):
+        self.broker = broker
+        self.interval = interval
+        self.autostart = autostart
+        self.sids = set()
+        self.campaign_ids = set()
+        self.condition = threading.Condition()
+        self.thread = None
+        self.stopped = False
+
+    def calls_changed(self, sids):
+        with self.condition:
+            self.sids.update(sids)
+            self._ensure_started()
+
+    def campaigns_changed(self, campaign_ids):
+        with self.condition:
+            self.campaign_ids.update(campaign_ids)
+            self._ensure_started()
+
+    def _ensure_started(self):
+        if self.autostart and self.thread is None:
+            self.thread = threading.Thread(
+                target=self.run, name="progress-publisher", daemon=True
+            )
+            self.thread.start()
+
+    def run(self):
+        while True:
+            with self.condition:
+                if not self.stopped:
+                    self.condition.wait(self.interval)
+                stopped = self.stopped
+            close_old_connections()
+            try:
+                self.flush()
+            except Exception as e:
+                logger.error(f"Error publishing progress: {str(e)}", exc_info=True)
+            if stopped:
+                return
+
+    def stop(self):
+        with self.condition:
+            self.stopped = True
+            self.condition.notify()
+        if self.thread is not None:
+            self.thread.join()
+
+    def flush(self):
+        with self.condition:
+            sids, self.sids = self.sids, set()
+            campaign_ids, self.campaign_ids = self.campaign_ids, set()
+        if not sids and not campaign_ids:
+            return 0
+
+        messages = {}
+        for row in CallRecord.objects.filter(sid__in=sids).values(
+            "sid", "user_id", "status", "duration", "campaign_id"
+        ):
+            user_id = row.pop("user_id")
+            messages.setdefault(user_id, {"calls": [], "campaigns": []})
+            messages[user_id]["calls"].append(row)
+            if row["campaign_id"] is not None:
+                campaign_ids.add(row["campaign_id"])
+
+        for campaign in DialCampaign.objects.filter(id__in=campaign_ids).values(
+            "id",
+            "user_id",
+            "status",
+            "total",
+            "queued",
+            "dialed",
+            "failed",
+            "completed",
+        ):
+            user_id = campaign.pop("user_id")
+            messages.setdefault(user_id, {"calls": [], "campaigns": []})
+            messages[user_id]["campaigns"].append(campaign)
+
+        for user_id, message in messages.items():
+            self.broker.publish(user_channel(user_id), message)
+        return len(messages)
+
+
+_broker = None
+_publisher = None
+_publisher_pid = None
+
+
+def get_event_broker():
+    global _broker
+    if _broker is None:
+        if getattr(settings, "PROGRESS_EVENTS", "off") == "broker":
+            _broker = KombuBroker(settings.CELERY_BROKER_URL)
+        else:
+            _broker = InMemoryBroker()
+    return _broker
+
+
+def get_progress_publisher():
+    """Return this process's publisher, or None when progress events are
+    turned off."""
+    global _publisher, _publisher_pid
+    if getattr(settings, "PROGRESS_EVENTS", "off") == "off":
+        return None
+    if _publisher is None or _publisher_pid != os.getpid():
+        _publisher = ProgressPublisher(
+            get_event_broker(),
+            interval=getattr(settings, "PROGRESS_EVENTS_INTERVAL", 1.0),
+        )
+        _publisher_pid = os.getpid()
+        atexit.register(_publisher.stop)
+    return _publisher
+
+
+def notify_calls_changed(sids):
+    publisher = get_progress_publisher()
+    if publisher is not None:
+        publisher.calls_changed(sids)
+
+
+def notify_campaigns_changed(campaign_ids):
+    publisher = get_progress_publisher()
+    if publisher is not None:
+        publisher.campaigns_changed(campaign_ids)
@@ -0,0 +1,86 @@
+import csv
+import io
+import json
+import zlib
+
+from django.core.serializers.json import DjangoJSONEncoder
+
+EXPORT_FORMATS = ("csv", "ndjson")
+
+# CallRecord columns read with values_list, related Contact fields included,
+# so an export never instantiates models
+EXPORT_FIELDS = (
+    "id",
+    "sid",
+    "created_at",
+    "phone_number",
+    "contact_id",
+    "contact__first_name",
+    "contact__last_name",
+    "status",
+    "duration",
+    "cost",
+    "account_sid",
+)
+EXPORT_COLUMNS = tuple(field.replace("__", "_") for field in EXPORT_FIELDS)
+
+CONTENT_TYPES = {"csv": "text/csv", "ndjson": "application/x-ndjson"}
+
+
+def iter_export_rows(queryset, chunk_size=2000):
+    """Stream ``queryset`` as tuples of ``EXPORT_FIELDS``, ``chunk_size`` rows
+    per fetch (a server-side cursor where the database supports one)."""
+    return (
+        queryset.order_by("created_at", "id")
+        .values_list(*EXPORT_FIELDS)
+        .iterator(chunk_size=chunk_size)
+    )
+
+
+def iter_csv(rows, buffer_size=64 * 1024):
+    """Encode ``rows`` as CSV, yielding about ``buffer_size`` bytes at a time."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(EXPORT_COLUMNS)
+    for row in rows:
+        writer.writerow(row)
+        if buffer.tell() >= buffer_size:
+            yield buffer.getvalue().encode()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue().encode()
+
+
+def iter_ndjson(rows, buffer_size=64 * 1024):
+    """Encode ``rows`` as one JSON object per line."""
+    encoder = DjangoJSONEncoder()
+    lines = []
+    size = 0
+    for row in rows:
+        line = encoder.encode(dict(zip(EXPORT_COLUMNS, row))) + "\n"
+        lines.append(line)
+        size += len(line)
+        if size >= buffer_size:
+            yield "".join(lines).encode()
+            lines = []
+            size = 0
+    yield "".join(lines).encode()
+
+
+def iter_gzip(chunks, level=6):
+    """Compress a stream of byte chunks into a single gzip member."""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, zlib.MAX_WBITS | 16)
+    for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
+
+
+def export_call_records(queryset, file_format, compress=False):
+    """Return an iterator of bytes exporting ``queryset`` in ``file_format``."""
+    if file_format not in EXPORT_FORMATS:
+        raise ValueError(f"Unsupported export format: {file_format}")
+    encode = iter_csv if file_format == "csv" else iter_ndjson
+    chunks = encode(iter_export_rows(queryset))
+    return iter_gzip(chunks) if compress else chunks
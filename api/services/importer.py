@@ -0,0 +1,119 @@
+import csv
+import io
+import json
+import logging
+
+import phonenumbers
+
+from api.models import Contact
+
+logger = logging.getLogger(__name__)
+
+IMPORT_FORMATS = ("csv", "ndjson")
+NAME_MAX_LENGTH = 100
+
+
+def normalize_phone_number(raw, region="US"):
+    """Return ``raw`` in E.164 format, or None if it is not a valid number."""
+    try:
+        number = phonenumbers.parse(str(raw), region)
+    except phonenumbers.NumberParseException:
+        return None
+    if not phonenumbers.is_valid_number(number):
+        return None
+    return phonenumbers.format_number(number, phonenumbers.PhoneNumberFormat.E164)
+
+
+def iter_rows(stream, file_format):
+    """Parse an uploaded binary stream one row at a time."""
+    text = io.TextIOWrapper(stream, encoding="utf-8-sig", newline="")
+    if file_format == "csv":
+        yield from csv.DictReader(text)
+        return
+
+    for line in text:
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError:
+            row = None
+        yield row if isinstance(row, dict) else {}
+
+
+class ContactImporter:
+    """Creates Contacts for one user from a stream of rows.
+
+    Rows are validated and normalized as they are read and written with
+    ``bulk_create`` every ``chunk_size`` contacts, so an import never holds
+    more than one chunk in memory. Phone numbers are normalized to E.164
+    before they are compared with the user's existing contacts.
+    """
+
+    def __init__(self, user_id, chunk_size=2000, region="US", progress=None):
+        self.user_id = user_id
+        self.chunk_size = chunk_size
+        self.region = region
+        self.progress = progress
+        self.counts = {"inserted": 0, "duplicate": 0, "invalid": 0}
+        self.chunk = {}
+
+    def run(self, rows):
+        for row in rows:
+            self.add(row)
+        self.flush()
+        return self.counts
+
+    def add(self, row):
+        first_name = str(row.get("first_name") or "").strip()
+        last_name = str(row.get("last_name") or "").strip()
+        city = str(row.get("city") or "").strip()
+        phone_number = normalize_phone_number(
+            row.get("phone_number") or "", self.region
+        )
+
+        if (
+            not first_name
+            or not phone_number
+            or max(len(first_name), len(last_name), len(city)) > NAME_MAX_LENGTH
+        ):
+            self.counts["invalid"] += 1
+            return
+        if phone_number in self.chunk:
+            self.counts["duplicate"] += 1
+            return
+
+        self.chunk[phone_number] = Contact(
+            user_id=self.user_id,
+            first_name=first_name,
+            last_name=last_name,
+            city=city,
+            phone_number=phone_number,
+        )
+        if len(self.chunk) >= self.chunk_size:
+            self.flush()
+
+    def flush(self):
+        if not self.chunk:
+            return
+
+        existing = set(
+            Contact.objects.filter(
+                user_id=self.user_id, phone_number__in=self.chunk
+            ).values_list("phone_number", flat=True)
+        )
+        Contact.objects.bulk_create(
+            [
+                contact
+                for phone_number, contact in self.chunk.items()
+                if phone_number not in existing
+            ],
+            ignore_conflicts=True,
+        )
+        self.counts["inserted"] += len(self.chunk) - len(existing)
+        self.counts["duplicate"] += len(existing)
+        self.chunk = {}
+
+        if self.progress:
+            self.progress(dict(self.counts))
@@ -0,0 +1,85 @@
+from django.db import transaction
+
+from api.models import Contact, ContactList
+
+MEMBERSHIP_OPERATIONS = ("add", "remove", "replace")
+
+# Contact lookups a filter expression may use
+CONTACT_FILTER_LOOKUPS = (
+    "city",
+    "city__iexact",
+    "first_name",
+    "first_name__istartswith",
+    "last_name",
+    "last_name__istartswith",
+    "phone_number",
+    "phone_number__startswith",
+)
+
+
+def compile_contact_filter(user_id, contact_filter):
+    """Turn a ``{lookup: value}`` filter expression into a Contact queryset."""
+    unknown = set(contact_filter) - set(CONTACT_FILTER_LOOKUPS)
+    if unknown:
+        raise ValueError(f"Unsupported contact filters: {', '.join(sorted(unknown))}")
+    if not all(isinstance(value, str) for value in contact_filter.values()):
+        raise ValueError("Contact filter values must be strings")
+    return Contact.objects.filter(user_id=user_id, **contact_filter)
+
+
+def _chunks(values, size):
+    values = sorted(values)
+    for i in range(0, len(values), size):
+        yield values[i : i + size]
+
+
+def update_membership(
+    contact_list, operation, contact_ids=None, contact_filter=None, chunk_size=5000
+):
+    """Add, remove or replace the members of ``contact_list``.
+
+    The target contacts are given as ids or as a filter expression and are
+    always limited to the list owner's contacts. The change is computed as a
+    set difference against the existing through-table rows and applied with
+    batched inserts and deletes, one transaction per chunk.
+    """
+    if operation not in MEMBERSHIP_OPERATIONS:
+        raise ValueError(f"Unknown membership operation: {operation}")
+    if contact_list.is_dynamic:
+        raise ValueError("Members of a dynamic contact list cannot be edited")
+
+    if contact_filter is not None:
+        targets = compile_contact_filter(contact_list.user_id, contact_filter)
+    else:
+        targets = Contact.objects.filter(
+            user_id=contact_list.user_id, id__in=contact_ids or []
+        )
+    target_ids = set(targets.values_list("id", flat=True).iterator())
+
+    Membership = ContactList.contacts.through
+    members = Membership.objects.filter(contactlist_id=contact_list.id)
+    existing_ids = set(members.values_list("contact_id", flat=True).iterator())
+
+    to_add = set()
+    to_remove = set()
+    if operation in ("add", "replace"):
+        to_add = target_ids - existing_ids
+    if operation == "remove":
+        to_remove = target_ids & existing_ids
+    elif operation == "replace":
+        to_remove = existing_ids - target_ids
+
+    for chunk in _chunks(to_add, chunk_size):
+        with transaction.atomic():
+            Membership.objects.bulk_create(
+                [
+                    Membership(contactlist_id=contact_list.id, contact_id=contact_id)
+                    for contact_id in chunk
+                ],
+                ignore_conflicts=True,
+            )
+    for chunk in _chunks(to_remove, chunk_size):
+        with transaction.atomic():
+            members.filter(contact_id__in=chunk).delete()
+
+    return {"added": len(to_add), "removed": len(to_remove)}
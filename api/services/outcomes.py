@@ -0,0 +1,87 @@
+import asyncio
+import random
+from collections import namedtuple
+
+from aiohttp import ClientConnectionError, ClientConnectorError, ConnectionTimeoutError
+from requests.exceptions import ConnectionError as RequestsConnectionError
+from requests.exceptions import ConnectTimeout, Timeout
+from twilio.base.exceptions import TwilioRestException
+from urllib3.exceptions import MaxRetryError
+
+# HTTP statuses worth retrying: rate limiting and server-side failures
+TRANSIENT_STATUS_CODES = frozenset({408, 429, 500, 502, 503, 504})
+
+# prefix of the error of a dial that may or may not have placed a call
+OUTCOME_UNKNOWN = "Outcome unknown"
+
+
+class DialOutcome(
+    namedtuple("DialOutcome", ["call", "error", "error_code", "transient"])
+):
+    """Result of one ``calls.create`` attempt: the Twilio call on success,
+    otherwise the error, its HTTP status or Twilio error code, and whether
+    retrying might succeed."""
+
+    @property
+    def ok(self):
+        return self.call is not None
+
+    @classmethod
+    def success(cls, call):
+        return cls(call, None, None, False)
+
+    @classmethod
+    def failure(cls, exc):
+        if isinstance(exc, TwilioRestException):
+            return cls(
+                None,
+                str(exc.msg or exc),
+                exc.code or exc.status,
+                exc.status in TRANSIENT_STATUS_CODES,
+            )
+        error = str(exc) or type(exc).__name__
+        if is_transient(exc):
+            return cls(None, error, None, True)
+        if is_outcome_unknown(exc):
+            return cls(None, f"{OUTCOME_UNKNOWN}: {error}", None, False)
+        return cls(None, error, None, False)
+
+
+def is_transient(exc):
+    """Failures to connect to Twilio are transient, anything else is not.
+
+    Only these are safe to retry: once the request has been sent Twilio may
+    already have created the call, and a retry would ring the contact twice.
+    """
+    if isinstance(exc, TwilioRestException):
+        return exc.status in TRANSIENT_STATUS_CODES
+    # all three are raised before the request is sent
+    if isinstance(exc, (ConnectTimeout, ClientConnectorError, ConnectionTimeoutError)):
+        return True
+    if isinstance(exc, RequestsConnectionError):
+        # requests raises connect failures wrapped in MaxRetryError, and a
+        # connection dropped after sending as a bare ProtocolError
+        return bool(exc.args) and isinstance(exc.args[0], MaxRetryError)
+    return isinstance(exc, ConnectionRefusedError)
+
+
+def is_outcome_unknown(exc):
+    """Timeouts and dropped connections once the request was sent: the call
+    may or may not have been created."""
+    return isinstance(
+        exc,
+        (
+            RequestsConnectionError,
+            Timeout,
+            ClientConnectionError,
+            asyncio.TimeoutError,
+            TimeoutError,
+            ConnectionError,
+        ),
+    )
+
+
+def backoff_delay(attempt, base=1.0, cap=30.0, rand=random.random):
+    """Seconds to wait before retry ``attempt`` (1 for the first retry):
+    exponential backoff with full jitter."""
+    return rand() * min(cap, base * 2 ** (attempt - 1))
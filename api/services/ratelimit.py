@@ -0,0 +1,146 @@
+import logging
+import random
+import threading
+import time
+
+from django.conf import settings
+from django.db import DatabaseError, IntegrityError, OperationalError, transaction
+from django.db.models import F, Value
+from django.db.models.functions import Greatest
+
+from api.models import RateLimitBucket
+
+logger = logging.getLogger(__name__)
+
+
+class LocalBucketBackend:
+    """In-process token buckets, only shared between threads."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._tat = {}
+
+    def reserve(self, key, interval, now):
+        with self._lock:
+            start = max(self._tat.get(key, now), now)
+            self._tat[key] = start + interval
+        return start
+
+
+class DatabaseBucketBackend:
+    """Token buckets stored in RateLimitBucket rows, shared by every worker.
+
+    The bucket is advanced with a single conditional UPDATE before it is read,
+    so the row lock is taken up front and concurrent reservations serialize.
+    SQLite reports a lock held by another connection as an error instead of
+    waiting for it, so those reservations are retried for up to
+    ``lock_timeout`` seconds.
+    """
+
+    def __init__(self, lock_timeout=1.0, clock=time.monotonic, sleep=time.sleep):
+        self.lock_timeout = lock_timeout
+        self.clock = clock
+        self.sleep = sleep
+
+    def reserve(self, key, interval, now):
+        deadline = self.clock() + self.lock_timeout
+        while True:
+            try:
+                with transaction.atomic():
+                    updated = RateLimitBucket.objects.filter(key=key).update(
+                        tat=Greatest(F("tat"), Value(now)) + Value(interval)
+                    )
+                    if not updated:
+                        RateLimitBucket.objects.create(key=key, tat=now + interval)
+                        return now
+                    tat = RateLimitBucket.objects.values_list("tat", flat=True).get(
+                        key=key
+                    )
+                    return tat - interval
+            except IntegrityError:
+                # another worker created the bucket first, update it instead
+                continue
+            except OperationalError as e:
+                if "locked" not in str(e) or self.clock() >= deadline:
+                    raise
+                self.sleep(random.uniform(0, 0.002))
+
+
+class RateLimiter:
+    """Spaces out calls so each bucket stays under its calls-per-second rate.
+
+    ``acquire`` reserves the next free slot in every bucket that applies to
+    the call and sleeps until the latest of them; ``reserve`` only returns
+    the delay, for callers that wait on their own (the asyncio dialer).
+    Buckets are reserved from the most specific (from-number) to the most
+    general (account), so the account-wide rate is never exceeded.
+    """
+
+    def __init__(
+        self,
+        backend,
+        account_rate=0,
+        number_rate=0,
+        burst=1,
+        clock=time.time,
+        sleep=time.sleep,
+    ):
+        self.backend = backend
+        self.fallback = LocalBucketBackend()
+        self.account_rate = account_rate
+        self.number_rate = number_rate
+        self.burst = burst
+        self.clock = clock
+        self.sleep = sleep
+
+    @property
+    def enabled(self):
+        return bool(self.account_rate or self.number_rate)
+
+    def acquire(self, account_sid, from_number):
+        delay = self.reserve(account_sid, from_number)
+        if delay > 0:
+            self.sleep(delay)
+        return delay
+
+    def reserve(self, account_sid, from_number):
+        buckets = []
+        if self.number_rate:
+            buckets.append((f"number:{from_number}", self.number_rate))
+        if self.account_rate:
+            buckets.append((f"account:{account_sid}", self.account_rate))
+        if not buckets:
+            return 0
+
+        now = self.clock()
+        slot = now
+        for key, rate in buckets:
+            interval = 1.0 / rate
+            # a bucket of size ``burst`` lets that many calls through at once
+            allowance = interval * (self.burst - 1)
+            slot = max(slot, self._reserve(key, interval, slot) - allowance)
+
+        return max(slot - now, 0)
+
+    def _reserve(self, key, interval, now):
+        try:
+            return self.backend.reserve(key, interval, now)
+        except DatabaseError as e:
+            logger.warning(
+                f"Rate limit backend unavailable, using in-process bucket: {str(e)}"
+            )
+            return self.fallback.reserve(key, interval, now)
+
+
+def get_rate_limiter():
+    if getattr(settings, "DIALER_RATE_LIMIT_BACKEND", "database") == "local":
+        backend = LocalBucketBackend()
+    else:
+        backend = DatabaseBucketBackend()
+
+    return RateLimiter(
+        backend,
+        account_rate=getattr(settings, "TWILIO_ACCOUNT_CPS", 0),
+        number_rate=getattr(settings, "TWILIO_NUMBER_CPS", 0),
+        burst=getattr(settings, "DIALER_RATE_LIMIT_BURST", 1),
+    )
@@ -0,0 +1,144 @@
+import heapq
+import logging
+import time
+from collections import deque
+from itertools import count, islice
+
+from api.services.outcomes import backoff_delay
+
+logger = logging.getLogger(__name__)
+
+
+class DialScheduler:
+    """Decides what a dial engine dials next and what becomes of each call.
+
+    The thread-pool and asyncio engines only place the calls and wait for
+    them; the scheduler keeps everything else: the contacts read but not
+    dialed yet, the contact held while no caller ID can take it, the calls
+    in flight and the retry heap.
+
+    ``dispatch`` returns the next contact to dial with its attempt number
+    and from-number, taken from the ``caller_ids`` dispatcher, and ``start``
+    records the future or task placing that call, passing the contact to
+    ``on_dial`` on its first attempt. ``finish`` releases the
+    number and returns the ``(contact, outcome, attempts)`` result, or None
+    when the contact was put back to be retried. Transient failures are
+    retried up to ``retry_attempts`` attempts in all, after a jittered
+    exponential backoff; retries wait in a heap ordered by due time, so
+    other contacts keep being dialed in the meantime.
+    """
+
+    def __init__(
+        self,
+        contacts,
+        caller_ids,
+        retry_attempts=3,
+        retry_base_delay=1.0,
+        retry_max_delay=30.0,
+        clock=time.monotonic,
+        on_dial=None,
+    ):
+        self.contacts = iter(contacts)
+        self.caller_ids = caller_ids
+        self.retry_attempts = retry_attempts
+        self.retry_base_delay = retry_base_delay
+        self.retry_max_delay = retry_max_delay
+        self.clock = clock
+        self.on_dial = on_dial
+        self.pending = deque()
+        self.exhausted = False
+        self.held = None
+        self.in_flight = {}
+        self.retries = []
+        self.order = count()
+        # the outcome of the last attempt of each contact waiting for a retry
+        self.failures = {}
+
+    @property
+    def needs_contacts(self):
+        return not self.pending and not self.exhausted
+
+    @property
+    def finished(self):
+        return (
+            self.exhausted
+            and not self.pending
+            and self.held is None
+            and not self.in_flight
+            and not self.retries
+        )
+
+    def read_contacts(self, limit):
+        """Read up to ``limit`` more contacts to dial."""
+        batch = list(islice(self.contacts, limit))
+        self.pending.extend(batch)
+        self.exhausted = not batch
+
+    def dispatch(self):
+        """The next ``(contact, attempts, from_number)`` to dial, counting this
+        attempt, or None when nothing can be dialed right now."""
+        if self.held is not None:
+            (contact, attempts), self.held = self.held, None
+        elif self.retries and self.retries[0][0] <= self.clock():
+            _, _, contact, attempts = heapq.heappop(self.retries)
+        elif self.pending:
+            contact = self.pending.popleft()
+            attempts = 0
+        else:
+            return None
+
+        from_number = self.caller_ids.acquire(contact.phone_number)
+        if from_number is None:
+            # waits until a call ends or a number's cooldown runs out
+            self.held = (contact, attempts)
+            return None
+        return contact, attempts + 1, from_number
+
+    def start(self, call, dial):
+        self.in_flight[call] = dial
+        contact, attempts, _ = dial
+        if attempts == 1 and self.on_dial is not None:
+            self.on_dial(contact)
+
+    def finish(self, call, outcome):
+        contact, attempts, from_number = self.in_flight.pop(call)
+        self.caller_ids.release(from_number, outcome)
+        if not outcome.ok and outcome.transient and attempts < self.retry_attempts:
+            delay = backoff_delay(attempts, self.retry_base_delay, self.retry_max_delay)
+            logger.warning(
+                f"Retrying {contact.phone_number} in {delay:.2f}s "
+                f"after attempt {attempts}: {outcome.error}"
+            )
+            heapq.heappush(
+                self.retries,
+                (self.clock() + delay, next(self.order), contact, attempts),
+            )
+            self.failures[contact.id] = outcome
+            return None
+        self.failures.pop(contact.id, None)
+        return contact, outcome, attempts
+
+    def give_up(self):
+        """Stop retrying, returning the ``(contact, outcome, attempts)``
+        result of each contact that was waiting for a retry, with the
+        failure of its last attempt."""
+        waiting = [(contact, attempts) for _, _, contact, attempts in self.retries]
+        self.retries = []
+        if self.held is not None and self.held[1]:
+            waiting.append(self.held)
+            self.held = None
+        return [
+            (contact, self.failures.pop(contact.id), attempts)
+            for contact, attempts in waiting
+        ]
+
+    def next_wake(self):
+        """Seconds until there is something to do besides wait for calls in
+        flight: the next retry is due, or a number comes out of cooldown for
+        the held contact. None when there is neither."""
+        waits = []
+        if self.retries:
+            waits.append(max(0, self.retries[0][0] - self.clock()))
+        if self.held is not None and self.caller_ids.available_in() is not None:
+            waits.append(self.caller_ids.available_in())
+        return min(waits) if waits else None
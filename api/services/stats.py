@@ -0,0 +1,129 @@
+import logging
+from datetime import timezone
+from decimal import Decimal
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Sum
+from django.db.models.functions import TruncDate
+
+from api.models import TERMINAL_STATUS_RANK, CallRecord, CallStatsDaily
+
+logger = logging.getLogger(__name__)
+
+
+def record_call_stats(deltas):
+    """Add ``{(user_id, day, status): (calls, duration, cost)}`` deltas to
+    the rollups with one UPDATE per row, creating rows that do not exist."""
+    for (user_id, day, status), (calls, duration, cost) in deltas.items():
+        rows = CallStatsDaily.objects.filter(user_id=user_id, day=day, status=status)
+        update = {
+            field: F(field) + value
+            for field, value in (
+                ("calls", calls),
+                ("duration", duration),
+                ("cost", cost),
+            )
+            if value
+        }
+        if not update or rows.update(**update):
+            continue
+        try:
+            with transaction.atomic():
+                CallStatsDaily.objects.create(
+                    user_id=user_id,
+                    day=day,
+                    status=status,
+                    calls=calls,
+                    duration=duration,
+                    cost=cost,
+                )
+        except IntegrityError:
+            # created concurrently by another writer
+            rows.update(**update)
+
+
+def _add(deltas, key, duration=0, cost=0):
+    calls, total_duration, total_cost = deltas.get(key, (0, 0, Decimal(0)))
+    deltas[key] = (calls + 1, total_duration + duration, total_cost + Decimal(cost))
+
+
+def record_dialed_calls(call_records):
+    """Count newly written CallRecords in the rollups."""
+    deltas = {}
+    for record in call_records:
+        day = record.created_at.date()
+        _add(deltas, (record.user_id, day, CallStatsDaily.DIALED), cost=record.cost)
+        if record.status_rank == TERMINAL_STATUS_RANK:
+            _add(deltas, (record.user_id, day, record.status), record.duration)
+    record_call_stats(deltas)
+
+
+def record_ended_calls(rows):
+    """Count calls that have just moved into a terminal status, given as
+    CallRecord ``values()`` rows."""
+    deltas = {}
+    for row in rows:
+        key = (row["user_id"], row["created_at"].date(), row["status"])
+        _add(deltas, key, row["duration"])
+    record_call_stats(deltas)
+
+
+def record_duration_changes(records, duration):
+    """Move the rollup durations of ended ``records`` to ``duration``."""
+    deltas = {}
+    for user_id, created_at, status, old_duration in records.values_list(
+        "user_id", "created_at", "status", "duration"
+    ):
+        key = (user_id, created_at.date(), status)
+        calls, total, cost = deltas.get(key, (0, 0, Decimal(0)))
+        deltas[key] = (calls, total + duration - old_duration, cost)
+    record_call_stats(deltas)
+
+
+def compute_call_stats(call_records):
+    """Aggregate ``call_records`` into rollup deltas, the way they would have
+    been recorded incrementally."""
+    deltas = {}
+    day = TruncDate("created_at", tzinfo=timezone.utc)
+    dialed = call_records.values("user_id", day=day).annotate(
+        calls=Count("id"), total_cost=Sum("cost")
+    )
+    for row in dialed:
+        key = (row["user_id"], row["day"], CallStatsDaily.DIALED)
+        deltas[key] = (row["calls"], 0, row["total_cost"] or Decimal(0))
+
+    ended = (
+        call_records.filter(status_rank=TERMINAL_STATUS_RANK)
+        .values("user_id", "status", day=day)
+        .annotate(calls=Count("id"), total_duration=Sum("duration"))
+    )
+    for row in ended:
+        key = (row["user_id"], row["day"], row["status"])
+        deltas[key] = (row["calls"], row["total_duration"] or 0, Decimal(0))
+    return deltas
+
+
+def rebuild_call_stats(user_id=None):
+    """Replace the rollups of ``user_id``, or of every user, with totals
+    computed from CallRecords. Returns the number of rollup rows written."""
+    call_records = CallRecord.objects.all()
+    rollups = CallStatsDaily.objects.all()
+    if user_id is not None:
+        call_records = call_records.filter(user_id=user_id)
+        rollups = rollups.filter(user_id=user_id)
+
+    deltas = compute_call_stats(call_records)
+    with transaction.atomic():
+        rollups.delete()
+        CallStatsDaily.objects.bulk_create(
+            CallStatsDaily(
+                user_id=owner_id,
+                day=day,
+                status=status,
+                calls=calls,
+                duration=duration,
+                cost=cost,
+            )
+            for (owner_id, day, status), (calls, duration, cost) in deltas.items()
+        )
+    return len(deltas)
@@ -0,0 +1,65 @@
+import re
+from xml.sax.saxutils import escape
+
+from twilio.twiml.voice_response import VoiceResponse
+
+PLACEHOLDER_PATTERN = re.compile(r"\{(\w+)\}")
+PLACEHOLDER_FIELDS = ("first_name", "last_name", "city", "phone_number")
+
+# stands in for the personalized text while the TwiML skeleton is rendered
+_MARKER = "\x00message\x00"
+
+
+class MessageTemplate:
+    """A campaign message compiled once and rendered per contact.
+
+    The message is split into literal and placeholder parts up front, and the
+    surrounding TwiML document is serialized once, so rendering a contact is a
+    single join of pre-escaped literals and escaped contact fields.
+    """
+
+    def __init__(
+        self,
+        message,
+        voice="Woman",
+        language="en-US",
+        play_url="https://api.twilio.com/cowbell.mp3",
+    ):
+        self.message = message
+        self.parts = []
+
+        unknown = set()
+        position = 0
+        for match in PLACEHOLDER_PATTERN.finditer(message):
+            field = match.group(1)
+            if field not in PLACEHOLDER_FIELDS:
+                unknown.add(field)
+                continue
+            self.parts.append((False, escape(message[position : match.start()])))
+            self.parts.append((True, field))
+            position = match.end()
+        self.parts.append((False, escape(message[position:])))
+
+        if unknown:
+            raise ValueError(
+                f"Unknown placeholders in message: {', '.join(sorted(unknown))}"
+            )
+
+        response = VoiceResponse()
+        response.say(_MARKER, voice=voice, language=language)
+        if play_url:
+            response.play(play_url)
+        self.prefix, self.suffix = str(response).split(_MARKER)
+
+    def render(self, contact):
+        """Return the TwiML document for ``contact``."""
+        return "".join(
+            [
+                self.prefix,
+                *(
+                    escape(getattr(contact, value)) if is_field else value
+                    for is_field, value in self.parts
+                ),
+                self.suffix,
+            ]
+        )
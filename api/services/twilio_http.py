@@ -0,0 +1,96 @@
+import logging
+import os
+import threading
+
+from django.conf import settings
+from requests.adapters import HTTPAdapter
+from twilio.http.async_http_client import (
+    AsyncTwilioHttpClient as BaseAsyncTwilioHttpClient,
+)
+from twilio.http.http_client import TwilioHttpClient
+
+logger = logging.getLogger(__name__)
+
+
+class TwilioHttpClientRegistry:
+    """One keep-alive Twilio HTTP client per process, shared by every task.
+
+    Building a ``twilio.rest.Client`` without an ``http_client`` gives it a
+    fresh requests session, so each dial task used to open new connections
+    and repeat the TLS handshakes. The shared client's pool keeps up to
+    ``pool_size`` connections open, enough for the dialer's concurrency.
+
+    A forked child (Celery's prefork pool) must not share its parent's
+    sockets, so the client is dropped in the child and rebuilt on first use.
+    """
+
+    def __init__(self, pool_size=10, timeout=None, http_client_class=TwilioHttpClient):
+        self.pool_size = pool_size
+        self.timeout = timeout
+        self.http_client_class = http_client_class
+        self.lock = threading.Lock()
+        self.http_client = None
+        self.pid = os.getpid()
+
+    def get(self):
+        with self.lock:
+            if self.pid != os.getpid():
+                self.after_fork()
+            if self.http_client is None:
+                self.http_client = self.build()
+            return self.http_client
+
+    def build(self):
+        http_client = self.http_client_class(
+            pool_connections=True, timeout=self.timeout
+        )
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.pool_size)
+        http_client.session.mount("https://", adapter)
+        http_client.session.mount("http://", adapter)
+        logger.info(
+            f"Created Twilio HTTP client for process {os.getpid()} "
+            f"with {self.pool_size} pooled connections"
+        )
+        return http_client
+
+    def after_fork(self):
+        # the parent's sessions are abandoned rather than closed: closing
+        # them here would shut down sockets the parent is still using
+        self.lock = threading.Lock()
+        self.http_client = None
+        self.pid = os.getpid()
+
+
+class AsyncTwilioHttpClient(BaseAsyncTwilioHttpClient):
+    """Twilio's aiohttp client, honouring its own ``timeout``.
+
+    The Twilio client always passes ``timeout=None`` to ``request``, which
+    the base class hands on to aiohttp as "no timeout", overriding any
+    timeout set on the session. Fall back to the client's timeout instead,
+    as the requests-based client does.
+    """
+
+    async def request(self, method, url, *args, timeout=None, **kwargs):
+        return await super().request(
+            method,
+            url,
+            *args,
+            timeout=self.timeout if timeout is None else timeout,
+            **kwargs,
+        )
+
+
+_registry = None
+
+
+def get_twilio_http_client():
+    """Return this process's pooled Twilio HTTP client."""
+    global _registry
+    if _registry is None:
+        _registry = TwilioHttpClientRegistry(
+            pool_size=getattr(settings, "TWILIO_HTTP_POOL_SIZE", 10),
+            timeout=getattr(settings, "TWILIO_HTTP_TIMEOUT", None),
+        )
+        if hasattr(os, "register_at_fork"):
+            os.register_at_fork(after_in_child=_registry.after_fork)
+    return _registry.get()
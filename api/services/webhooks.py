@@ -0,0 +1,314 @@
+import atexit
+import logging
+import os
+import threading
+import time
+from datetime import timedelta
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.db.models import Case, F, Value, When
+from django.utils import timezone
+
+from api.models import TERMINAL_STATUS_RANK, CallRecord, CallStatusEvent, status_rank
+from api.services.campaigns import record_ended_campaign_calls
+from api.services.events import notify_calls_changed
+from api.services.stats import record_duration_changes, record_ended_calls
+
+logger = logging.getLogger(__name__)
+
+
+def _advance_status_query(records, call_status, duration=None):
+    rank = status_rank(call_status)
+    update = {"status": call_status, "status_rank": rank}
+    if duration is not None:
+        update["duration"] = duration
+    return records.filter(status_rank__lt=rank), update
+
+
+def advance_status(records, call_status, duration=None):
+    """Move ``records`` to ``call_status`` in a single conditional UPDATE.
+
+    Only rows whose status is earlier in the call lifecycle are changed, so
+    late or duplicated callbacks never move a call backwards. ``duration``
+    may be a value or an expression. Returns the number of rows updated.
+    """
+    records, update = _advance_status_query(records, call_status, duration)
+    return records.update(**update)
+
+
+def refresh_status(records, call_status, duration=None):
+    """Apply the duration of a repeated callback to rows already in
+    ``call_status``. Returns the number of matching rows."""
+    records = records.filter(status=call_status)
+    if duration is None:
+        return records.count()
+    if status_rank(call_status) == TERMINAL_STATUS_RANK:
+        record_duration_changes(records.exclude(duration=duration), duration)
+    return records.update(duration=duration)
+
+
+def end_calls(records, call_status, duration=None):
+    """Move ``records`` to the terminal ``call_status`` and count the calls
+    that ended in the rollups. Returns the number of rows updated.
+
+    The rows are locked before the UPDATE so concurrent callbacks for the
+    same call cannot both count it. Their campaigns' ``completed`` counters
+    are updated along with the rollups.
+    """
+    with transaction.atomic():
+        ids = list(
+            records.select_for_update()
+            .filter(status_rank__lt=TERMINAL_STATUS_RANK)
+            .values_list("id", flat=True)
+        )
+        if not ids:
+            return 0
+        ended = CallRecord.objects.filter(id__in=ids)
+        updated = advance_status(ended, call_status, duration)
+        rows = list(
+            ended.values("user_id", "created_at", "status", "duration", "campaign_id")
+        )
+        record_ended_calls(rows)
+        record_ended_campaign_calls(rows)
+    return updated
+
+
+def _apply_one(sid, call_status, duration=None):
+    # returns True if the call has a record
+    records = CallRecord.objects.filter(sid=sid)
+    if status_rank(call_status) == TERMINAL_STATUS_RANK:
+        if end_calls(records, call_status, duration):
+            notify_calls_changed([sid])
+            return True
+    elif advance_status(records, call_status, duration):
+        notify_calls_changed([sid])
+        return True
+    if refresh_status(records, call_status, duration) or records.exists():
+        logger.info(f"Ignored out-of-order {call_status} callback for SID: {sid}")
+        return True
+    return False
+
+
+def coalesce_status_events(events):
+    """Reduce ``(sid, status, duration)`` events to the furthest status per
+    SID; among equally ranked events the one received last wins."""
+    latest = {}
+    for sid, call_status, duration in events:
+        current = latest.get(sid)
+        if current is None or status_rank(call_status) >= status_rank(current[0]):
+            latest[sid] = (call_status, duration)
+    return latest
+
+
+def _apply_coalesced(latest):
+    # one UPDATE per distinct status, with per-SID durations spliced in
+    by_status = {}
+    for sid, (call_status, duration) in latest.items():
+        by_status.setdefault(call_status, []).append((sid, duration))
+
+    updated = 0
+    for call_status, entries in by_status.items():
+        durations = [
+            When(sid=sid, then=Value(duration))
+            for sid, duration in entries
+            if duration is not None
+        ]
+        apply = (
+            end_calls
+            if status_rank(call_status) == TERMINAL_STATUS_RANK
+            else advance_status
+        )
+        sids = [sid for sid, _ in entries]
+        applied = apply(
+            CallRecord.objects.filter(sid__in=sids),
+            call_status,
+            Case(*durations, default=F("duration")) if durations else None,
+        )
+        if applied:
+            notify_calls_changed(sids)
+        updated += applied
+    return updated
+
+
+def apply_pending_status_events(sids):
+    """Apply status callbacks that were received before their CallRecord
+    existed, then drop them."""
+    events = CallStatusEvent.objects.filter(sid__in=sids).order_by("received_at")
+    latest = coalesce_status_events(
+        events.values_list("sid", "status", "duration").iterator()
+    )
+    if not latest:
+        return 0
+
+    _apply_coalesced(latest)
+    CallStatusEvent.objects.filter(sid__in=latest).delete()
+
+    logger.info(f"Reconciled {len(latest)} early status callbacks")
+    return len(latest)
+
+
+def prune_status_events(max_age):
+    """Drop parked callbacks older than ``max_age`` seconds. Their calls
+    never got a CallRecord (it failed to build after the call was placed,
+    or the callback was not for one of our calls), so nothing will ever
+    apply them."""
+    cutoff = timezone.now() - timedelta(seconds=max_age)
+    pruned, _ = CallStatusEvent.objects.filter(received_at__lt=cutoff).delete()
+    if pruned:
+        logger.info(f"Pruned {pruned} status callbacks without a CallRecord")
+    return pruned
+
+
+def _park_status_events(latest):
+    CallStatusEvent.objects.bulk_create(
+        CallStatusEvent(sid=sid, status=call_status, duration=duration)
+        for sid, (call_status, duration) in latest.items()
+    )
+    # a flush may have landed between the lookup and the insert above
+    apply_pending_status_events(
+        CallRecord.objects.filter(sid__in=latest).values_list("sid", flat=True)
+    )
+
+
+def apply_status_event(sid, call_status, duration=None):
+    """Apply one status callback. Returns False if the call has no record
+    yet and the event was parked for the dialer's next flush."""
+    if _apply_one(sid, call_status, duration):
+        return True
+
+    _park_status_events({sid: (call_status, duration)})
+    return False
+
+
+async def aapply_status_event(sid, call_status, duration=None):
+    """Async counterpart of ``apply_status_event`` for ASGI views."""
+    records = CallRecord.objects.filter(sid=sid)
+    if status_rank(call_status) == TERMINAL_STATUS_RANK:
+        if await sync_to_async(end_calls)(records, call_status, duration):
+            notify_calls_changed([sid])
+            return True
+    else:
+        transitions, update = _advance_status_query(records, call_status, duration)
+        if await transitions.aupdate(**update):
+            notify_calls_changed([sid])
+            return True
+    if await sync_to_async(refresh_status)(records, call_status, duration) or (
+        await records.aexists()
+    ):
+        logger.info(f"Ignored out-of-order {call_status} callback for SID: {sid}")
+        return True
+
+    await sync_to_async(_park_status_events)({sid: (call_status, duration)})
+    return False
+
+
+def apply_status_events(events):
+    """Apply a batch of ``(sid, status, duration)`` status callbacks.
+
+    Events are coalesced per SID and written with one conditional UPDATE per
+    distinct status. Events for calls the dialer has not flushed yet are
+    parked as CallStatusEvents.
+    """
+    latest = coalesce_status_events(events)
+    updated = _apply_coalesced(latest)
+
+    if updated < len(latest):
+        # some SIDs were stale or unknown, only the unknown ones are parked
+        known = CallRecord.objects.filter(sid__in=latest).values_list("sid", flat=True)
+        for sid in known:
+            del latest[sid]
+        if latest:
+            _park_status_events(latest)
+
+    return updated
+
+
+class StatusEventQueue:
+    """In-process queue of status callbacks applied by a background thread.
+
+    The thread wakes up when ``size`` events are waiting or ``interval``
+    seconds have passed, and applies everything queued so far as one batch.
+    Events are only held in memory: ``stop`` applies what is left on a clean
+    shutdown, but those queued when the process is killed are lost.
+    """
+
+    def __init__(self, size=500, interval=0.5, autostart=True):
+        self.size = size
+        self.interval = interval
+        self.autostart = autostart
+        self.events = []
+        self.condition = threading.Condition()
+        self.thread = None
+        self.stopped = False
+
+    def put(self, sid, call_status, duration=None):
+        with self.condition:
+            self.events.append((sid, call_status, duration))
+            if self.autostart and self.thread is None:
+                self.start()
+            if len(self.events) >= self.size:
+                self.condition.notify()
+
+    def start(self):
+        self.thread = threading.Thread(
+            target=self.run, name="status-event-queue", daemon=True
+        )
+        self.thread.start()
+
+    def run(self):
+        while True:
+            with self.condition:
+                if len(self.events) < self.size and not self.stopped:
+                    self.condition.wait(self.interval)
+                stopped = self.stopped
+            close_old_connections()
+            try:
+                self.flush()
+            except Exception as e:
+                logger.error(
+                    f"Error applying status callbacks: {str(e)}", exc_info=True
+                )
+                time.sleep(self.interval)
+            if stopped:
+                return
+
+    def stop(self):
+        with self.condition:
+            self.stopped = True
+            self.condition.notify()
+        if self.thread is not None:
+            self.thread.join()
+        else:
+            self.flush()
+
+    def flush(self):
+        with self.condition:
+            events, self.events = self.events, []
+        if not events:
+            return 0
+        try:
+            return apply_status_events(events)
+        except Exception:
+            # put the batch back so the next flush retries it
+            with self.condition:
+                self.events[:0] = events
+            raise
+
+
+_queue = None
+_queue_pid = None
+
+
+def get_status_event_queue():
+    global _queue, _queue_pid
+    # the queue's thread does not survive a fork, so each process gets its own
+    if _queue is None or _queue_pid != os.getpid():
+        _queue = StatusEventQueue(
+            size=getattr(settings, "TWILIO_WEBHOOK_BATCH_SIZE", 500),
+            interval=getattr(settings, "TWILIO_WEBHOOK_BATCH_INTERVAL", 0.5),
+        )
+        _queue_pid = os.getpid()
+        atexit.register(_queue.stop)
+    return _queue
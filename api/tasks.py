@@ -1,25 +1,251 @@
 import logging
+from uuid import uuid4
 
-from celery import shared_task
+from celery import chord, shared_task
 from celery.result import AsyncResult
 from django.conf import settings
+from django.core.files.storage import default_storage
 
+from api.models import ContactList, DialCampaign
+from api.services.accounts import get_shard_router
+from api.services.campaigns import (
+    campaign_progress,
+    finish_campaign,
+    release_failed_dials,
+    resume_campaign,
+    start_campaign,
+)
+from api.services.contacts import list_contact_ids
 from api.services.dialer import TwilioDialerService
+from api.services.importer import ContactImporter, iter_rows
+from api.services.webhooks import prune_status_events
 
 logger = logging.getLogger(__name__)
 
 
+def get_dialer_service(account_sid=None):
+    """Dialer for the configured Twilio account ``account_sid``, or the
+    first configured account."""
+    router = get_shard_router()
+    account = router.get(account_sid) if account_sid else router.route(None)
+    return TwilioDialerService(account.sid, account.auth_token)
+
+
+def plan_chunks(contact_ids, chunk_size):
+    """Split sorted contact ids into inclusive ``[first, last]`` ranges of
+    ``chunk_size`` contacts, returning the ranges and the number of ids.
+
+    The ids are consumed one at a time and only the bounds of each range are
+    kept, so ``contact_ids`` can stream a list of any size.
+    """
+    chunk_bounds = []
+    total = 0
+    for total, contact_id in enumerate(contact_ids, 1):
+        if (total - 1) % chunk_size == 0:
+            chunk_bounds.append([contact_id, contact_id])
+        else:
+            chunk_bounds[-1][1] = contact_id
+    return chunk_bounds, total
+
+
+@shared_task(bind=True)
+def dial(self, id, message, chunk_size=None, campaign_id=None):
+    if chunk_size is None:
+        chunk_size = getattr(settings, "DIAL_CHUNK_SIZE", 0)
+
+    campaign = None
+    if campaign_id is not None:
+        campaign = DialCampaign.objects.filter(pk=campaign_id).first()
+
+    if campaign is not None and campaign.chunk_bounds is not None:
+        # rerun of a campaign: reuse its chunks, each resumes after the
+        # contacts it already claimed
+        chunk_bounds = campaign.chunk_bounds
+        resume_campaign(campaign_id)
+        logger.info(f"Resuming campaign {campaign_id}")
+    else:
+        try:
+            contact_ids = list_contact_ids(ContactList.objects.get(id=id))
+            if chunk_size:
+                chunk_bounds, total = plan_chunks(
+                    contact_ids.iterator(chunk_size=2000), chunk_size
+                )
+            else:
+                total = contact_ids.count()
+        except Exception:
+            finish_campaign(campaign_id, failed=True)
+            raise
+        if not chunk_size or total <= chunk_size:
+            chunk_bounds = [[None, None]]
+        start_campaign(campaign_id, total, chunk_bounds)
+
+    router = get_shard_router()
+    if len(chunk_bounds) == 1:
+        return dial_chunk(
+            id,
+            message,
+            chunk_bounds[0],
+            campaign_id=campaign_id,
+            last=True,
+            account_sid=router.route(campaign_id).sid,
+        )
+
+    # pre-assign the chunk task ids so check_dial_status can report progress
+    # while the chord is running under this task's id
+    header = [
+        dial_chunk.s(
+            id,
+            message,
+            bounds,
+            campaign_id=campaign_id,
+            account_sid=router.route(campaign_id, chunk).sid,
+        ).set(task_id=str(uuid4()))
+        for chunk, bounds in enumerate(chunk_bounds)
+    ]
+    logger.info(f"Fanning out contact list {id} into {len(header)} chunks")
+
+    if not self.request.is_eager:
+        self.update_state(
+            state="PROGRESS",
+            meta={"chunks": [sig.options["task_id"] for sig in header]},
+        )
+
+    return self.replace(
+        chord(
+            header,
+            aggregate_dial_results.s(campaign_id=campaign_id).on_error(
+                fail_dial_campaign.s(campaign_id=campaign_id)
+            ),
+        )
+    )
+
+
+# a chunk whose worker dies is redelivered and resumes where it stopped
+@shared_task(acks_late=True, reject_on_worker_lost=True)
+def dial_chunk(id, message, id_range, campaign_id=None, last=False, account_sid=None):
+    try:
+        result = get_dialer_service(account_sid).dialContactList(
+            id, message, id_range=id_range, campaign_id=campaign_id
+        )
+    except Exception:
+        # a fanned-out campaign fails once all its chunks are done, through
+        # fail_dial_campaign, so it is never resumed while one is running
+        if last:
+            finish_campaign(campaign_id, failed=True)
+        raise
+    if last:
+        finish_campaign(campaign_id)
+    return result
+
+
+@shared_task
+def fail_dial_campaign(request, exc, traceback, campaign_id=None):
+    """Errback of a fanned-out dial's chord, run after every chunk ended."""
+    logger.error(f"Dial campaign {campaign_id} failed: {exc}")
+    finish_campaign(campaign_id, failed=True)
+
+
+@shared_task(acks_late=True, reject_on_worker_lost=True)
+def redial_contacts(campaign_id, contact_ids):
+    """Dial contacts released from the FailedDial dead letter again."""
+    campaign = DialCampaign.objects.get(pk=campaign_id)
+    account = get_shard_router().route(campaign_id)
+    return get_dialer_service(account.sid).dialContactList(
+        campaign.contact_list_id,
+        campaign.message,
+        contact_ids=contact_ids,
+        campaign_id=campaign_id,
+    )
+
+
+def redrive_failed_dials(failed_dials):
+    """Queue the still pending ``failed_dials`` for redialing, in tasks of
+    at most ``DIAL_CHUNK_SIZE`` contacts. Returns the number redriven."""
+    chunk_size = getattr(settings, "DIAL_CHUNK_SIZE", 0) or 1000
+    redriven = 0
+    for campaign_id, contact_ids in release_failed_dials(failed_dials).items():
+        for i in range(0, len(contact_ids), chunk_size):
+            redial_contacts.delay(campaign_id, contact_ids[i : i + chunk_size])
+        redriven += len(contact_ids)
+        logger.info(
+            f"Redriving {len(contact_ids)} failed dials of campaign {campaign_id}"
+        )
+    return redriven
+
+
 @shared_task
-def dial(id, message):
-    # try:
+def aggregate_dial_results(results, campaign_id=None):
+    aggregate = {"chunks": len(results), "dialed": 0, "failed": 0}
+    for result in results:
+        aggregate["dialed"] += result["dialed"]
+        aggregate["failed"] += result["failed"]
+    finish_campaign(campaign_id)
+    return aggregate
+
 
-    dialer_service = TwilioDialerService(
-        getattr(settings, "TWILIO_ACCOUNT_SID"), getattr(settings, "TWILIO_AUTH_TOKEN")
+@shared_task
+def prune_parked_status_events():
+    return prune_status_events(
+        getattr(settings, "CALL_STATUS_EVENT_MAX_AGE", 24 * 60 * 60)
     )
 
-    dialer_service.dialContactList(id, message)
 
-    return True
+def get_dial_status(task_id, user=None):
+    """Return the ``(payload, http_status)`` reported for a dial task.
+
+    Dials started as campaigns are answered from their DialCampaign row; the
+    result backend is only asked about tasks without one.
+    """
+    campaigns = DialCampaign.objects.filter(task_id=task_id)
+    if user is not None:
+        campaigns = campaigns.filter(user=user)
+    campaign = campaigns.first()
+    if campaign is not None:
+        return campaign_progress(campaign)
+    return get_task_status(task_id)
+
+
+def get_task_status(task_id):
+    """Return the ``(payload, http_status)`` the result backend reports for a
+    dial task without a DialCampaign."""
+    task_result = AsyncResult(task_id)
+    if task_result.ready():
+        if task_result.successful():
+            return {"status": "completed", "result": task_result.result}, 200
+        return {"status": "failed", "error": str(task_result.result)}, 500
+
+    if task_result.state == "PROGRESS":
+        # fanned-out dial: the chord callback has not run yet
+        chunks = [AsyncResult(chunk_id) for chunk_id in task_result.info["chunks"]]
+        return {
+            "status": "in_progress",
+            "chunks": len(chunks),
+            "chunks_completed": sum(chunk.ready() for chunk in chunks),
+        }, 200
+
+    return {"status": task_result.state.lower()}, 200
+
+
+@shared_task(bind=True)
+def import_contacts(self, user_id, path, file_format):
+    def report_progress(counts):
+        if not self.request.is_eager:
+            self.update_state(state="PROGRESS", meta=counts)
+
+    importer = ContactImporter(
+        user_id,
+        chunk_size=getattr(settings, "CONTACT_IMPORT_CHUNK_SIZE", 2000),
+        region=getattr(settings, "PHONE_NUMBER_DEFAULT_REGION", "US"),
+        progress=report_progress,
+    )
+    try:
+        with default_storage.open(path, "rb") as stream:
+            counts = importer.run(iter_rows(stream, file_format))
+    finally:
+        default_storage.delete(path)
+
+    logger.info(f"Imported contacts for user {user_id}: {counts}")
+    return counts
 
 
 @shared_task(name="api.tasks.test_task")
@@ -1,17 +1,23 @@
 from django.urls import include, path
 from rest_framework.routers import DefaultRouter
 
+from api import async_views
 from api.views import (
     AddToContactListViewset,
     CallRecordViewSet,
+    CallStatsView,
     ContactListViewSet,
     ContactViewSet,
+    DialCampaignViewSet,
+    FailedDialViewSet,
     TwilioWebhookView,
 )
 
 router = DefaultRouter()
 router.register(r"contacts", ContactViewSet, basename="contact")
 router.register(r"contact-lists", ContactListViewSet, basename="contactlist")
+router.register(r"campaigns", DialCampaignViewSet, basename="dialcampaign")
+router.register(r"failed-dials", FailedDialViewSet, basename="faileddial")
 router.register(r"call-records", CallRecordViewSet, basename="callrecord")
 router.register(
     r"update-contact-list", AddToContactListViewset, basename="updatecontactlist"
@@ -19,5 +25,17 @@ router.register(
 
 urlpatterns = [
     path("", include(router.urls)),
+    path("call-stats/", CallStatsView.as_view(), name="call-stats"),
     path("twilio-webhook/", TwilioWebhookView.as_view(), name="twilio-webhook"),
+    path(
+        "async/twilio-webhook/",
+        async_views.twilio_webhook,
+        name="twilio-webhook-async",
+    ),
+    path(
+        "async/dial-status/",
+        async_views.check_dial_status,
+        name="dial-status-async",
+    ),
+    path("async/events/", async_views.progress_events, name="progress-events"),
 ]
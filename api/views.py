@@ -1,33 +1,85 @@
+import csv
 import logging
+from datetime import timedelta
+from decimal import Decimal
 
-from celery.result import AsyncResult
 from django.conf import settings
+from django.core.files.storage import default_storage
+from django.db.models import Count
+from django.http import StreamingHttpResponse
 from django.shortcuts import get_object_or_404
-from django_celery_results.models import TaskResult
+from django.utils import timezone
+from django.utils.dateparse import parse_date
 from django_filters import rest_framework as filters
 from rest_framework import status, viewsets
 from rest_framework.decorators import action
-from rest_framework.pagination import PageNumberPagination
+from rest_framework.pagination import CursorPagination
+from rest_framework.parsers import MultiPartParser
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
-from api.models import CallRecord, Contact, ContactList
+from api.models import (
+    CallRecord,
+    CallStatsDaily,
+    Contact,
+    ContactList,
+    DialCampaign,
+    FailedDial,
+    phone_digits,
+)
 from api.serializers import (
     AddToContactListSerializer,
     CallRecordSerializer,
+    ContactImportSerializer,
+    ContactListMembershipSerializer,
     ContactListSerializer,
     ContactSerializer,
+    DialCampaignSerializer,
+    FailedDialRedriveSerializer,
+    FailedDialSerializer,
 )
-from api.tasks import dial
+from api.services.campaigns import campaign_progress
+from api.services.export import CONTENT_TYPES, EXPORT_FORMATS, export_call_records
+from api.services.importer import ContactImporter, iter_rows
+from api.services.membership import compile_contact_filter, update_membership
+from api.services.templates import MessageTemplate
+from api.services.webhooks import apply_status_event, get_status_event_queue
+from api.tasks import dial, get_dial_status, import_contacts, redrive_failed_dials
 
 logger = logging.getLogger(__name__)
 
 
-class CallRecordPagination(PageNumberPagination):
+class CallRecordPagination(CursorPagination):
+    """Keyset pagination over the (user, created_at) index.
+
+    Every page costs the same however deep it is. The total is only counted
+    when the client asks for it with ``?include_count=true``.
+    """
+
     page_size = 20
     page_size_query_param = "page_size"
     max_page_size = 100
+    ordering = ("-created_at", "-id")
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.count = None
+        if request.query_params.get("include_count") in ("1", "true"):
+            self.count = queryset.count()
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        response = super().get_paginated_response(data)
+        if self.count is not None:
+            response.data["count"] = self.count
+        return response
+
+
+class ContactCursorPagination(CursorPagination):
+    page_size = 100
+    page_size_query_param = "page_size"
+    max_page_size = 1000
+    ordering = "id"
 
 
 class ContactViewSet(viewsets.ModelViewSet):
@@ -46,13 +98,82 @@ class ContactViewSet(viewsets.ModelViewSet):
         contact.delete()
         return Response(status=status.HTTP_204_NO_CONTENT)
 
+    @action(
+        detail=False,
+        methods=["post"],
+        url_path="import",
+        parser_classes=[MultiPartParser],
+    )
+    def import_contacts(self, request):
+        serializer = ContactImportSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        upload = serializer.validated_data["file"]
+        file_format = serializer.validated_data["file_format"]
+
+        try:
+            if upload.size > getattr(settings, "CONTACT_IMPORT_ASYNC_THRESHOLD", 0):
+                path = default_storage.save(
+                    f"imports/{request.user.id}.{file_format}", upload
+                )
+                task = import_contacts.delay(request.user.id, path, file_format)
+                return Response(
+                    {"message": "Import started", "task_id": task.id},
+                    status=status.HTTP_202_ACCEPTED,
+                )
+
+            importer = ContactImporter(
+                request.user.id,
+                chunk_size=getattr(settings, "CONTACT_IMPORT_CHUNK_SIZE", 2000),
+                region=getattr(settings, "PHONE_NUMBER_DEFAULT_REGION", "US"),
+            )
+            counts = importer.run(iter_rows(upload, file_format))
+            return Response(counts, status=status.HTTP_201_CREATED)
+        except (csv.Error, UnicodeDecodeError) as e:
+            return Response(
+                {"error": f"The file could not be read as {file_format}: {str(e)}"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        except Exception as e:
+            logger.error(f"Error in ContactViewSet import_contacts: {str(e)}")
+            return Response(
+                {"error": "An error occurred while importing contacts."},
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            )
+
+    @action(detail=False, methods=["GET"])
+    def import_status(self, request):
+        task_id = request.query_params.get("task_id")
+        if not task_id:
+            return Response(
+                {"error": "No task_id provided"}, status=status.HTTP_400_BAD_REQUEST
+            )
+
+        task_result = import_contacts.AsyncResult(task_id)
+        if task_result.ready() and not task_result.successful():
+            return Response(
+                {"status": "failed", "error": str(task_result.result)},
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            )
+        return Response(
+            {
+                "status": task_result.state.lower(),
+                "counts": (
+                    task_result.result if task_result.ready() else task_result.info
+                ),
+            },
+            status=status.HTTP_200_OK,
+        )
+
 
 class ContactListViewSet(viewsets.ModelViewSet):
     serializer_class = ContactListSerializer
     perimssion_classes = (IsAuthenticated,)
 
     def get_queryset(self):
-        return ContactList.objects.filter(user=self.request.user)
+        queryset = ContactList.objects.filter(user=self.request.user)
+        if self.action in ("list", "retrieve"):
+            queryset = queryset.annotate(contact_count=Count("contacts"))
+        return queryset
 
     def perform_create(self, serializer):
         serializer.save(user=self.request.user)
@@ -62,6 +183,20 @@ class ContactListViewSet(viewsets.ModelViewSet):
         contact_list.delete()
         return Response(status=status.HTTP_204_NO_CONTENT)
 
+    @action(detail=True, methods=["get"])
+    def contacts(self, request, pk=None):
+        contact_list = self.get_object()
+        if contact_list.is_dynamic:
+            contacts = compile_contact_filter(
+                contact_list.user_id, contact_list.segment
+            )
+        else:
+            contacts = Contact.objects.filter(contactlist=contact_list)
+
+        paginator = ContactCursorPagination()
+        page = paginator.paginate_queryset(contacts, request, view=self)
+        return paginator.get_paginated_response(ContactSerializer(page, many=True).data)
+
     @action(detail=True, methods=["post"])
     def dial(self, request, pk=None):
         try:
@@ -72,12 +207,22 @@ class ContactListViewSet(viewsets.ModelViewSet):
                 return Response(
                     {"error": "Message is required"}, status=status.HTTP_400_BAD_REQUEST
                 )
-            task = dial.delay(contact_list.id, message)
+            try:
+                MessageTemplate(message)
+            except ValueError as e:
+                return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+            campaign = DialCampaign.objects.create(
+                user=request.user, contact_list=contact_list, message=message
+            )
+            task = dial.delay(contact_list.id, message, campaign_id=campaign.id)
+            DialCampaign.objects.filter(pk=campaign.id).update(task_id=task.id)
 
             return Response(
                 {
                     "message": f"Initiated calls from {contact_list.name} ",
                     "task_id": task.id,
+                    "campaign_id": campaign.id,
                 },
                 status=status.HTTP_202_ACCEPTED,
             )
@@ -88,17 +233,43 @@ class ContactListViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR,
             )
 
+    @action(detail=True, methods=["post"])
+    def members(self, request, pk=None):
+        contact_list = self.get_object()
+        serializer = ContactListMembershipSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        try:
+            result = update_membership(
+                contact_list,
+                serializer.validated_data["operation"],
+                contact_ids=serializer.validated_data.get("contact_ids"),
+                contact_filter=serializer.validated_data.get("filter"),
+            )
+        except ValueError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        return Response(result, status=status.HTTP_200_OK)
+
     @action(detail=False, methods=["GET"])
     def latest_task_ids(self, request):
-        latest_tasks = TaskResult.objects.filter(task_name="api.tasks.dial").order_by(
-            "-date_done"
-        )[:5]
-
-        task_ids = [task.task_id for task in latest_tasks]
+        task_ids = list(
+            DialCampaign.objects.filter(user=request.user, task_id__isnull=False)
+            .order_by("-created_at")
+            .values_list("task_id", flat=True)[:5]
+        )
         return Response({"latest_task_ids": task_ids}, status=status.HTTP_200_OK)
 
     @action(detail=False, methods=["GET"])
     def check_dial_status(self, request):
+        campaign_id = request.query_params.get("campaign_id")
+        if campaign_id:
+            campaign = get_object_or_404(
+                DialCampaign, pk=campaign_id, user=request.user
+            )
+            payload, status_code = campaign_progress(campaign)
+            return Response(payload, status=status_code)
+
         task_id = request.query_params.get("task_id")
         if not task_id:
             return Response(
@@ -106,26 +277,8 @@ class ContactListViewSet(viewsets.ModelViewSet):
             )
 
         try:
-            task_result = AsyncResult(task_id)
-            if task_result.ready():
-                if task_result.successful():
-                    return Response(
-                        {"status": "completed", "result": task_result.result},
-                        status=status.HTTP_200_OK,
-                    )
-                else:
-                    return Response(
-                        {"status": "failed", "error": str(task_result.result)},
-                        status=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                    )
-                # else:
-                #     error_info = task_result.info
-                #     return Response({
-                #             "status": "failed",
-                #             "error": str(error_info.get('exc_message', 'Unknown error')),
-                #             "error_type": error_info.get('exc_type', 'Unknown'),
-                #             "traceback": error_info.get('traceback', 'No traceback available')
-                #         }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+            payload, status_code = get_dial_status(task_id, user=request.user)
+            return Response(payload, status=status_code)
         except Exception as e:
             logger.error(f"Error in check_dial_status: {str(e)}")
             return Response(
@@ -134,17 +287,144 @@ class ContactListViewSet(viewsets.ModelViewSet):
             )
 
 
+class DialCampaignViewSet(viewsets.ReadOnlyModelViewSet):
+    """Dial campaigns and their progress counters, newest first. ``resume``
+    reruns a failed campaign, dialing only the contacts it has not taken."""
+
+    serializer_class = DialCampaignSerializer
+    permission_classes = (IsAuthenticated,)
+
+    def get_queryset(self):
+        return DialCampaign.objects.filter(user=self.request.user).order_by(
+            "-created_at"
+        )
+
+    @action(detail=True, methods=["post"])
+    def resume(self, request, pk=None):
+        campaign = self.get_object()
+        if campaign.contact_list_id is None:
+            return Response(
+                {"error": "The campaign's contact list was deleted"},
+                status=status.HTTP_409_CONFLICT,
+            )
+        # a single conditional update, so the campaign is only resumed once
+        # and never while a run of it may still be dialing
+        resumed = DialCampaign.objects.filter(
+            pk=campaign.id, status=DialCampaign.FAILED
+        ).update(status=DialCampaign.PENDING, finished_at=None)
+        if not resumed:
+            return Response(
+                {"error": "Only a failed campaign can be resumed"},
+                status=status.HTTP_409_CONFLICT,
+            )
+
+        try:
+            task = dial.delay(
+                campaign.contact_list_id, campaign.message, campaign_id=campaign.id
+            )
+        except Exception:
+            DialCampaign.objects.filter(pk=campaign.id).update(
+                status=DialCampaign.FAILED
+            )
+            raise
+        DialCampaign.objects.filter(pk=campaign.id).update(task_id=task.id)
+        return Response(
+            {"task_id": task.id, "campaign_id": campaign.id},
+            status=status.HTTP_202_ACCEPTED,
+        )
+
+
+class FailedDialPagination(CursorPagination):
+    page_size = 100
+    page_size_query_param = "page_size"
+    max_page_size = 1000
+    ordering = ("-created_at", "-id")
+
+
+class FailedDialViewSet(viewsets.ReadOnlyModelViewSet):
+    """Dead-lettered dials. ``?campaign=`` and ``?pending=true`` narrow the
+    list; ``redrive`` hands matching contacts back to the dialer."""
+
+    serializer_class = FailedDialSerializer
+    permission_classes = (IsAuthenticated,)
+    pagination_class = FailedDialPagination
+
+    def get_queryset(self):
+        failed_dials = FailedDial.objects.filter(user=self.request.user)
+        campaign_id = self.request.query_params.get("campaign")
+        if campaign_id:
+            failed_dials = failed_dials.filter(campaign_id=campaign_id)
+        if self.request.query_params.get("pending") in ("1", "true"):
+            failed_dials = failed_dials.filter(redriven_at__isnull=True)
+        return failed_dials
+
+    @action(detail=False, methods=["post"])
+    def redrive(self, request):
+        serializer = FailedDialRedriveSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        failed_dials = FailedDial.objects.filter(user=request.user)
+        if "campaign_id" in serializer.validated_data:
+            failed_dials = failed_dials.filter(
+                campaign_id=serializer.validated_data["campaign_id"]
+            )
+        if "ids" in serializer.validated_data:
+            failed_dials = failed_dials.filter(id__in=serializer.validated_data["ids"])
+        if serializer.validated_data["transient_only"]:
+            failed_dials = failed_dials.filter(transient=True)
+
+        redriven = redrive_failed_dials(failed_dials)
+        return Response({"redriven": redriven}, status=status.HTTP_202_ACCEPTED)
+
+
+def prefix_range(field_name, prefix, upper):
+    """Express ``startswith`` as a range that any B-tree index can serve.
+
+    ``upper`` must sort after every character that may follow the prefix.
+    """
+    return {f"{field_name}__gte": prefix, f"{field_name}__lt": prefix + upper}
+
+
 class CallRecordFilter(filters.FilterSet):
-    contact_name = filters.CharFilter(
-        field_name="contact__first_name", lookup_expr="icontains"
-    )
-    phone_number = filters.CharFilter(
-        field_name="phone_number", lookup_expr="icontains"
-    )
+    """Prefix searches over the normalized search keys of CallRecord, each
+    backed by a (user, key) index.
+
+    ``phone_number=+1415`` matches numbers starting with those digits,
+    ``phone_suffix=1234`` numbers ending with them, and ``contact_name=jo``
+    contacts whose "first last" name starts with the text.
+    ``created_after`` and ``created_before`` bound ``created_at``, and
+    ``account_sid`` selects the calls placed by one Twilio account.
+    """
+
+    contact_name = filters.CharFilter(method="filter_contact_name")
+    phone_number = filters.CharFilter(method="filter_phone_prefix")
+    phone_suffix = filters.CharFilter(method="filter_phone_suffix")
+    created_after = filters.DateTimeFilter(field_name="created_at", lookup_expr="gte")
+    created_before = filters.DateTimeFilter(field_name="created_at", lookup_expr="lt")
 
     class Meta:
         model = CallRecord
-        fields = ["contact_name", "phone_number"]
+        fields = [
+            "contact_name",
+            "phone_number",
+            "phone_suffix",
+            "created_after",
+            "created_before",
+            "account_sid",
+        ]
+
+    def filter_contact_name(self, queryset, name, value):
+        key = value.strip().lower()
+        return queryset.filter(**prefix_range("contact_name_key", key, "\U0010ffff"))
+
+    def filter_phone_prefix(self, queryset, name, value):
+        # ":" is the character after "9", so it bounds any run of digits
+        return queryset.filter(**prefix_range("phone_digits", phone_digits(value), ":"))
+
+    def filter_phone_suffix(self, queryset, name, value):
+        return queryset.filter(
+            **prefix_range("phone_digits_reversed", phone_digits(value)[::-1], ":")
+        )
 
 
 class CallRecordViewSet(viewsets.ReadOnlyModelViewSet):
@@ -155,7 +435,37 @@ class CallRecordViewSet(viewsets.ReadOnlyModelViewSet):
     pagination_class = CallRecordPagination
 
     def get_queryset(self):
-        return CallRecord.objects.filter(user=self.request.user).order_by("-created_at")
+        return CallRecord.objects.filter(user=self.request.user).select_related(
+            "contact"
+        )
+
+    @action(detail=False, methods=["get"])
+    def export(self, request):
+        """Stream every matching call record as CSV or NDJSON.
+
+        ``?file_format=csv|ndjson`` picks the encoding (``format`` is taken
+        by DRF) and ``?gzip=true`` compresses the stream.
+        """
+        file_format = request.query_params.get("file_format", "csv")
+        if file_format not in EXPORT_FORMATS:
+            return Response(
+                {"error": f"file_format must be one of {', '.join(EXPORT_FORMATS)}."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        compress = request.query_params.get("gzip") in ("1", "true")
+
+        queryset = self.filter_queryset(CallRecord.objects.filter(user=request.user))
+        filename = f"call-records.{file_format}"
+        response = StreamingHttpResponse(
+            export_call_records(queryset, file_format, compress=compress),
+            content_type=(
+                "application/gzip" if compress else CONTENT_TYPES[file_format]
+            ),
+        )
+        if compress:
+            filename += ".gz"
+        response["Content-Disposition"] = f'attachment; filename="{filename}"'
+        return response
 
     def destroy(self, request, pk=None):
         try:
@@ -170,6 +480,71 @@ class CallRecordViewSet(viewsets.ReadOnlyModelViewSet):
             )
 
 
+class CallStatsView(APIView):
+    """Daily call totals read from the CallStatsDaily rollups."""
+
+    permission_classes = (IsAuthenticated,)
+
+    def get(self, request):
+        try:
+            end = (
+                parse_date(request.query_params.get("end", "")) or timezone.localdate()
+            )
+            start = parse_date(request.query_params.get("start", "")) or (
+                end - timedelta(days=29)
+            )
+        except ValueError:
+            return Response(
+                {"error": "start and end must be dates (YYYY-MM-DD)."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        rollups = CallStatsDaily.objects.filter(
+            user=request.user, day__gte=start, day__lte=end
+        ).order_by("day", "status")
+
+        days = {}
+        for row in rollups:
+            day = days.setdefault(row.day, {"day": row.day, "statuses": {}})
+            if row.status == CallStatsDaily.DIALED:
+                day["dialed"] = row.calls
+                day["cost"] = row.cost
+            else:
+                day["statuses"][row.status] = {
+                    "calls": row.calls,
+                    "duration": row.duration,
+                }
+
+        totals = {"dialed": 0, "cost": Decimal(0), "duration": 0, "statuses": {}}
+        for day in days.values():
+            day.setdefault("dialed", 0)
+            day.setdefault("cost", Decimal(0))
+            totals["dialed"] += day["dialed"]
+            totals["cost"] += day["cost"]
+            for call_status, row in day["statuses"].items():
+                total = totals["statuses"].setdefault(
+                    call_status, {"calls": 0, "duration": 0}
+                )
+                total["calls"] += row["calls"]
+                total["duration"] += row["duration"]
+                totals["duration"] += row["duration"]
+
+        answered = totals["statuses"].get("completed", {}).get("calls", 0)
+        ended = sum(row["calls"] for row in totals["statuses"].values())
+        totals["answered"] = answered
+        totals["answer_rate"] = round(answered / ended, 4) if ended else None
+
+        return Response(
+            {
+                "start": start,
+                "end": end,
+                "days": list(days.values()),
+                "totals": totals,
+            },
+            status=status.HTTP_200_OK,
+        )
+
+
 class AddToContactListViewset(viewsets.ViewSet):
     serializer_class = AddToContactListSerializer
     permission_classes = (IsAuthenticated,)
@@ -187,10 +562,13 @@ class AddToContactListViewset(viewsets.ViewSet):
                 )
 
             contact_list_obj = ContactList.objects.get(id=contact_list_id)
+            if contact_list_obj.is_dynamic:
+                return Response(
+                    {"error": "Members of a dynamic contact list cannot be edited."},
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
             contact_list_obj.contacts.add(Contact.objects.get(id=contact_id))
 
-            contact_list_obj.save()
-
             return Response(
                 {"message": "Contact list updated"}, status=status.HTTP_200_OK
             )
@@ -219,22 +597,29 @@ class TwilioWebhookView(APIView):
                 {"error": "CallSid and CallStatus are required."},
                 status=status.HTTP_400_BAD_REQUEST,
             )
+
+        try:
+            duration = int(duration) if duration else None
+        except ValueError:
+            return Response(
+                {"error": "CallDuration must be an integer."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        if getattr(settings, "TWILIO_WEBHOOK_MODE", "sync") == "batched":
+            get_status_event_queue().put(sid, call_status, duration)
+            return Response(status=status.HTTP_200_OK)
+
         try:
-            call_record = CallRecord.objects.get(sid=sid)
-            call_record.status = call_status
+            if not apply_status_event(sid, call_status, duration):
+                # the dialer has not flushed this call's record yet, the event
+                # is kept and applied by the flush
+                logger.info(f"Deferred webhook for call SID without a record: {sid}")
+                return Response(status=status.HTTP_202_ACCEPTED)
 
-            if duration:
-                call_record.duration = int(duration)
-            call_record.save()
             logger.info(f"Updated call record for SID: {sid}")
             return Response(status=status.HTTP_200_OK)
 
-        except CallRecord.DoesNotExist:
-            logger.error(f"Received webhook for unknown call SID: {sid}")
-            return Response(
-                {"error": "Call record not found."}, status=status.HTTP_404_NOT_FOUND
-            )
-
         except Exception as e:
             logger.error(
                 f"Error processing webhook for SID {sid}: {str(e)}", exc_info=True
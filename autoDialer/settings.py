@@ -1,3 +1,4 @@
+import json
 import os
 
 from dotenv import load_dotenv
@@ -119,6 +120,8 @@ USE_TZ = True
 
 STATIC_URL = "static/"
 
+MEDIA_ROOT = os.environ.get("MEDIA_ROOT", BASE_DIR / "media")
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.0/ref/settings/#default-auto-field
 
@@ -176,6 +179,92 @@ SIMPLE_JWT = {
 TWILIO_ACCOUNT_SID = os.environ.get("TWILIO_ACCOUNT_SID")
 TWILIO_AUTH_TOKEN = os.environ.get("TWILIO_AUTH_TOKEN")
 TWILIO_PHONE_NUMBER = os.environ.get("TWILIO_PHONE_NUMBER")
+# Twilio accounts (subaccounts or separate tenants) dial chunks are sharded
+# across in proportion to their weight, as a JSON list of
+# {"sid": ..., "auth_token": ..., "weight": ...}; defaults to the single
+# TWILIO_ACCOUNT_SID / TWILIO_AUTH_TOKEN pair
+TWILIO_ACCOUNTS = json.loads(os.environ.get("TWILIO_ACCOUNTS") or "[]")
+
+# maximum number of calls.create requests a single dial task keeps in flight
+DIALER_CONCURRENCY = int(os.environ.get("DIALER_CONCURRENCY", 1))
+# "threads" keeps calls in flight on a thread pool; "asyncio" uses Twilio's
+# aiohttp client on an event loop, cheap enough for hundreds at a time
+DIALER_ENGINE = os.environ.get("DIALER_ENGINE", "threads")
+# contact lists larger than this are split into chunks dialed by separate
+# Celery tasks; 0 dials every list in a single task
+DIAL_CHUNK_SIZE = int(os.environ.get("DIAL_CHUNK_SIZE", 1000))
+# number of contacts the dialer reads from the database at a time
+DIALER_CONTACT_CHUNK_SIZE = int(os.environ.get("DIALER_CONTACT_CHUNK_SIZE", 2000))
+# CallRecords are written in batches of this many rows, or at least this often
+CALL_RECORD_BUFFER_SIZE = int(os.environ.get("CALL_RECORD_BUFFER_SIZE", 500))
+CALL_RECORD_BUFFER_INTERVAL = float(os.environ.get("CALL_RECORD_BUFFER_INTERVAL", 5))
+
+# "batched" acknowledges status callbacks immediately and applies them in
+# coalesced batches from a background thread; "sync" writes each one inline.
+# Batched delivery is at-most-once: queued callbacks live only in the web
+# process's memory until applied, and Twilio does not resend an acknowledged
+# callback, so those queued when a process is killed (not shut down cleanly)
+# are lost and their calls keep their last applied status. Use "sync" where
+# every status change must be recorded.
+TWILIO_WEBHOOK_MODE = os.environ.get("TWILIO_WEBHOOK_MODE", "sync")
+TWILIO_WEBHOOK_BATCH_SIZE = int(os.environ.get("TWILIO_WEBHOOK_BATCH_SIZE", 500))
+TWILIO_WEBHOOK_BATCH_INTERVAL = float(
+    os.environ.get("TWILIO_WEBHOOK_BATCH_INTERVAL", 0.5)
+)
+# callbacks that arrive before their CallRecord are parked until the dialer
+# writes it; those still unmatched after this many seconds are dropped
+CALL_STATUS_EVENT_MAX_AGE = int(os.environ.get("CALL_STATUS_EVENT_MAX_AGE", 86400))
+
+# live progress pushed to /api/async/events/: "off", "memory" when webhooks
+# and the event stream are served by one process, or "broker" to fan out
+# through CELERY_BROKER_URL; changes are coalesced per interval (seconds)
+PROGRESS_EVENTS = os.environ.get("PROGRESS_EVENTS", "off")
+PROGRESS_EVENTS_INTERVAL = float(os.environ.get("PROGRESS_EVENTS_INTERVAL", 1))
+
+# every dial task in a worker process shares one keep-alive HTTP connection
+# pool to Twilio, sized to the dial concurrency by default
+TWILIO_HTTP_POOL_SIZE = int(
+    os.environ.get("TWILIO_HTTP_POOL_SIZE", max(DIALER_CONCURRENCY, 1))
+)
+TWILIO_HTTP_TIMEOUT = float(os.environ.get("TWILIO_HTTP_TIMEOUT", 30))
+
+# transient dial failures (connect failures, HTTP 408, 429, 500, 502, 503 and
+# 504) are retried with jittered exponential backoff, up to
+# DIALER_RETRY_ATTEMPTS attempts in all; read timeouts are not, since the call
+# may have been placed, and are dead-lettered as "Outcome unknown"
+DIALER_RETRY_ATTEMPTS = int(os.environ.get("DIALER_RETRY_ATTEMPTS", 3))
+DIALER_RETRY_BASE_DELAY = float(os.environ.get("DIALER_RETRY_BASE_DELAY", 1))
+DIALER_RETRY_MAX_DELAY = float(os.environ.get("DIALER_RETRY_MAX_DELAY", 30))
+
+# outbound calls-per-second limits shared by every dial worker, 0 disables a
+# limit (Twilio's default is 1 CPS per account)
+TWILIO_ACCOUNT_CPS = float(os.environ.get("TWILIO_ACCOUNT_CPS", 0))
+TWILIO_NUMBER_CPS = float(os.environ.get("TWILIO_NUMBER_CPS", 0))
+DIALER_RATE_LIMIT_BURST = int(os.environ.get("DIALER_RATE_LIMIT_BURST", 1))
+# "database" shares buckets across workers, "local" only within a process
+DIALER_RATE_LIMIT_BACKEND = os.environ.get("DIALER_RATE_LIMIT_BACKEND", "database")
+
+# calls are spread across the active CallerId numbers (TWILIO_PHONE_NUMBER
+# when there are none) by "round_robin", "lru" (least recently used) or
+# "area_code" (a number sharing the contact's area code, when there is one);
+# a number throttled or refused by Twilio is skipped for CALLER_ID_COOLDOWN
+# seconds, and each dial task keeps at most CALLER_ID_MAX_IN_FLIGHT calls in
+# flight per number (0 for no limit)
+CALLER_ID_STRATEGY = os.environ.get("CALLER_ID_STRATEGY", "round_robin")
+CALLER_ID_MAX_IN_FLIGHT = int(os.environ.get("CALLER_ID_MAX_IN_FLIGHT", 0))
+CALLER_ID_COOLDOWN = float(os.environ.get("CALLER_ID_COOLDOWN", 60))
+
+# contact imports: numbers without a country code are parsed in this region,
+# and uploads larger than the threshold (bytes) are imported by a Celery task.
+# Those uploads are saved to the default storage, MEDIA_ROOT on the local
+# filesystem, for the task to read, so MEDIA_ROOT must be a volume the workers
+# share with the web servers; otherwise configure STORAGES with a backend both
+# can reach, or raise the threshold so every import runs inline
+PHONE_NUMBER_DEFAULT_REGION = os.environ.get("PHONE_NUMBER_DEFAULT_REGION", "US")
+CONTACT_IMPORT_CHUNK_SIZE = int(os.environ.get("CONTACT_IMPORT_CHUNK_SIZE", 2000))
+CONTACT_IMPORT_ASYNC_THRESHOLD = int(
+    os.environ.get("CONTACT_IMPORT_ASYNC_THRESHOLD", 1024 * 1024)
+)
 
 CELERY_BROKER_URL = os.getenv("CELERY_BROKER_URL")
 # CELERY_RESULT_BACKEND = os.getenv("CELERY_RESULT_BACKEND")
@@ -191,4 +280,12 @@ CELERY_RESULT_SERIALIZER = "json"
 CELERY_TIMEZONE = "UTC"
 CELERY_TASK_TRACK_STARTED = True
 CELERY_TASK_TIME_LIMIT = 30 * 60
+# raised inside the task ahead of the hard limit so buffered CallRecords flush
+CELERY_TASK_SOFT_TIME_LIMIT = 29 * 60
+CELERY_BEAT_SCHEDULE = {
+    "prune-parked-status-events": {
+        "task": "api.tasks.prune_parked_status_events",
+        "schedule": 60 * 60,
+    },
+}
 CORS_ALLOW_ALL_ORIGINS = True
@@ -0,0 +1,72 @@
+"""Load test for the status-callback endpoints of a running deployment.
+
+Opens ``connections`` concurrent keep-alive connections and reports
+requests/sec and latency percentiles, so the WSGI deployment can be compared
+with the ASGI one:
+
+    gunicorn autoDialer.wsgi -w 4 --threads 8 -b :8000
+    python -m benchmarks.bench_asgi http://localhost:8000/api/twilio-webhook/
+
+    uvicorn autoDialer.asgi:application --workers 4 --port 8001
+    python -m benchmarks.bench_asgi http://localhost:8001/api/async/twilio-webhook/
+
+    python -m benchmarks.bench_asgi URL [connections] [requests] [sid]
+
+The SID should belong to an existing CallRecord, otherwise every callback is
+parked as a CallStatusEvent.
+"""
+
+import asyncio
+import sys
+import time
+
+import aiohttp
+
+
+async def worker(session, url, sid, requests, latencies, errors):
+    for _ in range(requests):
+        start = time.perf_counter()
+        try:
+            async with session.post(
+                url, data={"CallSid": sid, "CallStatus": "ringing"}
+            ) as response:
+                await response.read()
+                if response.status >= 400:
+                    errors.append(response.status)
+        except aiohttp.ClientError as e:
+            errors.append(str(e))
+        latencies.append(time.perf_counter() - start)
+
+
+def percentile(values, fraction):
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+async def run(url, connections, requests, sid):
+    latencies, errors = [], []
+    connector = aiohttp.TCPConnector(limit=connections)
+    async with aiohttp.ClientSession(connector=connector) as session:
+        start = time.perf_counter()
+        await asyncio.gather(
+            *(
+                worker(session, url, sid, requests // connections, latencies, errors)
+                for _ in range(connections)
+            )
+        )
+        elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    print(f"{url} with {connections} connections")
+    print(f"{len(latencies) / elapsed:10.1f} req/s, {len(errors)} errors")
+    print(
+        f"p50 {percentile(latencies, 0.50) * 1000:7.1f}ms  "
+        f"p99 {percentile(latencies, 0.99) * 1000:7.1f}ms"
+    )
+
+
+def main(url, connections=256, requests=10_000, sid="TEST123"):
+    asyncio.run(run(url, int(connections), int(requests), sid))
+
+
+if __name__ == "__main__":
+    main(*sys.argv[1:])
@@ -0,0 +1,147 @@
+"""Calls-per-second and peak thread count of dialContactList with the
+thread-pool engine versus the asyncio engine, against a local aiohttp
+stand-in for Twilio that answers each ``calls.create`` after a fixed latency.
+
+    python -m benchmarks.bench_async_dial [contacts] [latency_seconds]
+"""
+
+import asyncio
+import sys
+import threading
+import time
+import uuid
+
+from aiohttp import web
+
+from benchmarks.utils import create_contact_list, setup_django
+
+
+async def create_call(request):
+    await request.post()
+    await asyncio.sleep(request.app["latency"])
+    return web.json_response(
+        {
+            "sid": f"CA{uuid.uuid4().hex}",
+            "status": "queued",
+            "duration": None,
+            "price": None,
+        },
+        status=201,
+    )
+
+
+def start_server(latency):
+    """Serve the mock API from a background event loop, returning its URL."""
+    loop = asyncio.new_event_loop()
+    started = threading.Event()
+    state = {}
+
+    async def serve():
+        app = web.Application()
+        app["latency"] = latency
+        app.router.add_post("/{tail:.*}", create_call)
+        runner = web.AppRunner(app, access_log=None)
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", 0, backlog=1024)
+        await site.start()
+        state["port"] = runner.addresses[0][1]
+        started.set()
+
+    def run():
+        asyncio.set_event_loop(loop)
+        loop.run_until_complete(serve())
+        loop.run_forever()
+
+    threading.Thread(target=run, daemon=True).start()
+    started.wait()
+    return f"http://127.0.0.1:{state['port']}"
+
+
+def local_client_classes(base_url):
+    from twilio.http.http_client import TwilioHttpClient
+
+    from api.services.twilio_http import AsyncTwilioHttpClient
+
+    class LocalTwilioHttpClient(TwilioHttpClient):
+        def request(self, method, url, *args, **kwargs):
+            url = url.replace("https://api.twilio.com", base_url)
+            return super().request(method, url, *args, **kwargs)
+
+    class LocalAsyncTwilioHttpClient(AsyncTwilioHttpClient):
+        async def request(self, method, url, *args, **kwargs):
+            url = url.replace("https://api.twilio.com", base_url)
+            return await super().request(method, url, *args, **kwargs)
+
+    return LocalTwilioHttpClient, LocalAsyncTwilioHttpClient
+
+
+class ThreadSampler:
+    """Records the largest number of live threads seen while running."""
+
+    def __init__(self, interval=0.01):
+        self.interval = interval
+        self.peak = 0
+        self.baseline = 0
+        self.stopped = threading.Event()
+
+    def __enter__(self):
+        self.baseline = threading.active_count()
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stopped.set()
+        self.thread.join()
+
+    def run(self):
+        while not self.stopped.wait(self.interval):
+            self.peak = max(self.peak, threading.active_count())
+
+
+def main(size=2000, latency=0.2):
+    setup_django()
+
+    from twilio.rest import Client
+
+    from api.models import CallRecord
+    from api.services.dialer import TwilioDialerService
+    from api.services.twilio_http import TwilioHttpClientRegistry
+
+    contact_list = create_contact_list(size)
+    http_client_class, async_http_client_class = local_client_classes(
+        start_server(latency)
+    )
+
+    print(f"{size} contacts, {latency * 1000:.0f}ms simulated Twilio latency")
+    for concurrency in (32, 128, 512):
+        for engine in ("threads", "asyncio"):
+            CallRecord.objects.all().delete()
+            service = TwilioDialerService("ACbench", "token")
+            registry = TwilioHttpClientRegistry(
+                pool_size=concurrency, http_client_class=http_client_class
+            )
+            service.client = Client("ACbench", "token", http_client=registry.get())
+            service.async_http_client_class = async_http_client_class
+
+            with ThreadSampler() as sampler:
+                start = time.perf_counter()
+                result = service.dialContactList(
+                    contact_list.id,
+                    "Hi {first_name}",
+                    "+15550000000",
+                    concurrency,
+                    engine=engine,
+                )
+                elapsed = time.perf_counter() - start
+            assert result == {"dialed": size, "failed": 0}, result
+
+            print(
+                f"concurrency={concurrency:<4} {engine:>8}: {elapsed:7.2f}s "
+                f"{size / elapsed:8.1f} calls/s  "
+                f"+{sampler.peak - sampler.baseline} threads"
+            )
+
+
+if __name__ == "__main__":
+    main(*(float(arg) if "." in arg else int(arg) for arg in sys.argv[1:]))
@@ -0,0 +1,38 @@
+"""Calls-per-second of TwilioDialerService.dialContactList at several
+concurrency levels against a mocked Twilio client.
+
+    python -m benchmarks.bench_concurrency [contacts] [latency_seconds]
+"""
+
+import sys
+import time
+
+from benchmarks.utils import FakeTwilioClient, create_contact_list, setup_django
+
+
+def main(size=500, latency=0.05):
+    setup_django()
+
+    from api.models import CallRecord
+    from api.services.dialer import TwilioDialerService
+
+    contact_list = create_contact_list(size)
+    service = TwilioDialerService("ACbench", "token")
+    service.client = FakeTwilioClient(latency)
+
+    print(f"{size} contacts, {latency * 1000:.0f}ms simulated Twilio latency")
+    for concurrency in (1, 8, 32, 128):
+        CallRecord.objects.all().delete()
+        start = time.perf_counter()
+        service.dialContactList(
+            contact_list.id, "Hi {first_name}", "+15550000000", concurrency
+        )
+        elapsed = time.perf_counter() - start
+        print(
+            f"concurrency={concurrency:<4} {elapsed:8.2f}s "
+            f"{size / elapsed:10.1f} calls/s"
+        )
+
+
+if __name__ == "__main__":
+    main(*(float(arg) if "." in arg else int(arg) for arg in sys.argv[1:]))
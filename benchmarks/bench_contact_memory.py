@@ -0,0 +1,38 @@
+"""Peak Python heap while iterating a contact list, loading every Contact
+with ``contact_list.contacts.all()`` versus streaming ``iter_list_contacts``.
+
+    python -m benchmarks.bench_contact_memory [sizes...]
+"""
+
+import sys
+import tracemalloc
+
+from benchmarks.utils import create_contact_list, setup_django
+
+
+def peak_memory(iterable):
+    tracemalloc.start()
+    for _ in iterable:
+        pass
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak
+
+
+def main(*sizes):
+    setup_django()
+
+    from api.services.contacts import iter_list_contacts
+
+    for size in sizes or (1_000, 10_000, 100_000):
+        contact_list = create_contact_list(size, username=f"bench{size}")
+        queryset = peak_memory(contact_list.contacts.all())
+        streamed = peak_memory(iter_list_contacts(contact_list.id))
+        print(
+            f"{size:>9} contacts  all(): {queryset / 2**20:8.2f} MiB  "
+            f"iter_list_contacts: {streamed / 2**20:6.2f} MiB"
+        )
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:]))
@@ -0,0 +1,73 @@
+"""Peak Python heap while exporting call records, serializing pages through
+``CallRecordSerializer`` versus streaming ``export_call_records``.
+
+    python -m benchmarks.bench_export [sizes...]
+"""
+
+import sys
+import time
+import tracemalloc
+
+from benchmarks.utils import create_contact_list, setup_django
+
+
+def measure(export):
+    tracemalloc.start()
+    start = time.perf_counter()
+    for _ in export():
+        pass
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak
+
+
+def create_call_records(contact_list):
+    from api.models import CallRecord
+
+    CallRecord.objects.bulk_create(
+        (
+            CallRecord(
+                sid=f"CA{contact_list.id}-{i}",
+                user_id=contact_list.user_id,
+                contact_id=contact_id,
+                phone_number=f"+1555{i:07d}",
+                status="completed",
+                duration=30,
+                cost="0.02",
+            )
+            for i, contact_id in enumerate(
+                contact_list.contacts.values_list("id", flat=True).iterator()
+            )
+        ),
+        batch_size=5000,
+    )
+
+
+def main(*sizes):
+    setup_django()
+
+    from api.models import CallRecord
+    from api.serializers import CallRecordSerializer
+    from api.services.export import export_call_records
+
+    for size in sizes or (10_000, 100_000):
+        contact_list = create_contact_list(size, username=f"bench{size}")
+        create_call_records(contact_list)
+        queryset = CallRecord.objects.filter(user_id=contact_list.user_id)
+
+        serialized = measure(
+            lambda: CallRecordSerializer(
+                queryset.select_related("contact"), many=True
+            ).data
+        )
+        streamed = measure(lambda: export_call_records(queryset, "csv"))
+        print(
+            f"{size:>9} records  serializer: {serialized[0]:6.2f}s "
+            f"{serialized[1] / 2**20:8.2f} MiB  "
+            f"export: {streamed[0]:6.2f}s {streamed[1] / 2**20:6.2f} MiB"
+        )
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:]))
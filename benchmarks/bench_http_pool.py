@@ -0,0 +1,110 @@
+"""New TCP connections per 1k ``calls.create`` requests against a local
+HTTP stand-in for Twilio, building a Twilio client per task versus sharing
+the per-process pooled client.
+
+    python -m benchmarks.bench_http_pool [calls] [calls_per_task] [concurrency]
+"""
+
+import json
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from twilio.http.http_client import TwilioHttpClient
+from twilio.rest import Client
+
+from benchmarks.utils import setup_django
+
+
+class CountingHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    connections = 0
+    lock = threading.Lock()
+
+    def setup(self):
+        super().setup()
+        with CountingHandler.lock:
+            CountingHandler.connections += 1
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        body = json.dumps(
+            {"sid": "CAbench", "status": "queued", "duration": None, "price": None}
+        ).encode()
+        self.send_response(201)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def local_http_client_class(base_url):
+    class LocalTwilioHttpClient(TwilioHttpClient):
+        def request(self, method, url, *args, **kwargs):
+            url = url.replace("https://api.twilio.com", base_url)
+            return super().request(method, url, *args, **kwargs)
+
+    return LocalTwilioHttpClient
+
+
+def run_task(client, calls, concurrency):
+    def create(i):
+        client.calls.create(to=f"+1555{i:07d}", from_="+15550000000", twiml="<R/>")
+
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        list(executor.map(create, range(calls)))
+
+
+def measure(make_client, calls, calls_per_task, concurrency):
+    CountingHandler.connections = 0
+    start = time.perf_counter()
+    for _ in range(0, calls, calls_per_task):
+        run_task(make_client(), calls_per_task, concurrency)
+    return CountingHandler.connections, time.perf_counter() - start
+
+
+def main(calls=1000, calls_per_task=100, concurrency=8):
+    setup_django()
+
+    from api.services.twilio_http import TwilioHttpClientRegistry
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), CountingHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    http_client_class = local_http_client_class(
+        f"http://127.0.0.1:{server.server_port}"
+    )
+
+    per_task = measure(
+        lambda: Client(
+            "ACbench", "token", http_client=http_client_class(pool_connections=True)
+        ),
+        calls,
+        calls_per_task,
+        concurrency,
+    )
+    registry = TwilioHttpClientRegistry(
+        pool_size=concurrency, http_client_class=http_client_class
+    )
+    pooled = measure(
+        lambda: Client("ACbench", "token", http_client=registry.get()),
+        calls,
+        calls_per_task,
+        concurrency,
+    )
+    server.shutdown()
+
+    print(f"{calls} calls in tasks of {calls_per_task}, concurrency {concurrency}")
+    for name, (connections, elapsed) in (("per task", per_task), ("pooled", pooled)):
+        print(
+            f"  {name:>8}: {connections * 1000 / calls:6.1f} connections per 1k "
+            f"calls  {elapsed:6.2f}s"
+        )
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:]))
@@ -0,0 +1,98 @@
+"""Call-record search latency: LIKE filters on phone_number and the joined
+contact name, which scan every call record of the user, against the indexed
+prefix/suffix/name-key filters of CallRecordFilter.
+
+    python -m benchmarks.bench_search [rows]
+
+The acceptance run uses 5000000 rows; building that table takes a while.
+"""
+
+import random
+import sys
+import time
+
+from benchmarks.utils import setup_django
+
+SYLLABLES = ["jo", "ma", "ri", "an", "li", "pe", "ter", "sa", "ko", "ne", "da", "vi"]
+
+
+def populate(user, rows, batch_size=20_000):
+    from api.models import CallRecord, Contact
+
+    rng = random.Random(0)
+    contacts = Contact.objects.bulk_create(
+        Contact(
+            user=user,
+            first_name="".join(rng.choices(SYLLABLES, k=3)).title(),
+            last_name="".join(rng.choices(SYLLABLES, k=3)).title(),
+            city="Bench City",
+            phone_number=f"+1000{i:07d}",
+        )
+        for i in range(5_000)
+    )
+    for start in range(0, rows, batch_size):
+        batch = []
+        for i in range(start, min(start + batch_size, rows)):
+            contact = rng.choice(contacts)
+            record = CallRecord(
+                sid=f"CA{i:032d}",
+                user=user,
+                contact=contact,
+                phone_number=f"+1{rng.randrange(200, 999)}{rng.randrange(10**7):07d}",
+                status="completed",
+                contact_name_key=(f"{contact.first_name} {contact.last_name}".lower()),
+            )
+            record.populate_derived_fields()
+            batch.append(record)
+        CallRecord.objects.bulk_create(batch)
+
+
+def timed(queryset, repeat=3):
+    # counting the matches touches every one of them, like a full result set
+    start = time.perf_counter()
+    for _ in range(repeat):
+        queryset.count()
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+def main(rows=500_000):
+    setup_django()
+
+    from django.contrib.auth.models import User
+
+    from api.models import CallRecord
+    from api.views import CallRecordFilter
+
+    user = User.objects.create_user(username="bench", password="bench")
+    start = time.perf_counter()
+    populate(user, rows)
+    print(f"{rows} call records built in {time.perf_counter() - start:.1f}s")
+
+    records = CallRecord.objects.filter(user=user)
+    cases = [
+        (
+            "ends with 1234",
+            records.filter(phone_number__endswith="1234"),
+            {"phone_suffix": "1234"},
+        ),
+        (
+            "starts with +1415",
+            records.filter(phone_number__icontains="+1415"),
+            {"phone_number": "+1415"},
+        ),
+        (
+            "name starts with jojo",
+            records.filter(contact__first_name__istartswith="jojo"),
+            {"contact_name": "jojo"},
+        ),
+    ]
+    for label, legacy, params in cases:
+        indexed = CallRecordFilter(params, queryset=records).qs
+        print(
+            f"{label:<22} {legacy.count():>7} rows  scan {timed(legacy):9.2f}ms   "
+            f"indexed {timed(indexed):9.2f}ms"
+        )
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:]))
@@ -0,0 +1,61 @@
+"""Per-contact message rendering: chained str.replace plus a fresh
+VoiceResponse per contact versus a compiled MessageTemplate.
+
+    python -m benchmarks.bench_templates [contacts]
+"""
+
+import sys
+import time
+from types import SimpleNamespace
+
+from twilio.twiml.voice_response import VoiceResponse
+
+from api.services.templates import MessageTemplate
+
+MESSAGE = "Hello {first_name} {last_name}! Calling {phone_number} about {city}."
+
+
+def legacy_render(message, contact):
+    personalized_message = message.replace("{first_name}", contact.first_name)
+    personalized_message = personalized_message.replace(
+        "{last_name}", contact.last_name
+    )
+    personalized_message = personalized_message.replace("{city}", contact.city)
+    personalized_message = personalized_message.replace(
+        "{phone_number}", contact.phone_number
+    )
+    response = VoiceResponse()
+    response.say(personalized_message, voice="Woman", language="en-US")
+    response.play("https://api.twilio.com/cowbell.mp3")
+    return str(response)
+
+
+def main(size=100_000):
+    contacts = [
+        SimpleNamespace(
+            first_name=f"First{i}",
+            last_name=f"Last{i}",
+            city="Bench City",
+            phone_number=f"+1555{i:07d}",
+        )
+        for i in range(size)
+    ]
+
+    start = time.perf_counter()
+    for contact in contacts:
+        legacy_render(MESSAGE, contact)
+    legacy = time.perf_counter() - start
+
+    start = time.perf_counter()
+    template = MessageTemplate(MESSAGE)
+    for contact in contacts:
+        template.render(contact)
+    compiled = time.perf_counter() - start
+
+    print(f"{size} contacts")
+    print(f"str.replace + VoiceResponse {legacy:8.3f}s")
+    print(f"MessageTemplate             {compiled:8.3f}s ({legacy / compiled:.1f}x)")
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:]))
@@ -0,0 +1,62 @@
+"""Status-callback requests/sec through TwilioWebhookView, applying each
+callback inline (sync) versus queueing it for the batch applier (batched).
+
+    python -m benchmarks.bench_webhooks [calls]
+"""
+
+import sys
+import time
+
+from benchmarks.utils import create_contact_list, setup_django
+
+STATUSES = ("initiated", "ringing", "in-progress", "completed")
+
+
+def main(size=2_000):
+    setup_django()
+
+    from django.test import Client, override_settings
+
+    from api.models import CallRecord
+    from api.services.webhooks import get_status_event_queue
+
+    contact_list = create_contact_list(size)
+    client = Client()
+
+    for mode in ("sync", "batched"):
+        CallRecord.objects.all().delete()
+        CallRecord.objects.bulk_create(
+            CallRecord(
+                sid=f"CA{contact.id}",
+                user_id=contact_list.user_id,
+                contact=contact,
+                phone_number=contact.phone_number,
+                status="queued",
+            )
+            for contact in contact_list.contacts.all()
+        )
+        sids = list(CallRecord.objects.values_list("sid", flat=True))
+
+        with override_settings(TWILIO_WEBHOOK_MODE=mode):
+            start = time.perf_counter()
+            for call_status in STATUSES:
+                for sid in sids:
+                    client.post(
+                        "/api/twilio-webhook/",
+                        {"CallSid": sid, "CallStatus": call_status},
+                    )
+            elapsed = time.perf_counter() - start
+            if mode == "batched":
+                get_status_event_queue().stop()
+            drained = time.perf_counter() - start
+
+        requests = size * len(STATUSES)
+        print(
+            f"{mode:<8} {requests / elapsed:9.1f} req/s "
+            f"(all applied after {drained:.2f}s)"
+        )
+        assert CallRecord.objects.exclude(status="completed").count() == 0
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:]))
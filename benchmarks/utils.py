@@ -0,0 +1,58 @@
+import os
+import time
+import uuid
+from types import SimpleNamespace
+
+import django
+
+
+def setup_django():
+    """Configure Django against a throwaway test database."""
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "autoDialer.settings")
+    os.environ.setdefault("SECRET_KEY", "benchmark")
+    django.setup()
+
+    from django.db import connection
+    from django.test.utils import setup_test_environment
+
+    setup_test_environment()
+    connection.creation.create_test_db(verbosity=0)
+
+
+def create_contact_list(size, username="bench"):
+    from django.contrib.auth.models import User
+
+    from api.models import Contact, ContactList
+
+    user = User.objects.create_user(username=username, password="bench")
+    contacts = Contact.objects.bulk_create(
+        Contact(
+            user=user,
+            first_name=f"First{i}",
+            last_name=f"Last{i}",
+            city="Bench City",
+            phone_number=f"+1555{i:07d}",
+        )
+        for i in range(size)
+    )
+    contact_list = ContactList.objects.create(user=user, name=f"Bench {size}")
+    contact_list.contacts.add(*contacts)
+    return contact_list
+
+
+class FakeCalls:
+    def __init__(self, latency):
+        self.latency = latency
+
+    def create(self, **kwargs):
+        time.sleep(self.latency)
+        return SimpleNamespace(
+            sid=f"CA{uuid.uuid4().hex}", status="queued", duration=None, price=None
+        )
+
+
+class FakeTwilioClient:
+    """Stand-in for ``twilio.rest.Client`` with a fixed per-request latency."""
+
+    def __init__(self, latency=0.05):
+        self.calls = FakeCalls(latency)
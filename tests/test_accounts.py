@@ -0,0 +1,48 @@
+from collections import Counter
+
+from django.test import SimpleTestCase
+
+from api.services.accounts import ShardRouter, TwilioAccount, get_shard_router
+
+A = TwilioAccount("ACa", "token-a", 3)
+B = TwilioAccount("ACb", "token-b", 1)
+
+
+class ShardRouterTests(SimpleTestCase):
+    def test_smooth_weighted_cycle(self):
+        router = ShardRouter([A, B])
+        self.assertEqual(
+            [account.sid for account in router.cycle], ["ACa"] * 2 + ["ACb", "ACa"]
+        )
+
+    def test_chunks_and_campaigns_spread_by_weight(self):
+        router = ShardRouter([A, B])
+        chunks = Counter(router.route(7, chunk).sid for chunk in range(400))
+        self.assertEqual(chunks, {"ACa": 300, "ACb": 100})
+        campaigns = Counter(
+            router.route(campaign_id).sid for campaign_id in range(1, 401)
+        )
+        self.assertEqual(campaigns, {"ACa": 300, "ACb": 100})
+        # the same chunk always goes to the same account
+        self.assertEqual(router.route(7, 3), router.route(7, 3))
+
+    def test_invalid_configuration(self):
+        with self.assertRaises(ValueError):
+            ShardRouter([])
+        with self.assertRaises(ValueError):
+            ShardRouter([A._replace(weight=0)])
+        with self.assertRaises(ValueError):
+            ShardRouter([A]).get("ACunknown")
+
+    def test_settings(self):
+        with self.settings(TWILIO_ACCOUNT_SID="ACdefault", TWILIO_AUTH_TOKEN="secret"):
+            router = get_shard_router()
+        self.assertEqual(router.cycle, [TwilioAccount("ACdefault", "secret", 1)])
+
+        accounts = [
+            {"sid": "ACa", "auth_token": "token-a", "weight": 3},
+            {"sid": "ACb", "auth_token": "token-b"},
+        ]
+        with self.settings(TWILIO_ACCOUNTS=accounts):
+            router = get_shard_router()
+        self.assertEqual(router.get("ACb"), B)
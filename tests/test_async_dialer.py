@@ -0,0 +1,171 @@
+import asyncio
+import signal
+import time
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, patch
+
+from aiohttp import ClientConnectorError, ServerDisconnectedError
+from celery.exceptions import SoftTimeLimitExceeded
+from django.contrib.auth.models import User
+from django.test import TestCase
+from twilio.base.exceptions import TwilioRestException
+
+from api.models import (
+    CallRecord,
+    CallStatsDaily,
+    Contact,
+    ContactList,
+    DialCampaign,
+    DialClaim,
+    FailedDial,
+)
+from api.services.dialer import TwilioDialerService
+from api.services.outcomes import OUTCOME_UNKNOWN
+
+
+class AsyncDialEngineTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username="testuser", password="testpass123"
+        )
+        self.contacts = Contact.objects.bulk_create(
+            Contact(
+                user=self.user,
+                first_name=f"John{i}",
+                last_name="Doe",
+                city="Test City",
+                phone_number=f"+1234567{i:03d}",
+            )
+            for i in range(10)
+        )
+        self.contact_list = ContactList.objects.create(user=self.user, name="Test List")
+        self.contact_list.contacts.add(*self.contacts)
+        self.campaign = DialCampaign.objects.create(
+            user=self.user, contact_list=self.contact_list, message="Hi"
+        )
+
+        patcher = patch("api.services.async_dialer.Client")
+        self.calls = patcher.start().return_value.calls
+        self.addCleanup(patcher.stop)
+        self.calls.create_async = AsyncMock(side_effect=self.create)
+        self.failures = {}
+        self.active = 0
+        self.peak = 0
+        self.answered = 0
+        self.latency = 0.01
+
+    async def create(self, **kwargs):
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        try:
+            await asyncio.sleep(self.latency)
+            errors = self.failures.get(kwargs["to"])
+            if errors:
+                raise errors.pop(0)
+            self.answered += 1
+            return SimpleNamespace(
+                sid=f"CA{kwargs['to']}", status="queued", duration=None, price=None
+            )
+        finally:
+            self.active -= 1
+
+    def dial(self, concurrency=4, **kwargs):
+        service = TwilioDialerService("ACtest", "token")
+        return service.dialContactList(
+            self.contact_list.id,
+            "Hi {first_name}",
+            "+15550000000",
+            concurrency,
+            campaign_id=self.campaign.id,
+            engine="asyncio",
+            **kwargs,
+        )
+
+    def test_dials_every_contact_within_concurrency(self):
+        with self.settings(CALL_RECORD_BUFFER_SIZE=3):
+            self.assertEqual(self.dial(), {"dialed": 10, "failed": 0})
+
+        self.assertEqual(self.peak, 4)
+        self.assertEqual(CallRecord.objects.count(), 10)
+        self.assertEqual(
+            CallRecord.objects.get(contact=self.contacts[0]).sid,
+            f"CA{self.contacts[0].phone_number}",
+        )
+        self.assertIn(
+            "Hi John0", self.calls.create_async.call_args_list[0].kwargs["twiml"]
+        )
+        self.assertEqual(
+            CallStatsDaily.objects.get(status=CallStatsDaily.DIALED).calls, 10
+        )
+        self.campaign.refresh_from_db()
+        self.assertEqual(self.campaign.dialed, 10)
+
+    def test_retries_and_dead_letters(self):
+        retried = self.contacts[0].phone_number
+        self.failures[retried] = [TwilioRestException(503, "/Calls", "busy")]
+        refused = self.contacts[2].phone_number
+        self.failures[refused] = [
+            ClientConnectorError(
+                SimpleNamespace(host="api.twilio.com", port=443, ssl=True),
+                ConnectionRefusedError(111, "Connection refused"),
+            )
+        ]
+        self.failures[self.contacts[1].phone_number] = [
+            TwilioRestException(400, "/Calls", "invalid", code=21211)
+        ]
+        self.failures[self.contacts[3].phone_number] = [ServerDisconnectedError()]
+
+        with self.settings(DIALER_RETRY_BASE_DELAY=0):
+            self.assertEqual(self.dial(), {"dialed": 8, "failed": 2})
+
+        self.assertEqual(self.calls.create_async.call_count, 12)
+        self.assertTrue(CallRecord.objects.filter(phone_number=retried).exists())
+        self.assertTrue(CallRecord.objects.filter(phone_number=refused).exists())
+        invalid, disconnected = FailedDial.objects.order_by("contact_id")
+        self.assertEqual(invalid.contact, self.contacts[1])
+        self.assertEqual((invalid.error_code, invalid.attempts), (21211, 1))
+        self.assertEqual(disconnected.contact, self.contacts[3])
+        self.assertEqual((disconnected.transient, disconnected.attempts), (False, 1))
+        self.assertTrue(disconnected.error.startswith(OUTCOME_UNKNOWN))
+
+    def test_resumes_without_redialing(self):
+        self.dial()
+        self.calls.create_async.reset_mock()
+
+        self.assertEqual(self.dial(), {"dialed": 0, "failed": 0})
+        self.calls.create_async.assert_not_called()
+
+    def test_soft_time_limit_stops_dialing_and_flushes(self):
+        # Celery raises the soft limit from a signal handler on the task
+        # thread, which is serving the loop rather than running it
+        def soft_time_limit(signum, frame):
+            raise SoftTimeLimitExceeded()
+
+        previous = signal.signal(signal.SIGALRM, soft_time_limit)
+        self.addCleanup(signal.signal, signal.SIGALRM, previous)
+        self.addCleanup(signal.setitimer, signal.ITIMER_REAL, 0)
+        self.latency = 0.05
+        signal.setitimer(signal.ITIMER_REAL, 0.12)
+
+        with self.assertRaises(SoftTimeLimitExceeded):
+            self.dial(concurrency=2)
+
+        placed = self.calls.create_async.call_count
+        self.assertLess(placed, len(self.contacts))
+        time.sleep(0.2)
+        self.assertEqual(self.calls.create_async.call_count, placed)
+        self.assertEqual(self.active, 0)
+
+        # every call that returned is recorded, and the contacts of calls
+        # cut off in flight keep their claims; the rest are handed back
+        self.assertGreater(self.answered, 0)
+        self.assertEqual(CallRecord.objects.count(), self.answered)
+        self.assertFalse(FailedDial.objects.exists())
+        self.assertEqual(
+            list(
+                DialClaim.objects.order_by("contact_id").values_list(
+                    "contact_id", flat=True
+                )
+            ),
+            [contact.id for contact in self.contacts[:placed]],
+        )
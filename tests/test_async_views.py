@@ -0,0 +1,94 @@
+from unittest.mock import patch
+
+from django.contrib.auth.models import User
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from api.models import CallRecord, Contact, ContactList, DialCampaign
+
+
+class AsyncViewTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username="testuser", password="testpass123"
+        )
+        self.contact = Contact.objects.create(
+            user=self.user,
+            first_name="John",
+            last_name="Doe",
+            city="Test City",
+            phone_number="+1234567890",
+        )
+        CallRecord.objects.create(
+            sid="TEST123",
+            user=self.user,
+            contact=self.contact,
+            phone_number="+1234567890",
+            status="queued",
+        )
+        self.token = str(RefreshToken.for_user(self.user).access_token)
+
+    async def test_twilio_webhook(self):
+        response = await self.async_client.post(
+            reverse("twilio-webhook-async"),
+            {"CallSid": "TEST123", "CallStatus": "completed", "CallDuration": "120"},
+        )
+        self.assertEqual(response.status_code, 200)
+        record = await CallRecord.objects.aget(sid="TEST123")
+        self.assertEqual((record.status, record.duration), ("completed", 120))
+
+    async def test_twilio_webhook_requires_sid_and_status(self):
+        response = await self.async_client.post(
+            reverse("twilio-webhook-async"), {"CallSid": "TEST123"}
+        )
+        self.assertEqual(response.status_code, 400)
+
+    async def test_twilio_webhook_rejects_malformed_duration(self):
+        response = await self.async_client.post(
+            reverse("twilio-webhook-async"),
+            {"CallSid": "TEST123", "CallStatus": "completed", "CallDuration": "2m"},
+        )
+        self.assertEqual(response.status_code, 400)
+
+    async def test_check_dial_status_requires_authentication(self):
+        response = await self.async_client.get(
+            reverse("dial-status-async"), {"task_id": "abc"}
+        )
+        self.assertEqual(response.status_code, 401)
+
+    @patch("api.tasks.AsyncResult")
+    async def test_check_dial_status(self, mock_async_result):
+        mock_async_result.return_value.ready.return_value = True
+        mock_async_result.return_value.successful.return_value = True
+        mock_async_result.return_value.result = {"dialed": 1, "failed": 0}
+        response = await self.async_client.get(
+            reverse("dial-status-async"),
+            {"task_id": "abc"},
+            headers={"Authorization": f"Bearer {self.token}"},
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["status"], "completed")
+
+    @patch("api.tasks.AsyncResult")
+    async def test_check_dial_status_of_campaign(self, mock_async_result):
+        contact_list = await ContactList.objects.acreate(user=self.user, name="List")
+        await DialCampaign.objects.acreate(
+            user=self.user,
+            contact_list=contact_list,
+            message="Hi",
+            task_id="abc",
+            status="in_progress",
+            total=3,
+            dialed=2,
+        )
+        response = await self.async_client.get(
+            reverse("dial-status-async"),
+            {"task_id": "abc"},
+            headers={"Authorization": f"Bearer {self.token}"},
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            (response.json()["status"], response.json()["dialed"]), ("in_progress", 2)
+        )
+        mock_async_result.assert_not_called()
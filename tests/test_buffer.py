@@ -0,0 +1,71 @@
+from django.contrib.auth.models import User
+from django.test import TestCase
+
+from api.models import CallRecord, CallStatusEvent, Contact
+from api.services.buffer import CallRecordBuffer
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class CallRecordBufferTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username="testuser", password="testpass123"
+        )
+        self.contact = Contact.objects.create(
+            user=self.user,
+            first_name="John",
+            last_name="Doe",
+            city="Test City",
+            phone_number="+1234567890",
+        )
+
+    def record(self, sid):
+        return CallRecord(
+            sid=sid,
+            user=self.user,
+            contact=self.contact,
+            phone_number=self.contact.phone_number,
+            status="queued",
+        )
+
+    def test_flushes_every_size_records(self):
+        with CallRecordBuffer(size=3, interval=60) as buffer:
+            for i in range(7):
+                buffer.add(self.record(f"CA{i}"))
+            self.assertEqual(CallRecord.objects.count(), 6)
+        self.assertEqual(CallRecord.objects.count(), 7)
+        self.assertEqual(buffer.flushed, 7)
+
+    def test_flushes_after_interval(self):
+        clock = FakeClock()
+        buffer = CallRecordBuffer(size=100, interval=5, clock=clock)
+        buffer.add(self.record("CA1"))
+        self.assertEqual(CallRecord.objects.count(), 0)
+        clock.now = 6
+        buffer.add(self.record("CA2"))
+        self.assertEqual(CallRecord.objects.count(), 2)
+
+    def test_flushes_when_the_task_fails(self):
+        with self.assertRaises(RuntimeError):
+            with CallRecordBuffer(size=100, interval=60) as buffer:
+                buffer.add(self.record("CA1"))
+                raise RuntimeError("worker shutting down")
+        self.assertTrue(CallRecord.objects.filter(sid="CA1").exists())
+
+    def test_applies_status_events_received_before_flush(self):
+        CallStatusEvent.objects.create(sid="CA1", status="ringing")
+        CallStatusEvent.objects.create(sid="CA1", status="completed", duration=42)
+        with CallRecordBuffer(size=100, interval=60) as buffer:
+            buffer.add(self.record("CA1"))
+
+        record = CallRecord.objects.get(sid="CA1")
+        self.assertEqual(record.status, "completed")
+        self.assertEqual(record.duration, 42)
+        self.assertFalse(CallStatusEvent.objects.exists())
@@ -0,0 +1,184 @@
+from datetime import timedelta
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from django.contrib.auth.models import User
+from django.test import SimpleTestCase, TestCase
+from django.utils import timezone
+from twilio.base.exceptions import TwilioRestException
+
+from api.models import CallerId, Contact, ContactList, area_code
+from api.services.caller_ids import CallerIdDispatcher, get_caller_id_dispatcher
+from api.services.dialer import TwilioDialerService
+from api.services.outcomes import DialOutcome
+from api.services.ratelimit import LocalBucketBackend, RateLimiter
+
+NUMBERS = ["+14155550001", "+14155550002", "+12125550003"]
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+def pool(*limits):
+    return [(number, limit, 0) for number, limit in zip(NUMBERS, limits)]
+
+
+class CallerIdDispatcherTests(SimpleTestCase):
+    def test_area_code(self):
+        self.assertEqual(area_code("+14155550100"), "1415")
+        self.assertEqual(area_code("+442071234567"), "4420")
+        self.assertIsNone(area_code("not a number"))
+
+    def test_round_robin_skips_saturated_numbers(self):
+        dispatcher = CallerIdDispatcher(pool(1, 0, 0))
+        picked = [dispatcher.acquire("+15550000000") for _ in range(5)]
+        self.assertEqual(
+            picked, [NUMBERS[0], NUMBERS[1], NUMBERS[2], NUMBERS[1], NUMBERS[2]]
+        )
+
+        dispatcher = CallerIdDispatcher(pool(1, 1, 1))
+        for _ in range(3):
+            dispatcher.acquire("+15550000000")
+        self.assertIsNone(dispatcher.acquire("+15550000000"))
+        dispatcher.release(NUMBERS[1], DialOutcome.success(None))
+        self.assertEqual(dispatcher.acquire("+15550000000"), NUMBERS[1])
+
+    def test_least_recently_used(self):
+        dispatcher = CallerIdDispatcher(pool(0, 0, 0), strategy="lru")
+        picked = [dispatcher.acquire("+15550000000") for _ in range(3)]
+        self.assertEqual(picked, NUMBERS)
+        # the number used longest ago is next
+        self.assertEqual(dispatcher.acquire("+15550000000"), NUMBERS[0])
+
+    def test_area_code_affinity(self):
+        dispatcher = CallerIdDispatcher(pool(0, 0, 0), strategy="area_code")
+        self.assertEqual(dispatcher.acquire("+12125559999"), NUMBERS[2])
+        self.assertEqual(dispatcher.acquire("+14155559999"), NUMBERS[0])
+        self.assertEqual(dispatcher.acquire("+14155559999"), NUMBERS[1])
+        # no number shares the area code, fall back to round-robin
+        self.assertIn(dispatcher.acquire("+13105559999"), NUMBERS)
+
+    def test_cooldown(self):
+        clock = FakeClock()
+        dispatcher = CallerIdDispatcher(pool(0, 0), cooldown=30, clock=clock)
+        number = dispatcher.acquire("+15550000000")
+        error = TwilioRestException(429, "/Calls", "Too Many Requests")
+        dispatcher.release(number, DialOutcome.failure(error))
+
+        self.assertEqual(dispatcher.available_in(), 30)
+        self.assertEqual(
+            [dispatcher.acquire("+15550000000") for _ in range(2)], [NUMBERS[1]] * 2
+        )
+        clock.now += 30
+        self.assertIsNone(dispatcher.available_in())
+        self.assertIn(NUMBERS[0], [dispatcher.acquire("+15550000000") for _ in "ab"])
+
+    def test_single_number_never_cools_down(self):
+        dispatcher = CallerIdDispatcher.single(NUMBERS[0])
+        error = TwilioRestException(429, "/Calls", "Too Many Requests")
+        dispatcher.release(dispatcher.acquire("+1"), DialOutcome.failure(error))
+        self.assertEqual(dispatcher.acquire("+1"), NUMBERS[0])
+
+
+class CallerIdPoolTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username="testuser", password="testpass123"
+        )
+        self.contacts = Contact.objects.bulk_create(
+            Contact(
+                user=self.user,
+                first_name=f"John{i}",
+                last_name="Doe",
+                city="Test City",
+                phone_number=f"+1415555{i:04d}",
+            )
+            for i in range(6)
+        )
+        self.contact_list = ContactList.objects.create(user=self.user, name="Test List")
+        self.contact_list.contacts.add(*self.contacts)
+        for number in NUMBERS:
+            CallerId.objects.create(phone_number=number)
+
+        patcher = patch("api.services.dialer.Client")
+        self.calls = patcher.start().return_value.calls
+        self.addCleanup(patcher.stop)
+        self.failures = {}
+        self.calls.create.side_effect = self.create
+
+    def create(self, **kwargs):
+        errors = self.failures.get(kwargs["from_"])
+        if errors:
+            raise errors.pop(0)
+        return SimpleNamespace(
+            sid=f"CA{kwargs['to']}", status="queued", duration=None, price=None
+        )
+
+    def from_numbers(self):
+        return [call.kwargs["from_"] for call in self.calls.create.call_args_list]
+
+    def test_pool_loading(self):
+        CallerId.objects.filter(phone_number=NUMBERS[2]).update(active=False)
+        CallerId.objects.filter(phone_number=NUMBERS[1]).update(
+            cooldown_until=timezone.now() + timedelta(minutes=1)
+        )
+        self.assertEqual(
+            CallerId.objects.get(phone_number=NUMBERS[0]).area_code, "1415"
+        )
+
+        dispatcher = get_caller_id_dispatcher()
+        self.assertEqual(dispatcher.numbers, NUMBERS[:2])
+        CallerId.objects.filter(phone_number=NUMBERS[0]).update(account_sid="ACa")
+        self.assertEqual(
+            get_caller_id_dispatcher(account_sid="ACb").numbers, NUMBERS[1:2]
+        )
+        self.assertEqual(
+            get_caller_id_dispatcher(account_sid="ACa").numbers, NUMBERS[:2]
+        )
+        self.assertEqual(dispatcher.acquire("+1"), NUMBERS[0])
+        self.assertEqual(dispatcher.acquire("+1"), NUMBERS[0])
+
+        self.assertEqual(
+            get_caller_id_dispatcher("+15550000000").numbers[0], "+15550000000"
+        )
+        CallerId.objects.all().delete()
+        with self.settings(TWILIO_PHONE_NUMBER=None):
+            with self.assertRaises(ValueError):
+                get_caller_id_dispatcher()
+
+    def test_aggregate_rate_scales_with_pool(self):
+        clock = FakeClock()
+        service = TwilioDialerService("ACtest", "token")
+        service.rate_limiter = RateLimiter(
+            LocalBucketBackend(), number_rate=1, clock=clock, sleep=clock.sleep
+        )
+
+        self.assertEqual(
+            service.dialContactList(self.contact_list.id, "Hi"),
+            {"dialed": 6, "failed": 0},
+        )
+        self.assertEqual(self.from_numbers(), NUMBERS * 2)
+        # six calls at 1 CPS per number take one second over three numbers
+        self.assertEqual(clock.now, 1.0)
+
+    def test_throttled_number_cools_down(self):
+        self.failures[NUMBERS[0]] = [TwilioRestException(429, "/Calls", "busy")]
+        service = TwilioDialerService("ACtest", "token")
+
+        with self.settings(DIALER_RETRY_BASE_DELAY=0):
+            self.assertEqual(
+                service.dialContactList(self.contact_list.id, "Hi"),
+                {"dialed": 6, "failed": 0},
+            )
+        self.assertEqual(self.from_numbers().count(NUMBERS[0]), 1)
+        self.assertIsNotNone(
+            CallerId.objects.get(phone_number=NUMBERS[0]).cooldown_until
+        )
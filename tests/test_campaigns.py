@@ -0,0 +1,329 @@
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from celery.exceptions import SoftTimeLimitExceeded
+from django.contrib.auth.models import User
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+from twilio.base.exceptions import TwilioRestException
+
+from api.models import (
+    CallRecord,
+    Contact,
+    ContactList,
+    DialCampaign,
+    DialClaim,
+    FailedDial,
+)
+from api.services.outcomes import OUTCOME_UNKNOWN
+from api.services.webhooks import apply_status_event, apply_status_events
+from api.tasks import dial, dial_chunk, fail_dial_campaign
+
+
+class CampaignTestMixin:
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username="testuser", password="testpass123"
+        )
+        contacts = Contact.objects.bulk_create(
+            Contact(
+                user=self.user,
+                first_name=f"John{i}",
+                last_name="Doe",
+                city="Test City",
+                phone_number=f"+1234567{i:03d}",
+            )
+            for i in range(6)
+        )
+        self.contact_list = ContactList.objects.create(user=self.user, name="Test List")
+        self.contact_list.contacts.add(*contacts)
+        self.campaign = DialCampaign.objects.create(
+            user=self.user,
+            contact_list=self.contact_list,
+            message="Hi",
+            task_id="task-1",
+        )
+
+
+@override_settings(TWILIO_PHONE_NUMBER="+15550000000")
+class CampaignCounterTests(CampaignTestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        patcher = patch("api.services.dialer.Client")
+        self.calls = patcher.start().return_value.calls
+        self.addCleanup(patcher.stop)
+
+        def create(**kwargs):
+            if kwargs["to"].endswith("3"):
+                raise Exception("Twilio error")
+            return SimpleNamespace(
+                sid=f"CA{kwargs['to']}", status="queued", duration=None, price=None
+            )
+
+        self.calls.create.side_effect = create
+
+    def run_dial(self, chunk_size):
+        dial.apply(
+            args=(self.contact_list.id, "Hi"),
+            kwargs={"chunk_size": chunk_size, "campaign_id": self.campaign.id},
+        ).get()
+        self.campaign.refresh_from_db()
+
+    def counters(self):
+        return {
+            field: getattr(self.campaign, field)
+            for field in ("status", "total", "queued", "dialed", "failed", "completed")
+        }
+
+    def test_counters_after_dial(self):
+        self.run_dial(chunk_size=0)
+        self.assertEqual(
+            self.counters(),
+            {
+                "status": "completed",
+                "total": 6,
+                "queued": 0,
+                "dialed": 5,
+                "failed": 1,
+                "completed": 0,
+            },
+        )
+        self.assertIsNotNone(self.campaign.finished_at)
+        self.assertEqual(CallRecord.objects.filter(campaign=self.campaign).count(), 5)
+
+    def test_counters_after_fanned_out_dial(self):
+        self.run_dial(chunk_size=2)
+        self.assertEqual(self.counters()["dialed"], 5)
+        self.assertEqual(self.counters()["status"], "completed")
+
+    def test_ended_calls_are_counted_once(self):
+        self.run_dial(chunk_size=0)
+        apply_status_event("CA+1234567000", "completed", 10)
+        apply_status_event("CA+1234567000", "completed", 10)
+        apply_status_events(
+            [("CA+1234567001", "busy", None), ("CA+1234567002", "ringing", None)]
+        )
+        self.campaign.refresh_from_db()
+        self.assertEqual(self.campaign.completed, 2)
+
+    def test_missing_contact_list_fails_campaign(self):
+        with self.assertRaises(ContactList.DoesNotExist):
+            dial.apply(args=(0, "Hi"), kwargs={"campaign_id": self.campaign.id}).get()
+        self.campaign.refresh_from_db()
+        self.assertEqual(self.campaign.status, "failed")
+
+
+@override_settings(TWILIO_PHONE_NUMBER="+15550000000", CALL_RECORD_BUFFER_SIZE=2)
+class CampaignResumeTests(CampaignTestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        patcher = patch("api.services.dialer.Client")
+        self.calls = patcher.start().return_value.calls
+        self.addCleanup(patcher.stop)
+        self.calls.create.side_effect = lambda **kwargs: SimpleNamespace(
+            sid=f"CA{kwargs['to']}", status="queued", duration=None, price=None
+        )
+
+    def run_dial(self, chunk_size=0):
+        return dial.apply(
+            args=(self.contact_list.id, "Hi"),
+            kwargs={"chunk_size": chunk_size, "campaign_id": self.campaign.id},
+        )
+
+    def dialed_numbers(self):
+        return [call.kwargs["to"] for call in self.calls.create.call_args_list]
+
+    def crash_after(self, calls):
+        with patch("api.services.dialer.get_rate_limiter") as limiter:
+            limiter.return_value.acquire.side_effect = [None] * calls + [
+                RuntimeError("worker lost")
+            ]
+            self.assertIsInstance(self.run_dial().result, RuntimeError)
+
+    def test_rerun_after_crash_never_redials(self):
+        self.crash_after(3)
+        self.campaign.refresh_from_db()
+        self.assertEqual(self.campaign.status, "failed")
+        first_run = self.dialed_numbers()
+        self.assertEqual(len(first_run), 3)
+        # contact 3 was claimed but never dialed, so its claim was given back
+        self.assertEqual(DialClaim.objects.count(), 3)
+
+        self.calls.create.reset_mock()
+        self.run_dial().get()
+        second_run = self.dialed_numbers()
+        self.assertEqual(second_run, ["+1234567003", "+1234567004", "+1234567005"])
+        self.assertFalse(set(first_run) & set(second_run))
+
+        self.campaign.refresh_from_db()
+        self.assertEqual(self.campaign.status, "completed")
+        self.assertEqual((self.campaign.dialed, self.campaign.queued), (6, 0))
+        self.assertEqual(self.campaign.total, 6)
+        self.assertFalse(FailedDial.objects.exists())
+
+    def test_rerun_dead_letters_claims_without_outcome(self):
+        # a worker killed outright releases nothing, and the call it had in
+        # flight for contact 3 may or may not have been placed
+        with patch("api.services.campaigns.ClaimedContacts.release"):
+            self.crash_after(3)
+        self.assertEqual(DialClaim.objects.count(), 4)
+
+        self.calls.create.reset_mock()
+        self.run_dial().get()
+        self.assertEqual(self.dialed_numbers(), ["+1234567004", "+1234567005"])
+
+        failed_dial = FailedDial.objects.get()
+        self.assertEqual(failed_dial.phone_number, "+1234567003")
+        self.assertEqual(failed_dial.campaign, self.campaign)
+        self.assertFalse(failed_dial.transient)
+        self.assertTrue(failed_dial.error.startswith(OUTCOME_UNKNOWN))
+
+        self.campaign.refresh_from_db()
+        self.assertEqual(self.campaign.status, "completed")
+        self.assertEqual(
+            (self.campaign.dialed, self.campaign.failed, self.campaign.queued),
+            (5, 1, 0),
+        )
+
+        # a further rerun finds the contact already dead-lettered
+        self.run_dial().get()
+        self.assertEqual(FailedDial.objects.count(), 1)
+
+    @patch("api.services.scheduler.backoff_delay", return_value=60.0)
+    def test_contact_waiting_for_retry_is_dead_lettered_on_crash(self, backoff):
+        def create(**kwargs):
+            if kwargs["to"] == "+1234567001":
+                raise TwilioRestException(503, "/Calls", "unavailable")
+            return SimpleNamespace(
+                sid=f"CA{kwargs['to']}", status="queued", duration=None, price=None
+            )
+
+        self.calls.create.side_effect = create
+        self.crash_after(4)
+
+        failed_dial = FailedDial.objects.get()
+        self.assertEqual(failed_dial.phone_number, "+1234567001")
+        self.assertTrue(failed_dial.transient)
+        self.assertTrue(DialClaim.objects.filter(contact_id=failed_dial.contact_id))
+
+        self.calls.create.reset_mock()
+        self.run_dial().get()
+        self.assertEqual(self.dialed_numbers(), ["+1234567004", "+1234567005"])
+        self.assertEqual(FailedDial.objects.count(), 1)
+
+        self.campaign.refresh_from_db()
+        self.assertEqual(
+            (self.campaign.dialed, self.campaign.failed, self.campaign.queued),
+            (5, 1, 0),
+        )
+
+    def test_failed_chunk_leaves_fanned_out_campaign_running(self):
+        DialCampaign.objects.filter(pk=self.campaign.pk).update(status="in_progress")
+        self.calls.create.side_effect = SoftTimeLimitExceeded()
+
+        with self.assertRaises(SoftTimeLimitExceeded):
+            dial_chunk(
+                self.contact_list.id, "Hi", [None, None], campaign_id=self.campaign.id
+            )
+        self.campaign.refresh_from_db()
+        self.assertEqual(self.campaign.status, "in_progress")
+
+        fail_dial_campaign(None, RuntimeError("chunk failed"), None, self.campaign.id)
+        self.campaign.refresh_from_db()
+        self.assertEqual(self.campaign.status, "failed")
+
+    def test_rerun_of_finished_campaign_places_no_calls(self):
+        self.run_dial(chunk_size=2).get()
+        self.assertEqual(self.calls.create.call_count, 6)
+        self.campaign.refresh_from_db()
+        self.assertEqual(len(self.campaign.chunk_bounds), 3)
+
+        self.calls.create.reset_mock()
+        self.assertEqual(
+            self.run_dial(chunk_size=2).get(), {"chunks": 3, "dialed": 0, "failed": 0}
+        )
+        self.calls.create.assert_not_called()
+        self.assertEqual(CallRecord.objects.count(), 6)
+
+
+class CampaignProgressViewTests(CampaignTestMixin, APITestCase):
+    def setUp(self):
+        super().setUp()
+        self.client.force_authenticate(user=self.user)
+
+    @patch("api.tasks.dial.delay")
+    def test_dial_creates_campaign(self, mock_dial):
+        mock_dial.return_value.id = "task-2"
+        url = reverse("contactlist-dial", args=[self.contact_list.id])
+        response = self.client.post(url, {"message": "Hi"})
+        campaign = DialCampaign.objects.get(pk=response.data["campaign_id"])
+        self.assertEqual(campaign.task_id, "task-2")
+        self.assertEqual(
+            mock_dial.call_args.kwargs, {"campaign_id": response.data["campaign_id"]}
+        )
+
+    @patch("api.tasks.AsyncResult")
+    def test_progress_is_a_single_read(self, mock_async_result):
+        DialCampaign.objects.filter(pk=self.campaign.pk).update(
+            status="in_progress", total=6, queued=2, dialed=4
+        )
+        url = reverse("contactlist-check-dial-status")
+        with self.assertNumQueries(1):
+            response = self.client.get(url, {"task_id": "task-1"})
+        self.assertEqual(response.data["status"], "in_progress")
+        self.assertEqual(response.data["dialed"], 4)
+        mock_async_result.assert_not_called()
+
+        with self.assertNumQueries(1):
+            response = self.client.get(url, {"campaign_id": self.campaign.id})
+        self.assertEqual(response.data["queued"], 2)
+
+    @patch("api.tasks.dial.delay")
+    def test_resume_reruns_failed_campaign(self, mock_dial):
+        mock_dial.return_value.id = "task-2"
+        DialCampaign.objects.filter(pk=self.campaign.pk).update(status="failed")
+        url = reverse("dialcampaign-resume", args=[self.campaign.id])
+
+        response = self.client.post(url)
+
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        mock_dial.assert_called_once_with(
+            self.contact_list.id, "Hi", campaign_id=self.campaign.id
+        )
+        self.campaign.refresh_from_db()
+        self.assertEqual(
+            (self.campaign.status, self.campaign.task_id), ("pending", "task-2")
+        )
+
+        # the campaign is pending now, so a second request is refused
+        response = self.client.post(url)
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+        mock_dial.assert_called_once()
+
+    @patch("api.tasks.dial.delay")
+    def test_running_campaign_cannot_be_resumed(self, mock_dial):
+        DialCampaign.objects.filter(pk=self.campaign.pk).update(status="in_progress")
+        response = self.client.post(
+            reverse("dialcampaign-resume", args=[self.campaign.id])
+        )
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+        mock_dial.assert_not_called()
+
+    def test_campaigns_are_scoped_to_user(self):
+        other = User.objects.create_user(username="other", password="testpass123")
+        DialCampaign.objects.create(user=other, message="Hi", task_id="task-other")
+
+        response = self.client.get(reverse("contactlist-latest-task-ids"))
+        self.assertEqual(response.data["latest_task_ids"], ["task-1"])
+
+        response = self.client.get(reverse("dialcampaign-list"))
+        self.assertEqual([c["task_id"] for c in response.data], ["task-1"])
+
+        url = reverse("contactlist-check-dial-status")
+        with patch("api.tasks.AsyncResult") as mock_async_result:
+            mock_async_result.return_value.ready.return_value = False
+            mock_async_result.return_value.state = "PENDING"
+            response = self.client.get(url, {"task_id": "task-other"})
+        self.assertEqual(response.data, {"status": "pending"})
@@ -0,0 +1,134 @@
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from celery.exceptions import SoftTimeLimitExceeded
+from django.contrib.auth.models import User
+from django.test import TestCase
+
+from api.models import CallRecord, Contact, ContactList, FailedDial
+from api.services.contacts import iter_list_contacts
+from api.services.dialer import TwilioDialerService
+
+
+def fake_call(sid, status="queued"):
+    return SimpleNamespace(sid=sid, status=status, duration=None, price=None)
+
+
+class DialerTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username="testuser", password="testpass123"
+        )
+        self.contacts = Contact.objects.bulk_create(
+            Contact(
+                user=self.user,
+                first_name=f"John{i}",
+                last_name="Doe",
+                city="Test City",
+                phone_number=f"+1234567{i:03d}",
+            )
+            for i in range(20)
+        )
+        self.contact_list = ContactList.objects.create(user=self.user, name="Test List")
+        self.contact_list.contacts.add(*self.contacts)
+
+        patcher = patch("api.services.dialer.Client")
+        self.client_cls = patcher.start()
+        self.addCleanup(patcher.stop)
+        self.calls = self.client_cls.return_value.calls
+        self.calls.create.side_effect = lambda **kwargs: fake_call(f"CA{kwargs['to']}")
+        self.service = TwilioDialerService("ACtest", "token")
+
+    def test_dial_contact_list_sequential(self):
+        self.service.dialContactList(
+            self.contact_list.id, "Hello {first_name}", "+15550000000", 1
+        )
+        self.assertEqual(self.calls.create.call_count, 20)
+        self.assertEqual(CallRecord.objects.count(), 20)
+
+    def test_dial_contact_list_concurrent(self):
+        self.service.dialContactList(
+            self.contact_list.id, "Hello {first_name}", "+15550000000", 8
+        )
+        self.assertEqual(self.calls.create.call_count, 20)
+        self.assertEqual(
+            set(CallRecord.objects.values_list("contact_id", flat=True)),
+            {contact.id for contact in self.contacts},
+        )
+        record = CallRecord.objects.get(contact=self.contacts[0])
+        self.assertEqual(record.sid, f"CA{self.contacts[0].phone_number}")
+        self.assertEqual(record.user, self.user)
+
+    def test_dial_errors_are_isolated_per_contact(self):
+        failing = self.contacts[3].phone_number
+
+        def create(**kwargs):
+            if kwargs["to"] == failing:
+                raise RuntimeError("boom")
+            return fake_call(f"CA{kwargs['to']}")
+
+        self.calls.create.side_effect = create
+        self.service.dialContactList(
+            self.contact_list.id, "Hello {first_name}", "+15550000000", 8
+        )
+        self.assertEqual(CallRecord.objects.count(), 19)
+        self.assertFalse(CallRecord.objects.filter(phone_number=failing).exists())
+
+    def test_placed_call_with_unreadable_fields_is_recorded(self):
+        placed = self.contacts[3].phone_number
+
+        def create(**kwargs):
+            call = fake_call(f"CA{kwargs['to']}")
+            if kwargs["to"] == placed:
+                call.duration, call.price = "n/a", "-0.01x"
+            return call
+
+        self.calls.create.side_effect = create
+        totals = self.service.dialContactList(
+            self.contact_list.id, "Hello {first_name}", "+15550000000", 1
+        )
+        self.assertEqual(totals, {"dialed": 20, "failed": 0})
+        record = CallRecord.objects.get(phone_number=placed)
+        self.assertEqual((record.duration, record.cost), (0, 0))
+        self.assertFalse(FailedDial.objects.exists())
+
+    def test_soft_time_limit_stops_dialing_and_flushes(self):
+        def create(**kwargs):
+            if self.calls.create.call_count == 6:
+                raise SoftTimeLimitExceeded()
+            return fake_call(f"CA{kwargs['to']}")
+
+        self.calls.create.side_effect = create
+        with self.assertRaises(SoftTimeLimitExceeded):
+            self.service.dialContactList(
+                self.contact_list.id, "Hello {first_name}", "+15550000000", 1
+            )
+
+        self.assertEqual(self.calls.create.call_count, 6)
+        self.assertEqual(CallRecord.objects.count(), 5)
+        self.assertFalse(FailedDial.objects.exists())
+
+    def test_soft_time_limit_while_recording_a_call(self):
+        with patch(
+            "api.services.dialer.contact_name_key",
+            side_effect=[""] * 3 + [SoftTimeLimitExceeded()],
+        ):
+            with self.assertRaises(SoftTimeLimitExceeded):
+                self.service.dialContactList(
+                    self.contact_list.id, "Hello {first_name}", "+15550000000", 1
+                )
+
+        self.assertEqual(self.calls.create.call_count, 4)
+        self.assertEqual(CallRecord.objects.count(), 3)
+
+    def test_iter_list_contacts_streams_in_chunks(self):
+        with self.assertNumQueries(5):
+            rows = list(iter_list_contacts(self.contact_list.id, chunk_size=5))
+        self.assertEqual([row.id for row in rows], [c.id for c in self.contacts])
+        self.assertEqual(rows[0].first_name, "John0")
+        self.assertEqual(rows[0].phone_number, self.contacts[0].phone_number)
+
+    def test_iter_list_contacts_restricted_to_ids(self):
+        ids = [self.contacts[1].id, self.contacts[7].id]
+        rows = iter_list_contacts(self.contact_list.id, contact_ids=ids)
+        self.assertEqual([row.id for row in rows], ids)
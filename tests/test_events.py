@@ -0,0 +1,114 @@
+from unittest.mock import patch
+
+from django.contrib.auth.models import User
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from api.models import CallRecord, Contact, DialCampaign
+from api.services.events import InMemoryBroker, ProgressPublisher, user_channel
+from api.services.webhooks import apply_status_event
+
+
+class ProgressPublisherTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username="testuser", password="testpass123"
+        )
+        self.contact = Contact.objects.create(
+            user=self.user,
+            first_name="John",
+            last_name="Doe",
+            city="Test City",
+            phone_number="+1234567890",
+        )
+        self.campaign = DialCampaign.objects.create(
+            user=self.user, message="Hi", status="in_progress", total=100, dialed=100
+        )
+        CallRecord.objects.bulk_create(
+            CallRecord(
+                sid=f"CA{i}",
+                user=self.user,
+                contact=self.contact,
+                campaign=self.campaign,
+                phone_number=self.contact.phone_number,
+                status="queued",
+            )
+            for i in range(100)
+        )
+        self.broker = InMemoryBroker()
+        self.published = []
+        self.broker.publish = lambda channel, message: self.published.append(
+            (channel, message)
+        )
+        self.publisher = ProgressPublisher(self.broker, autostart=False)
+
+    def test_burst_is_coalesced_into_one_message_per_user(self):
+        for i in range(100):
+            self.publisher.calls_changed([f"CA{i}"])
+            self.publisher.calls_changed([f"CA{i}"])
+        self.publisher.campaigns_changed([self.campaign.id])
+
+        with self.assertNumQueries(2):
+            self.assertEqual(self.publisher.flush(), 1)
+
+        [(channel, message)] = self.published
+        self.assertEqual(channel, user_channel(self.user.id))
+        self.assertEqual(len(message["calls"]), 100)
+        self.assertEqual(message["campaigns"][0]["dialed"], 100)
+        self.assertEqual(self.publisher.flush(), 0)
+
+    def test_webhook_transitions_are_published(self):
+        with patch(
+            "api.services.events.get_progress_publisher", return_value=self.publisher
+        ):
+            apply_status_event("CA1", "ringing")
+            apply_status_event("CA1", "ringing")
+
+        self.publisher.flush()
+        [(_, message)] = self.published
+        self.assertEqual(
+            message["calls"],
+            [
+                {
+                    "sid": "CA1",
+                    "status": "ringing",
+                    "duration": 0,
+                    "campaign_id": self.campaign.id,
+                }
+            ],
+        )
+
+
+@override_settings(PROGRESS_EVENTS="memory")
+class ProgressEventStreamTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username="testuser", password="testpass123"
+        )
+        self.token = str(RefreshToken.for_user(self.user).access_token)
+
+    async def test_requires_authentication(self):
+        response = await self.async_client.get(reverse("progress-events"))
+        self.assertEqual(response.status_code, 401)
+
+    async def test_streams_published_messages(self):
+        from api.services.events import get_event_broker
+
+        response = await self.async_client.get(
+            reverse("progress-events"),
+            headers={"Authorization": f"Bearer {self.token}"},
+        )
+        self.assertEqual(response["Content-Type"], "text/event-stream")
+
+        stream = aiter(response.streaming_content)
+        self.assertEqual(await anext(stream), b": connected\n\n")
+
+        get_event_broker().publish(
+            user_channel(self.user.id), {"calls": [], "campaigns": [{"id": 1}]}
+        )
+        self.assertEqual(
+            await anext(stream),
+            b'event: progress\ndata: {"calls": [], "campaigns": [{"id": 1}]}\n\n',
+        )
+        await stream.aclose()
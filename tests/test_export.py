@@ -0,0 +1,87 @@
+import csv
+import gzip
+import io
+import json
+from datetime import timedelta
+
+from django.contrib.auth.models import User
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from api.models import CallRecord, Contact
+
+
+class CallRecordExportTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username="testuser", password="testpass123"
+        )
+        self.client.force_authenticate(user=self.user)
+        self.contact = Contact.objects.create(
+            user=self.user,
+            first_name="John",
+            last_name="Doe",
+            city="Test City",
+            phone_number="+14155550123",
+        )
+        for i in range(3):
+            CallRecord.objects.create(
+                sid=f"CA{i}",
+                user=self.user,
+                contact=self.contact,
+                phone_number=self.contact.phone_number,
+                status="completed",
+                duration=10 * i,
+                cost="0.25",
+            )
+        other = User.objects.create_user(username="other", password="testpass123")
+        CallRecord.objects.create(
+            sid="CAother",
+            user=other,
+            contact=Contact.objects.create(
+                user=other, first_name="A", last_name="B", phone_number="+1"
+            ),
+            phone_number="+1",
+        )
+        self.url = reverse("callrecord-export")
+
+    def content(self, response):
+        return b"".join(response.streaming_content)
+
+    def test_csv_export(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response["Content-Type"], "text/csv")
+        self.assertIn("call-records.csv", response["Content-Disposition"])
+
+        rows = list(csv.DictReader(io.StringIO(self.content(response).decode())))
+        self.assertEqual([row["sid"] for row in rows], ["CA0", "CA1", "CA2"])
+        self.assertEqual(rows[1]["contact_first_name"], "John")
+        self.assertEqual(rows[2]["duration"], "20")
+
+    def test_ndjson_export_with_filters(self):
+        CallRecord.objects.filter(sid="CA0").update(
+            created_at=timezone.now() - timedelta(days=10)
+        )
+        since = (timezone.now() - timedelta(days=1)).isoformat()
+        response = self.client.get(
+            self.url,
+            {"file_format": "ndjson", "created_after": since, "phone_number": "1415"},
+        )
+        lines = self.content(response).decode().splitlines()
+        records = [json.loads(line) for line in lines]
+        self.assertEqual([record["sid"] for record in records], ["CA1", "CA2"])
+        self.assertEqual(records[0]["cost"], "0.25")
+
+    def test_gzip_export(self):
+        response = self.client.get(self.url, {"gzip": "true"})
+        self.assertEqual(response["Content-Type"], "application/gzip")
+        self.assertIn("call-records.csv.gz", response["Content-Disposition"])
+        lines = gzip.decompress(self.content(response)).decode().splitlines()
+        self.assertEqual(len(lines), 4)
+
+    def test_unknown_format(self):
+        response = self.client.get(self.url, {"file_format": "xml"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
@@ -0,0 +1,108 @@
+import io
+from unittest.mock import patch
+
+from django.contrib.auth.models import User
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from api.models import Contact
+from api.services.importer import (
+    ContactImporter,
+    iter_rows,
+    normalize_phone_number,
+)
+
+CSV = b"""first_name,last_name,city,phone_number
+John,Doe,Boston,(415) 555-0100
+Jane,Doe,Boston,+1 415 555 0101
+Dup,Doe,Boston,415-555-0100
+Bad,Number,Boston,12345
+,Missing,Boston,415-555-0102
+"""
+
+
+class ContactImporterTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username="testuser", password="testpass123"
+        )
+
+    def test_normalize_phone_number(self):
+        self.assertEqual(normalize_phone_number("(415) 555-0100"), "+14155550100")
+        self.assertEqual(normalize_phone_number("+44 20 7946 0958"), "+442079460958")
+        self.assertIsNone(normalize_phone_number("12345"))
+        self.assertIsNone(normalize_phone_number("not a number"))
+
+    def test_csv_import_counts(self):
+        Contact.objects.create(
+            user=self.user,
+            first_name="Existing",
+            last_name="Doe",
+            city="Boston",
+            phone_number="+14155550101",
+        )
+        progress = []
+        importer = ContactImporter(self.user.id, chunk_size=2, progress=progress.append)
+        counts = importer.run(iter_rows(io.BytesIO(CSV), "csv"))
+
+        self.assertEqual(counts, {"inserted": 1, "duplicate": 2, "invalid": 2})
+        self.assertEqual(len(progress), 2)
+        self.assertTrue(
+            Contact.objects.filter(
+                user=self.user, first_name="John", phone_number="+14155550100"
+            ).exists()
+        )
+
+    def test_ndjson_import(self):
+        ndjson = (
+            b'{"first_name": "John", "phone_number": "4155550100", "city": "SF"}\n'
+            b"\n"
+            b"not json\n"
+            b'{"first_name": "Jane", "phone_number": "4155550101"}\n'
+        )
+        counts = ContactImporter(self.user.id).run(
+            iter_rows(io.BytesIO(ndjson), "ndjson")
+        )
+        self.assertEqual(counts, {"inserted": 2, "duplicate": 0, "invalid": 1})
+
+
+class ContactImportViewTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username="testuser", password="testpass123"
+        )
+        self.client.force_authenticate(user=self.user)
+
+    def test_small_import_runs_inline(self):
+        upload = SimpleUploadedFile("leads.csv", CSV, content_type="text/csv")
+        response = self.client.post(
+            reverse("contact-import-contacts"), {"file": upload}, format="multipart"
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data, {"inserted": 2, "duplicate": 1, "invalid": 2})
+        self.assertEqual(Contact.objects.filter(user=self.user).count(), 2)
+
+    def test_undecodable_import_is_rejected(self):
+        upload = SimpleUploadedFile(
+            "leads.csv", b"first_name,phone_number\n\xff\xfe,+1\n", "text/csv"
+        )
+        response = self.client.post(
+            reverse("contact-import-contacts"), {"file": upload}, format="multipart"
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    @override_settings(CONTACT_IMPORT_ASYNC_THRESHOLD=10)
+    @patch("api.views.default_storage.save", return_value="imports/1.csv")
+    @patch("api.tasks.import_contacts.delay")
+    def test_large_import_runs_as_task(self, mock_import, mock_save):
+        mock_import.return_value.id = "import_task_id"
+        upload = SimpleUploadedFile("leads.csv", CSV, content_type="text/csv")
+        response = self.client.post(
+            reverse("contact-import-contacts"), {"file": upload}, format="multipart"
+        )
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(response.data["task_id"], "import_task_id")
+        mock_import.assert_called_once_with(self.user.id, "imports/1.csv", "csv")
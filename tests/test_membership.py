@@ -0,0 +1,100 @@
+from django.contrib.auth.models import User
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from api.models import Contact, ContactList
+from api.services.membership import update_membership
+
+
+class MembershipTestMixin:
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username="testuser", password="testpass123"
+        )
+        self.contacts = Contact.objects.bulk_create(
+            Contact(
+                user=self.user,
+                first_name=f"John{i}",
+                last_name="Doe",
+                city="Boston" if i % 2 else "Austin",
+                phone_number=f"+1415555{i:04d}",
+            )
+            for i in range(10)
+        )
+        self.contact_list = ContactList.objects.create(user=self.user, name="Test List")
+        self.contact_list.contacts.add(*self.contacts[:3])
+
+    def member_ids(self):
+        return set(self.contact_list.contacts.values_list("id", flat=True))
+
+    def ids(self, *indexes):
+        return {self.contacts[i].id for i in indexes}
+
+
+class UpdateMembershipTests(MembershipTestMixin, TestCase):
+    def test_add_only_inserts_missing_members(self):
+        result = update_membership(
+            self.contact_list, "add", contact_ids=list(self.ids(2, 3, 4)), chunk_size=1
+        )
+        self.assertEqual(result, {"added": 2, "removed": 0})
+        self.assertEqual(self.member_ids(), self.ids(0, 1, 2, 3, 4))
+
+    def test_remove(self):
+        result = update_membership(
+            self.contact_list, "remove", contact_ids=list(self.ids(0, 5))
+        )
+        self.assertEqual(result, {"added": 0, "removed": 1})
+        self.assertEqual(self.member_ids(), self.ids(1, 2))
+
+    def test_replace_with_filter(self):
+        result = update_membership(
+            self.contact_list, "replace", contact_filter={"city": "Boston"}
+        )
+        self.assertEqual(result, {"added": 4, "removed": 2})
+        self.assertEqual(self.member_ids(), self.ids(1, 3, 5, 7, 9))
+
+    def test_other_users_contacts_are_ignored(self):
+        other = User.objects.create_user(username="other", password="testpass123")
+        foreign = Contact.objects.create(
+            user=other,
+            first_name="Eve",
+            last_name="Doe",
+            city="Boston",
+            phone_number="+14155559999",
+        )
+        update_membership(self.contact_list, "add", contact_ids=[foreign.id])
+        self.assertNotIn(foreign.id, self.member_ids())
+
+    def test_unsupported_filter(self):
+        with self.assertRaises(ValueError):
+            update_membership(self.contact_list, "add", contact_filter={"user_id": 1})
+
+
+class MembershipViewTests(MembershipTestMixin, APITestCase):
+    def setUp(self):
+        super().setUp()
+        self.client.force_authenticate(user=self.user)
+        self.url = reverse("contactlist-members", args=[self.contact_list.id])
+
+    def test_bulk_add(self):
+        response = self.client.post(
+            self.url,
+            {"operation": "add", "contact_ids": list(self.ids(3, 4, 5))},
+            format="json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data, {"added": 3, "removed": 0})
+
+    def test_requires_ids_or_filter(self):
+        response = self.client.post(self.url, {"operation": "add"}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_rejects_unsupported_filter(self):
+        response = self.client.post(
+            self.url,
+            {"operation": "add", "filter": {"user__username": "other"}},
+            format="json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
@@ -0,0 +1,146 @@
+import threading
+import time
+
+from django.db import connection
+from django.test import TestCase, TransactionTestCase
+
+from api.services.ratelimit import (
+    DatabaseBucketBackend,
+    LocalBucketBackend,
+    RateLimiter,
+)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1_000_000.0
+        self.slots = []
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.slots.append(self.now + seconds)
+
+
+def achieved_rate(timestamps):
+    timestamps = sorted(timestamps)
+    return (len(timestamps) - 1) / (timestamps[-1] - timestamps[0])
+
+
+class RateLimiterTests(TestCase):
+    def test_local_rate_under_thread_contention(self):
+        limiter = RateLimiter(LocalBucketBackend(), account_rate=100)
+        timestamps = []
+        lock = threading.Lock()
+
+        def worker():
+            for _ in range(20):
+                limiter.acquire("ACtest", "+15550000000")
+                with lock:
+                    timestamps.append(time.time())
+
+        threads = [threading.Thread(target=worker) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(len(timestamps), 160)
+        self.assertAlmostEqual(achieved_rate(timestamps), 100, delta=5)
+
+    def test_database_rate_shared_between_workers(self):
+        clock = FakeClock()
+        # several limiters stand in for separate Celery worker processes
+        workers = [
+            RateLimiter(
+                DatabaseBucketBackend(),
+                account_rate=10,
+                clock=clock,
+                sleep=clock.sleep,
+            )
+            for _ in range(4)
+        ]
+        for i in range(100):
+            workers[i % 4].acquire("ACtest", "+15550000000")
+            clock.now += 0.001
+
+        slots = sorted(clock.slots)
+        self.assertEqual(len(slots), 99)
+        self.assertAlmostEqual(achieved_rate(slots), 10, delta=0.5)
+
+    def test_number_and_account_buckets(self):
+        clock = FakeClock()
+        limiter = RateLimiter(
+            LocalBucketBackend(),
+            account_rate=10,
+            number_rate=1,
+            clock=clock,
+            sleep=clock.sleep,
+        )
+        for _ in range(3):
+            limiter.acquire("ACtest", "+15550000001")
+            limiter.acquire("ACtest", "+15550000002")
+
+        # each number is held to 1 CPS and the account spaces the two numbers
+        self.assertEqual(
+            [round(slot - clock.now, 2) for slot in clock.slots],
+            [0.1, 1.0, 1.1, 2.0, 2.1],
+        )
+
+    def test_burst_allows_initial_calls_through(self):
+        clock = FakeClock()
+        limiter = RateLimiter(
+            LocalBucketBackend(),
+            account_rate=1,
+            burst=3,
+            clock=clock,
+            sleep=clock.sleep,
+        )
+        delays = [limiter.acquire("ACtest", "+15550000000") for _ in range(5)]
+        self.assertEqual(delays, [0, 0, 0, 1.0, 2.0])
+
+    def test_reserve_does_not_sleep(self):
+        clock = FakeClock()
+        limiter = RateLimiter(
+            LocalBucketBackend(), account_rate=2, clock=clock, sleep=clock.sleep
+        )
+        delays = [limiter.reserve("ACtest", "+15550000000") for _ in range(3)]
+        self.assertEqual(delays, [0, 0.5, 1.0])
+        self.assertEqual(clock.slots, [])
+        self.assertTrue(limiter.enabled)
+        self.assertFalse(RateLimiter(LocalBucketBackend()).enabled)
+
+
+class DatabaseRateLimiterContentionTests(TransactionTestCase):
+    def test_database_rate_under_thread_contention(self):
+        # each thread has its own database connection, like separate workers
+        limiters = [
+            RateLimiter(DatabaseBucketBackend(), account_rate=50) for _ in range(8)
+        ]
+        timestamps = []
+        lock = threading.Lock()
+        start = threading.Barrier(len(limiters))
+
+        def worker(limiter):
+            try:
+                start.wait()
+                for _ in range(10):
+                    limiter.acquire("ACtest", "+15550000000")
+                    with lock:
+                        timestamps.append(time.time())
+            finally:
+                connection.close()
+
+        threads = [
+            threading.Thread(target=worker, args=(limiter,)) for limiter in limiters
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(len(timestamps), 80)
+        # every reservation went through the shared bucket row
+        self.assertTrue(all(not limiter.fallback._tat for limiter in limiters))
+        self.assertAlmostEqual(achieved_rate(timestamps), 50, delta=2.5)
@@ -0,0 +1,219 @@
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from django.contrib.auth.models import User
+from django.test import SimpleTestCase, TestCase
+from django.urls import reverse
+from requests.exceptions import ConnectionError as RequestsConnectionError
+from requests.exceptions import ConnectTimeout, ReadTimeout
+from rest_framework import status
+from rest_framework.test import APITestCase
+from twilio.base.exceptions import TwilioRestException
+from urllib3.exceptions import MaxRetryError, ProtocolError
+
+from api.models import (
+    CallRecord,
+    Contact,
+    ContactList,
+    DialCampaign,
+    DialClaim,
+    FailedDial,
+)
+from api.services.dialer import TwilioDialerService
+from api.services.outcomes import OUTCOME_UNKNOWN, DialOutcome, backoff_delay
+from api.tasks import redial_contacts
+
+
+def twilio_error(status_code, code=None):
+    return TwilioRestException(status_code, "/Calls", "error", code=code)
+
+
+class DialOutcomeTests(SimpleTestCase):
+    def test_classification(self):
+        self.assertTrue(DialOutcome.failure(twilio_error(429)).transient)
+        self.assertTrue(DialOutcome.failure(twilio_error(503)).transient)
+        self.assertTrue(DialOutcome.failure(ConnectTimeout("slow")).transient)
+        refused = RequestsConnectionError(MaxRetryError(None, "/Calls"))
+        self.assertTrue(DialOutcome.failure(refused).transient)
+        self.assertFalse(DialOutcome.failure(twilio_error(400, 21211)).transient)
+        self.assertFalse(DialOutcome.failure(ValueError("bad")).transient)
+        self.assertEqual(
+            DialOutcome.failure(twilio_error(400, 21211)).error_code, 21211
+        )
+        self.assertTrue(DialOutcome.success(object()).ok)
+
+    def test_failures_after_sending_have_unknown_outcome(self):
+        for exc in (
+            ReadTimeout("slow"),
+            RequestsConnectionError(ProtocolError("Connection aborted.")),
+            TimeoutError(),
+        ):
+            outcome = DialOutcome.failure(exc)
+            self.assertFalse(outcome.transient)
+            self.assertTrue(outcome.error.startswith(OUTCOME_UNKNOWN))
+        self.assertFalse(
+            DialOutcome.failure(ValueError("bad")).error.startswith(OUTCOME_UNKNOWN)
+        )
+
+    def test_backoff_is_exponential_and_capped(self):
+        delays = [backoff_delay(n, 1.0, 5.0, rand=lambda: 1.0) for n in (1, 2, 3, 4)]
+        self.assertEqual(delays, [1.0, 2.0, 4.0, 5.0])
+        self.assertEqual(backoff_delay(3, rand=lambda: 0.0), 0.0)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+class RetryTestMixin:
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username="testuser", password="testpass123"
+        )
+        self.contacts = Contact.objects.bulk_create(
+            Contact(
+                user=self.user,
+                first_name=f"John{i}",
+                last_name="Doe",
+                city="Test City",
+                phone_number=f"+1234567{i:03d}",
+            )
+            for i in range(3)
+        )
+        self.contact_list = ContactList.objects.create(user=self.user, name="Test List")
+        self.contact_list.contacts.add(*self.contacts)
+        self.campaign = DialCampaign.objects.create(
+            user=self.user, contact_list=self.contact_list, message="Hi"
+        )
+
+        patcher = patch("api.services.dialer.Client")
+        self.calls = patcher.start().return_value.calls
+        self.addCleanup(patcher.stop)
+        self.failures = {}
+        self.calls.create.side_effect = self.create
+
+    def create(self, **kwargs):
+        errors = self.failures.get(kwargs["to"])
+        if errors:
+            raise errors.pop(0)
+        return SimpleNamespace(
+            sid=f"CA{kwargs['to']}", status="queued", duration=None, price=None
+        )
+
+    def service(self):
+        service = TwilioDialerService("ACtest", "token")
+        service.clock = FakeClock()
+        service.sleep = service.clock.sleep
+        return service
+
+    def dial(self, concurrency=1, **kwargs):
+        return self.service().dialContactList(
+            self.contact_list.id,
+            "Hi",
+            "+15550000000",
+            concurrency,
+            campaign_id=self.campaign.id,
+            **kwargs,
+        )
+
+    def dialed(self):
+        return [call.kwargs["to"] for call in self.calls.create.call_args_list]
+
+
+class DialRetryTests(RetryTestMixin, TestCase):
+    @patch("api.services.scheduler.backoff_delay", return_value=5.0)
+    def test_retry_does_not_hold_up_other_contacts(self, backoff):
+        first = self.contacts[0].phone_number
+        self.failures[first] = [twilio_error(503)]
+
+        self.assertEqual(self.dial(), {"dialed": 3, "failed": 0})
+        self.assertEqual(
+            self.dialed(),
+            [
+                first,
+                self.contacts[1].phone_number,
+                self.contacts[2].phone_number,
+                first,
+            ],
+        )
+        backoff.assert_called_once_with(1, 1.0, 30.0)
+        self.assertFalse(FailedDial.objects.exists())
+
+    def test_concurrent_retries(self):
+        for contact in self.contacts:
+            self.failures[contact.phone_number] = [ConnectTimeout("slow")] * 2
+        with self.settings(DIALER_RETRY_BASE_DELAY=0):
+            self.assertEqual(self.dial(concurrency=4), {"dialed": 3, "failed": 0})
+        self.assertEqual(self.calls.create.call_count, 9)
+
+    def test_failures_are_dead_lettered(self):
+        self.failures[self.contacts[0].phone_number] = [twilio_error(429)] * 3
+        self.failures[self.contacts[1].phone_number] = [twilio_error(400, 21211)]
+
+        with self.settings(DIALER_RETRY_BASE_DELAY=0):
+            self.assertEqual(self.dial(), {"dialed": 1, "failed": 2})
+
+        transient = FailedDial.objects.get(contact=self.contacts[0])
+        self.assertEqual((transient.transient, transient.attempts), (True, 3))
+        permanent = FailedDial.objects.get(contact=self.contacts[1])
+        self.assertEqual((permanent.transient, permanent.attempts), (False, 1))
+        self.assertEqual(permanent.error_code, 21211)
+        self.assertEqual(permanent.campaign, self.campaign)
+
+        self.campaign.refresh_from_db()
+        self.assertEqual(self.campaign.failed, 2)
+
+    def test_read_timeout_is_not_retried(self):
+        self.failures[self.contacts[0].phone_number] = [ReadTimeout("slow")]
+
+        self.assertEqual(self.dial(), {"dialed": 2, "failed": 1})
+
+        self.assertEqual(self.calls.create.call_count, 3)
+        failed = FailedDial.objects.get(contact=self.contacts[0])
+        self.assertEqual((failed.transient, failed.attempts), (False, 1))
+        self.assertTrue(failed.error.startswith(OUTCOME_UNKNOWN))
+
+
+class RedriveTests(RetryTestMixin, APITestCase):
+    def setUp(self):
+        super().setUp()
+        self.client.force_authenticate(user=self.user)
+
+    @patch("api.tasks.redial_contacts.delay")
+    def test_redrive_releases_claims_and_redials(self, delay):
+        for contact in self.contacts[:2]:
+            self.failures[contact.phone_number] = [twilio_error(400)]
+        self.dial()
+        self.calls.create.reset_mock()
+
+        url = reverse("faileddial-redrive")
+        response = self.client.post(url, {"campaign_id": self.campaign.id})
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(response.data["redriven"], 2)
+
+        contact_ids = sorted(delay.call_args.args[1])
+        self.assertEqual(contact_ids, [c.id for c in self.contacts[:2]])
+        self.assertEqual(DialClaim.objects.filter(campaign=self.campaign).count(), 1)
+        self.campaign.refresh_from_db()
+        self.assertEqual(self.campaign.failed, 0)
+
+        # a second redrive finds nothing pending
+        response = self.client.post(url, {"campaign_id": self.campaign.id})
+        self.assertEqual(response.data["redriven"], 0)
+
+        with self.settings(TWILIO_PHONE_NUMBER="+15550000000"):
+            redial_contacts(self.campaign.id, contact_ids)
+        self.assertEqual(
+            sorted(self.dialed()), [c.phone_number for c in self.contacts[:2]]
+        )
+        self.assertEqual(CallRecord.objects.count(), 3)
+
+        response = self.client.get(reverse("faileddial-list"), {"pending": "true"})
+        self.assertEqual(response.data["results"], [])
@@ -0,0 +1,88 @@
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from django.test import SimpleTestCase
+from twilio.base.exceptions import TwilioRestException
+
+from api.services.caller_ids import CallerIdDispatcher
+from api.services.outcomes import DialOutcome
+from api.services.scheduler import DialScheduler
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def contact(i):
+    return SimpleNamespace(id=i, phone_number=f"+1234567{i:03d}")
+
+
+class DialSchedulerTests(SimpleTestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        self.caller_ids = CallerIdDispatcher(
+            [("+15550000000", 1, 0)], cooldown=0, clock=self.clock
+        )
+        self.scheduler = DialScheduler(
+            [contact(1), contact(2)], self.caller_ids, clock=self.clock
+        )
+
+    def start_next(self):
+        if self.scheduler.needs_contacts:
+            self.scheduler.read_contacts(10)
+        dial = self.scheduler.dispatch()
+        if dial is not None:
+            self.scheduler.start(dial[0].id, dial)
+        return dial
+
+    def test_contact_is_held_until_a_number_is_free(self):
+        first = self.start_next()
+        self.assertEqual(first[1:], (1, "+15550000000"))
+        self.assertIsNone(self.start_next())
+        self.assertEqual(self.scheduler.held[0].id, 2)
+
+        result = self.scheduler.finish(1, DialOutcome.success(object()))
+        self.assertEqual((result[0].id, result[2]), (1, 1))
+        self.assertEqual(self.start_next()[0].id, 2)
+        self.scheduler.finish(2, DialOutcome.success(object()))
+        self.assertIsNone(self.start_next())
+        self.assertTrue(self.scheduler.finished)
+
+    @patch("api.services.scheduler.backoff_delay", return_value=5.0)
+    def test_transient_failure_is_retried_after_backoff(self, backoff):
+        self.start_next()
+        busy = DialOutcome.failure(TwilioRestException(503, "/Calls", "busy"))
+        self.assertIsNone(self.scheduler.finish(1, busy))
+        self.assertEqual(self.scheduler.next_wake(), 5.0)
+
+        # contact 2 goes first while contact 1 waits out its backoff
+        self.assertEqual(self.start_next()[0].id, 2)
+        self.scheduler.finish(2, DialOutcome.success(object()))
+        self.assertIsNone(self.start_next())
+        self.assertFalse(self.scheduler.finished)
+
+        self.clock.now = 5.0
+        self.assertEqual(self.start_next()[:2], (contact(1), 2))
+        backoff.assert_called_once_with(1, 1.0, 30.0)
+
+    def test_gives_up_after_retry_attempts(self):
+        self.scheduler.retry_attempts = 1
+        self.start_next()
+        busy = DialOutcome.failure(TwilioRestException(503, "/Calls", "busy"))
+        result = self.scheduler.finish(1, busy)
+        self.assertEqual((result[0].id, result[1], result[2]), (1, busy, 1))
+        self.assertFalse(self.scheduler.retries)
+
+    @patch("api.services.scheduler.backoff_delay", return_value=5.0)
+    def test_give_up_returns_contacts_waiting_for_a_retry(self, backoff):
+        self.start_next()
+        busy = DialOutcome.failure(TwilioRestException(503, "/Calls", "busy"))
+        self.scheduler.finish(1, busy)
+
+        self.assertEqual(self.scheduler.give_up(), [(contact(1), busy, 1)])
+        self.assertFalse(self.scheduler.retries)
+        self.assertFalse(self.scheduler.failures)
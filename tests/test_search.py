@@ -0,0 +1,59 @@
+from django.contrib.auth.models import User
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from api.models import CallRecord, Contact
+
+
+class CallRecordSearchTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username="testuser", password="testpass123"
+        )
+        self.client.force_authenticate(user=self.user)
+        for i, (first_name, phone_number) in enumerate(
+            [
+                ("John", "+1 (415) 555-1234"),
+                ("Joanna", "+14155559876"),
+                ("Mary", "+12125551234"),
+            ]
+        ):
+            contact = Contact.objects.create(
+                user=self.user,
+                first_name=first_name,
+                last_name="Doe",
+                city="Test City",
+                phone_number=phone_number,
+            )
+            CallRecord.objects.create(
+                sid=f"CA{i}",
+                user=self.user,
+                contact=contact,
+                phone_number=phone_number,
+                status="completed",
+            )
+
+    def search(self, **params):
+        response = self.client.get(reverse("callrecord-list"), params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return sorted(row["sid"] for row in response.data["results"])
+
+    def test_search_keys_are_populated(self):
+        record = CallRecord.objects.get(sid="CA0")
+        self.assertEqual(record.phone_digits, "14155551234")
+        self.assertEqual(record.phone_digits_reversed, "43215555141")
+        self.assertEqual(record.contact_name_key, "john doe")
+
+    def test_phone_prefix(self):
+        self.assertEqual(self.search(phone_number="+1415"), ["CA0", "CA1"])
+        self.assertEqual(self.search(phone_number="1212"), ["CA2"])
+
+    def test_phone_suffix(self):
+        self.assertEqual(self.search(phone_suffix="1234"), ["CA0", "CA2"])
+        self.assertEqual(self.search(phone_suffix="555-9876"), ["CA1"])
+
+    def test_contact_name_prefix(self):
+        self.assertEqual(self.search(contact_name="Jo"), ["CA0", "CA1"])
+        self.assertEqual(self.search(contact_name="john d"), ["CA0"])
+        self.assertEqual(self.search(contact_name="oh"), [])
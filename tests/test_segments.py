@@ -0,0 +1,96 @@
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from django.contrib.auth.models import User
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from api.models import CallRecord, Contact, ContactList
+from api.services.contacts import iter_contacts, list_contact_ids
+from api.services.dialer import TwilioDialerService
+from api.services.membership import update_membership
+
+
+class SegmentTestMixin:
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username="testuser", password="testpass123"
+        )
+        self.contacts = Contact.objects.bulk_create(
+            Contact(
+                user=self.user,
+                first_name=f"John{i}",
+                last_name="Doe",
+                city="Boston" if i % 2 else "Austin",
+                phone_number=f"+1{415 if i < 6 else 512}555{i:04d}",
+            )
+            for i in range(10)
+        )
+        self.segment = ContactList.objects.create(
+            user=self.user,
+            name="Boston 415",
+            segment={"city": "Boston", "phone_number__startswith": "+1415"},
+        )
+
+    def expected_ids(self):
+        return [self.contacts[i].id for i in (1, 3, 5)]
+
+
+class SegmentTests(SegmentTestMixin, TestCase):
+    def test_segment_is_evaluated_lazily(self):
+        self.assertFalse(self.segment.contacts.exists())
+        rows = list(iter_contacts(self.segment, chunk_size=2))
+        self.assertEqual([row.id for row in rows], self.expected_ids())
+        self.assertEqual(list(list_contact_ids(self.segment)), self.expected_ids())
+
+    def test_segment_follows_contact_changes(self):
+        Contact.objects.filter(id=self.contacts[1].id).update(city="Denver")
+        rows = iter_contacts(self.segment)
+        self.assertEqual([row.id for row in rows], self.expected_ids()[1:])
+
+    def test_membership_of_dynamic_list_cannot_be_edited(self):
+        with self.assertRaises(ValueError):
+            update_membership(self.segment, "add", contact_ids=[self.contacts[0].id])
+
+    @patch("api.services.dialer.Client")
+    def test_dialing_a_segment(self, client_cls):
+        client_cls.return_value.calls.create.side_effect = (
+            lambda **kwargs: SimpleNamespace(
+                sid=f"CA{kwargs['to']}", status="queued", duration=None, price=None
+            )
+        )
+        result = TwilioDialerService("ACtest", "token").dialContactList(
+            self.segment.id, "Hi {first_name}", "+15550000000"
+        )
+        self.assertEqual(result, {"dialed": 3, "failed": 0})
+        self.assertEqual(
+            sorted(CallRecord.objects.values_list("contact_id", flat=True)),
+            self.expected_ids(),
+        )
+
+
+class SegmentViewTests(SegmentTestMixin, APITestCase):
+    def setUp(self):
+        super().setUp()
+        self.client.force_authenticate(user=self.user)
+
+    def test_create_segment(self):
+        response = self.client.post(
+            reverse("contactlist-list"),
+            {"name": "Austin", "segment": {"city": "Austin"}},
+            format="json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        contact_list = ContactList.objects.get(id=response.data["id"])
+        self.assertEqual(contact_list.segment, {"city": "Austin"})
+        self.assertFalse(contact_list.contacts.exists())
+
+    def test_create_segment_with_unsupported_filter(self):
+        response = self.client.post(
+            reverse("contactlist-list"),
+            {"name": "Bad", "segment": {"user__username": "other"}},
+            format="json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
@@ -47,7 +47,8 @@ class SerializerTests(TestCase):
     def test_contact_list_serializer(self):
         serializer = ContactListSerializer(instance=self.contact_list)
         self.assertEqual(serializer.data["name"], "Test List")
-        self.assertIn(self.contact.id, serializer.data["contacts"])
+        self.assertEqual(serializer.data["contact_count"], 1)
+        self.assertNotIn("contacts", serializer.data)
 
     def test_call_record_serializer(self):
         serializer = CallRecordSerializer(instance=self.call_record)
@@ -0,0 +1,146 @@
+from datetime import date
+from decimal import Decimal
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from api.models import CallRecord, CallStatsDaily, Contact
+from api.services.buffer import CallRecordBuffer
+from api.services.webhooks import apply_status_event, apply_status_events
+
+
+class CallStatsTestMixin:
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username="testuser", password="testpass123"
+        )
+        self.contact = Contact.objects.create(
+            user=self.user,
+            first_name="John",
+            last_name="Doe",
+            city="Test City",
+            phone_number="+1234567890",
+        )
+
+    def dial(self, count, cost="0.10"):
+        with CallRecordBuffer() as buffer:
+            for i in range(count):
+                buffer.add(
+                    CallRecord(
+                        sid=f"CA{i}",
+                        user=self.user,
+                        contact=self.contact,
+                        phone_number=self.contact.phone_number,
+                        cost=Decimal(cost),
+                        status="queued",
+                    )
+                )
+
+    def stats(self):
+        return {
+            row.status: (row.calls, row.duration, row.cost)
+            for row in CallStatsDaily.objects.filter(user=self.user)
+        }
+
+
+class CallStatsRollupTests(CallStatsTestMixin, TestCase):
+    def test_flush_counts_dialed_calls(self):
+        self.dial(3)
+        self.assertEqual(self.stats(), {"dialed": (3, 0, Decimal("0.30"))})
+
+    def test_terminal_transitions_are_counted_once(self):
+        self.dial(3)
+        apply_status_event("CA0", "ringing")
+        apply_status_event("CA0", "completed", 30)
+        apply_status_event("CA0", "completed", 30)
+        apply_status_event("CA0", "in-progress")
+        apply_status_events(
+            [
+                ("CA1", "busy", None),
+                ("CA1", "ringing", None),
+                ("CA2", "completed", 15),
+                ("CA0", "completed", 30),
+            ]
+        )
+        self.assertEqual(
+            self.stats(),
+            {
+                "dialed": (3, 0, Decimal("0.30")),
+                "completed": (2, 45, Decimal("0")),
+                "busy": (1, 0, Decimal("0")),
+            },
+        )
+
+    def test_duration_correction_updates_rollup(self):
+        self.dial(1)
+        apply_status_event("CA0", "completed", 30)
+        apply_status_event("CA0", "completed", 42)
+        self.assertEqual(self.stats()["completed"], (1, 42, Decimal("0")))
+
+    def test_early_callback_is_counted_on_flush(self):
+        apply_status_event("CA0", "no-answer")
+        self.dial(1)
+        self.assertEqual(self.stats()["no-answer"][0], 1)
+
+
+class RebuildCallStatsTests(CallStatsTestMixin, TestCase):
+    def test_rebuild_matches_incremental_rollups(self):
+        self.dial(2)
+        apply_status_event("CA0", "completed", 30)
+        incremental = self.stats()
+
+        CallStatsDaily.objects.all().delete()
+        call_command("rebuild_call_stats", stdout=StringIO())
+        self.assertEqual(self.stats(), incremental)
+
+        out = StringIO()
+        call_command("rebuild_call_stats", "--verify", stdout=out)
+        self.assertIn("match", out.getvalue())
+
+    def test_verify_reports_drift(self):
+        self.dial(2)
+        CallStatsDaily.objects.update(calls=5)
+        with self.assertRaises(SystemExit):
+            call_command(
+                "rebuild_call_stats", "--verify", stdout=StringIO(), stderr=StringIO()
+            )
+
+
+class CallStatsViewTests(CallStatsTestMixin, APITestCase):
+    def setUp(self):
+        super().setUp()
+        self.client.force_authenticate(user=self.user)
+
+    def test_stats_are_read_from_rollups(self):
+        self.dial(4)
+        apply_status_event("CA0", "completed", 30)
+        apply_status_event("CA1", "completed", 10)
+        apply_status_event("CA2", "no-answer")
+
+        with self.assertNumQueries(1):
+            response = self.client.get(reverse("call-stats"))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        totals = response.data["totals"]
+        self.assertEqual(totals["dialed"], 4)
+        self.assertEqual(totals["answered"], 2)
+        self.assertEqual(totals["duration"], 40)
+        self.assertEqual(totals["cost"], Decimal("0.40"))
+        self.assertAlmostEqual(totals["answer_rate"], 0.6667)
+        self.assertEqual(len(response.data["days"]), 1)
+
+    def test_date_range(self):
+        self.dial(1)
+        response = self.client.get(
+            reverse("call-stats"), {"start": "2000-01-01", "end": "2000-01-31"}
+        )
+        self.assertEqual(response.data["days"], [])
+        self.assertEqual(response.data["start"], date(2000, 1, 1))
+
+        response = self.client.get(reverse("call-stats"), {"start": "2000-13-01"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
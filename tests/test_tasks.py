@@ -0,0 +1,74 @@
+from collections import Counter
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from django.contrib.auth.models import User
+from django.test import TestCase, override_settings
+
+from api.models import CallRecord, Contact, ContactList
+from api.tasks import aggregate_dial_results, dial, plan_chunks
+
+
+@override_settings(TWILIO_PHONE_NUMBER="+15550000000")
+class DialTaskTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username="testuser", password="testpass123"
+        )
+        contacts = Contact.objects.bulk_create(
+            Contact(
+                user=self.user,
+                first_name=f"John{i}",
+                last_name="Doe",
+                city="Test City",
+                phone_number=f"+1234567{i:03d}",
+            )
+            for i in range(12)
+        )
+        self.contact_list = ContactList.objects.create(user=self.user, name="Test List")
+        self.contact_list.contacts.add(*contacts)
+
+        patcher = patch("api.services.dialer.Client")
+        self.client_class = patcher.start()
+        self.calls = self.client_class.return_value.calls
+        self.addCleanup(patcher.stop)
+        self.calls.create.side_effect = lambda **kwargs: SimpleNamespace(
+            sid=f"CA{kwargs['to']}", status="queued", duration=None, price=None
+        )
+
+    def test_dial_fans_out_into_chunks(self):
+        result = dial.apply(args=(self.contact_list.id, "Hi"), kwargs={"chunk_size": 5})
+        self.assertEqual(self.calls.create.call_count, 12)
+        self.assertEqual(result.get(), {"chunks": 3, "dialed": 12, "failed": 0})
+        self.assertEqual(CallRecord.objects.count(), 12)
+
+    def test_chunks_are_sharded_across_accounts(self):
+        accounts = [
+            {"sid": "ACa", "auth_token": "token-a", "weight": 2},
+            {"sid": "ACb", "auth_token": "token-b", "weight": 1},
+        ]
+        with self.settings(TWILIO_ACCOUNTS=accounts):
+            dial.apply(args=(self.contact_list.id, "Hi"), kwargs={"chunk_size": 4})
+
+        self.assertEqual(
+            Counter(CallRecord.objects.values_list("account_sid", flat=True)),
+            {"ACa": 8, "ACb": 4},
+        )
+        credentials = {call.args[:2] for call in self.client_class.call_args_list}
+        self.assertEqual(credentials, {("ACa", "token-a"), ("ACb", "token-b")})
+
+    def test_dial_without_chunking(self):
+        result = dial.apply(args=(self.contact_list.id, "Hi"), kwargs={"chunk_size": 0})
+        self.assertEqual(result.get(), {"dialed": 12, "failed": 0})
+
+    def test_aggregate_dial_results(self):
+        aggregate = aggregate_dial_results(
+            [{"dialed": 5, "failed": 0}, {"dialed": 3, "failed": 2}]
+        )
+        self.assertEqual(aggregate, {"chunks": 2, "dialed": 8, "failed": 2})
+
+    def test_plan_chunks_streams_ids(self):
+        self.assertEqual(
+            plan_chunks(iter([2, 3, 5, 7, 11]), 2), ([[2, 3], [5, 7], [11, 11]], 5)
+        )
+        self.assertEqual(plan_chunks(iter([]), 2), ([], 0))
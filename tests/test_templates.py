@@ -0,0 +1,42 @@
+from types import SimpleNamespace
+
+from django.test import SimpleTestCase
+from twilio.twiml.voice_response import VoiceResponse
+
+from api.services.templates import MessageTemplate
+
+
+def legacy_render(message, contact):
+    message = message.replace("{first_name}", contact.first_name)
+    message = message.replace("{last_name}", contact.last_name)
+    message = message.replace("{city}", contact.city)
+    message = message.replace("{phone_number}", contact.phone_number)
+    response = VoiceResponse()
+    response.say(message, voice="Woman", language="en-US")
+    response.play("https://api.twilio.com/cowbell.mp3")
+    return str(response)
+
+
+class MessageTemplateTests(SimpleTestCase):
+    def setUp(self):
+        self.contact = SimpleNamespace(
+            first_name="John",
+            last_name="O'Doe & <Sons>",
+            city="Test City",
+            phone_number="+1234567890",
+        )
+
+    def test_render_matches_voice_response(self):
+        for message in [
+            "Hello {first_name} {last_name} from {city}, we'll call {phone_number}",
+            "Plain message with no placeholders",
+            "{first_name}{first_name} & <{city}>",
+        ]:
+            self.assertEqual(
+                MessageTemplate(message).render(self.contact),
+                legacy_render(message, self.contact),
+            )
+
+    def test_unknown_placeholders_are_rejected(self):
+        with self.assertRaisesMessage(ValueError, "email, nickname"):
+            MessageTemplate("Hi {nickname}, your {email} and {city}")
@@ -0,0 +1,66 @@
+import asyncio
+from unittest.mock import patch
+
+from aiohttp import web
+from django.test import SimpleTestCase
+
+from api.services.dialer import TwilioDialerService
+from api.services.outcomes import DialOutcome
+from api.services.twilio_http import (
+    AsyncTwilioHttpClient,
+    TwilioHttpClientRegistry,
+    get_twilio_http_client,
+)
+
+
+class TwilioHttpClientRegistryTests(SimpleTestCase):
+    def test_client_is_reused(self):
+        registry = TwilioHttpClientRegistry(pool_size=8)
+        http_client = registry.get()
+        self.assertIs(registry.get(), http_client)
+        adapter = http_client.session.get_adapter("https://api.twilio.com")
+        self.assertEqual(adapter._pool_maxsize, 8)
+
+    def test_client_is_rebuilt_after_fork(self):
+        registry = TwilioHttpClientRegistry()
+        parent = registry.get()
+        with patch("api.services.twilio_http.os.getpid", return_value=-1):
+            child = registry.get()
+        self.assertIsNot(child, parent)
+        self.assertIs(registry.get(), registry.get())
+
+    @patch("api.services.dialer.Client")
+    def test_dialer_services_share_the_http_client(self, client_cls):
+        TwilioDialerService("ACone", "token")
+        TwilioDialerService("ACtwo", "token")
+        first, second = client_cls.call_args_list
+        self.assertIs(first.kwargs["http_client"], get_twilio_http_client())
+        self.assertIs(second.kwargs["http_client"], get_twilio_http_client())
+
+
+class AsyncTwilioHttpClientTests(SimpleTestCase):
+    async def test_client_timeout_applies_to_requests(self):
+        async def slow(request):
+            await asyncio.sleep(2)
+            return web.Response()
+
+        app = web.Application()
+        app.router.add_post("/Calls", slow)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        await site.start()
+        url = f"http://127.0.0.1:{runner.addresses[0][1]}/Calls"
+        http_client = AsyncTwilioHttpClient(timeout=0.1)
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        try:
+            with self.assertRaises(asyncio.TimeoutError) as raised:
+                await http_client.request("POST", url, timeout=None)
+            elapsed = loop.time() - started
+        finally:
+            await http_client.close()
+            await runner.cleanup()
+
+        self.assertLess(elapsed, 1)
+        self.assertFalse(DialOutcome.failure(raised.exception).transient)
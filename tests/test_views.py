@@ -7,7 +7,7 @@ from django.utils import timezone
 from rest_framework import status
 from rest_framework.test import APITestCase
 
-from api.models import CallRecord, Contact, ContactList
+from api.models import CallRecord, CallStatusEvent, Contact, ContactList
 
 
 class ViewTests(APITestCase):
@@ -72,7 +72,37 @@ class ViewTests(APITestCase):
         url = reverse("callrecord-list")
         response = self.client.get(url)
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(response.data), 1)
+        self.assertEqual(len(response.data["results"]), 1)
+        self.assertNotIn("count", response.data)
+
+    def test_call_records_pages_cost_the_same_queries(self):
+        CallRecord.objects.bulk_create(
+            CallRecord(
+                sid=f"PAGE{i}",
+                user=self.user,
+                contact=self.contact,
+                phone_number="+1234567890",
+                status="completed",
+            )
+            for i in range(9)
+        )
+        url = reverse("callrecord-list")
+        seen = []
+        next_url = f"{url}?page_size=3"
+        while next_url:
+            # one query per page, contacts are joined rather than lazy-loaded
+            with self.assertNumQueries(1):
+                response = self.client.get(next_url)
+            seen += [row["sid"] for row in response.data["results"]]
+            next_url = response.data["next"]
+        self.assertEqual(len(seen), 10)
+        self.assertEqual(len(set(seen)), 10)
+
+    def test_call_records_optional_count(self):
+        url = reverse("callrecord-list")
+        with self.assertNumQueries(2):
+            response = self.client.get(url, {"include_count": "true"})
+        self.assertEqual(response.data["count"], 1)
 
     def test_add_to_contact_list(self):
         new_contact = Contact.objects.create(
@@ -97,3 +127,63 @@ class ViewTests(APITestCase):
         self.call_record.refresh_from_db()
         self.assertEqual(self.call_record.status, "completed")
         self.assertEqual(self.call_record.duration, 120)
+
+    @patch("api.tasks.AsyncResult")
+    def test_check_dial_status_reports_chunk_progress(self, mock_async_result):
+        parent = mock_async_result.return_value
+        parent.ready.return_value = False
+        parent.state = "PROGRESS"
+        parent.info = {"chunks": ["a", "b", "c"]}
+        url = reverse("contactlist-check-dial-status")
+        response = self.client.get(url, {"task_id": "parent"})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["status"], "in_progress")
+        self.assertEqual(response.data["chunks"], 3)
+
+    @patch("api.tasks.dial.delay")
+    def test_dial_rejects_unknown_placeholders(self, mock_dial):
+        url = reverse("contactlist-dial", args=[self.contact_list.id])
+        response = self.client.post(url, {"message": "Hi {nickname}"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        mock_dial.assert_not_called()
+
+    def test_twilio_webhook_before_call_record_is_written(self):
+        url = reverse("twilio-webhook")
+        data = {"CallSid": "EARLY1", "CallStatus": "ringing"}
+        response = self.client.post(url, data)
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.assertTrue(CallStatusEvent.objects.filter(sid="EARLY1").exists())
+
+    def test_contact_list_summaries_use_one_query(self):
+        for i in range(3):
+            contact_list = ContactList.objects.create(user=self.user, name=f"L{i}")
+            contact_list.contacts.add(self.contact)
+        url = reverse("contactlist-list")
+        with self.assertNumQueries(1):
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([row["contact_count"] for row in response.data], [1] * 4)
+
+    def test_contact_list_contacts_are_cursor_paginated(self):
+        contacts = Contact.objects.bulk_create(
+            Contact(
+                user=self.user,
+                first_name=f"Jane{i}",
+                last_name="Doe",
+                city="Test City",
+                phone_number=f"+1555000{i:04d}",
+            )
+            for i in range(4)
+        )
+        self.contact_list.contacts.add(*contacts)
+        url = reverse("contactlist-contacts", args=[self.contact_list.id])
+
+        response = self.client.get(url, {"page_size": 3})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data["results"]), 3)
+        response = self.client.get(response.data["next"])
+        self.assertEqual(
+            [row["first_name"] for row in response.data["results"]],
+            ["Jane2", "Jane3"],
+        )
+        self.assertIsNone(response.data["next"])
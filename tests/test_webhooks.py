@@ -0,0 +1,177 @@
+from datetime import timedelta
+from unittest.mock import patch
+
+from django.contrib.auth.models import User
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from api.models import CallRecord, CallStatusEvent, Contact
+from api.services.buffer import CallRecordBuffer
+from api.services.webhooks import (
+    StatusEventQueue,
+    apply_status_event,
+    apply_status_events,
+)
+from api.tasks import prune_parked_status_events
+
+
+class WebhookTestMixin:
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username="testuser", password="testpass123"
+        )
+        self.contact = Contact.objects.create(
+            user=self.user,
+            first_name="John",
+            last_name="Doe",
+            city="Test City",
+            phone_number="+1234567890",
+        )
+        CallRecord.objects.bulk_create(
+            CallRecord(
+                sid=f"CA{i}",
+                user=self.user,
+                contact=self.contact,
+                phone_number=self.contact.phone_number,
+                status="queued",
+            )
+            for i in range(3)
+        )
+
+
+class ApplyStatusEventsTests(WebhookTestMixin, TestCase):
+    def test_events_are_coalesced_per_sid(self):
+        events = [
+            ("CA0", "ringing", None),
+            ("CA1", "ringing", None),
+            ("CA0", "in-progress", None),
+            ("CA0", "completed", 30),
+            ("CA1", "busy", None),
+        ]
+        self.assertEqual(apply_status_events(events), 2)
+
+        self.assertEqual(
+            dict(CallRecord.objects.values_list("sid", "status")),
+            {"CA0": "completed", "CA1": "busy", "CA2": "queued"},
+        )
+        self.assertEqual(CallRecord.objects.get(sid="CA0").duration, 30)
+
+    def test_non_terminal_statuses_are_batched(self):
+        events = [
+            ("CA0", "ringing", None),
+            ("CA1", "ringing", None),
+            ("CA0", "in-progress", None),
+            ("CA2", "in-progress", None),
+        ]
+        # one UPDATE per distinct status, no reads
+        with self.assertNumQueries(2):
+            self.assertEqual(apply_status_events(events), 3)
+
+    def test_unknown_sids_are_parked(self):
+        apply_status_events([("CA9", "ringing", None)])
+        self.assertTrue(CallStatusEvent.objects.filter(sid="CA9").exists())
+
+    def test_stale_parked_events_are_pruned(self):
+        apply_status_events([("CA8", "ringing", None), ("CA9", "ringing", None)])
+        CallStatusEvent.objects.filter(sid="CA8").update(
+            received_at=timezone.now() - timedelta(days=2)
+        )
+
+        with self.settings(CALL_STATUS_EVENT_MAX_AGE=24 * 60 * 60):
+            self.assertEqual(prune_parked_status_events(), 1)
+        self.assertEqual(
+            list(CallStatusEvent.objects.values_list("sid", flat=True)), ["CA9"]
+        )
+
+
+class StatusStateMachineTests(WebhookTestMixin, TestCase):
+    def test_single_update_without_read(self):
+        with self.assertNumQueries(1):
+            self.assertTrue(apply_status_event("CA0", "ringing"))
+        self.assertEqual(CallRecord.objects.get(sid="CA0").status_rank, 3)
+
+    def test_late_callback_does_not_move_status_backwards(self):
+        for call_status in ("completed", "ringing", "in-progress", "initiated"):
+            self.assertTrue(apply_status_event("CA0", call_status, None))
+        self.assertEqual(CallRecord.objects.get(sid="CA0").status, "completed")
+
+    def test_duplicated_callbacks_are_idempotent(self):
+        apply_status_event("CA0", "completed", 30)
+        apply_status_event("CA0", "completed", 30)
+        apply_status_event("CA0", "ringing", None)
+        record = CallRecord.objects.get(sid="CA0")
+        self.assertEqual((record.status, record.duration), ("completed", 30))
+
+    def test_reordered_batch(self):
+        apply_status_events(
+            [
+                ("CA0", "completed", 45),
+                ("CA0", "ringing", None),
+                ("CA1", "in-progress", None),
+                ("CA1", "initiated", None),
+                ("CA0", "in-progress", None),
+            ]
+        )
+        self.assertEqual(
+            dict(CallRecord.objects.values_list("sid", "status")),
+            {"CA0": "completed", "CA1": "in-progress", "CA2": "queued"},
+        )
+        self.assertEqual(CallRecord.objects.get(sid="CA0").duration, 45)
+
+    def test_reordered_events_parked_before_flush(self):
+        apply_status_event("CA7", "completed", 20)
+        apply_status_event("CA7", "ringing")
+        with CallRecordBuffer() as buffer:
+            buffer.add(
+                CallRecord(
+                    sid="CA7",
+                    user=self.user,
+                    contact=self.contact,
+                    phone_number=self.contact.phone_number,
+                    status="queued",
+                )
+            )
+        record = CallRecord.objects.get(sid="CA7")
+        self.assertEqual((record.status, record.duration), ("completed", 20))
+        self.assertFalse(CallStatusEvent.objects.exists())
+
+
+class StatusEventQueueTests(WebhookTestMixin, TestCase):
+    def test_flush_applies_queued_events(self):
+        queue = StatusEventQueue(autostart=False)
+        queue.put("CA0", "completed", 12)
+        queue.put("CA2", "no-answer")
+        self.assertEqual(queue.flush(), 2)
+        self.assertEqual(queue.flush(), 0)
+        self.assertEqual(CallRecord.objects.get(sid="CA2").status, "no-answer")
+
+
+@override_settings(TWILIO_WEBHOOK_MODE="batched")
+class BatchedWebhookViewTests(WebhookTestMixin, APITestCase):
+    def test_webhook_is_acknowledged_before_it_is_applied(self):
+        queue = StatusEventQueue(autostart=False)
+        with patch("api.views.get_status_event_queue", return_value=queue):
+            response = self.client.post(
+                reverse("twilio-webhook"),
+                {"CallSid": "CA1", "CallStatus": "completed", "CallDuration": "5"},
+            )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(CallRecord.objects.get(sid="CA1").status, "queued")
+
+        queue.flush()
+        record = CallRecord.objects.get(sid="CA1")
+        self.assertEqual(record.status, "completed")
+        self.assertEqual(record.duration, 5)
+
+    def test_malformed_duration_is_rejected(self):
+        queue = StatusEventQueue(autostart=False)
+        with patch("api.views.get_status_event_queue", return_value=queue):
+            response = self.client.post(
+                reverse("twilio-webhook"),
+                {"CallSid": "CA1", "CallStatus": "completed", "CallDuration": "5s"},
+            )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(queue.flush(), 0)